@@ -0,0 +1,166 @@
+"""
+/chat/answer için ilk token süresi (TTFT) ve toplam akış süresi: eski sabit bekleme ile frame birleştirme.
+
+Sahte Ollama (benchmarks.bench_llm_streaming) ve sahte bir RAG /rag/search uç noktası ayrı thread'lerde başlatılır,
+uygulama (main.app) uvicorn ile ayağa kaldırılır. "sleep" modu önceki davranışı (her token'dan sonra
+asyncio.sleep(0.05)) uygulamaya eklenen bir karşılaştırma route'u üzerinden, "text" ve "sse" modları gerçek
+/chat/answer üzerinden ölçülür. Her mod için TTFT ve toplam süre (p50/p99), frame sayısı raporlanır.
+--disconnect-after-ms verilirse istemci ilk frame'den bu kadar sonra bağlantıyı kapatır; sahte Ollama'nın
+kopmadan sonra ürettiği token sayısı, iptalin upstream'e ne kadar hızlı ulaştığını gösterir.
+
+Kullanım (app dizininden):
+    python -m benchmarks.bench_chat_answer --tokens 100 --token-delay-ms 5 --concurrency 1,16
+"""
+from benchmarks.bench_llm_streaming import percentile, start_fake_ollama
+from datetime import datetime
+from fastapi import FastAPI
+import argparse
+import asyncio
+import httpx
+import os
+import threading
+import time
+import uvicorn
+
+CHAT_DATA = {
+    "userId": "bench",
+    "chatInfo": {"id": None, "name": "Yeni Sohbet", "lastMessageTimestamp": datetime.now().isoformat()},
+    "messages": [
+        {"id": "1", "content": "Üç gündür başım ağrıyor ve ateşim var.", "timestamp": datetime.now().isoformat(), "sender": "user"},
+    ],
+}
+
+
+def start_server(app, port: int):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def create_fake_rag() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/rag/search")
+    async def search(body: dict):
+        results = [{"id": i, "context": f"Bağlam {i}: baş ağrısı ve ateş.", "score": 1.0 - i / 10} for i in range(body.get("top_k", 5))]
+        return {"query": body["query"], "results": results, "tier": "full"}
+
+    return app
+
+
+def add_legacy_route(app):
+    """
+    Önceki /chat/answer davranışı: her token'dan sonra 50 ms bekleme.
+    """
+    from fastapi.responses import StreamingResponse
+    from models.models import ChatData
+    from services.llm import async_llm_stream_response
+    from services.retrieval import process_query
+
+    @app.post("/bench/answer-sleep")
+    async def answer_sleep(chat_data: ChatData):
+        async def stream_response():
+            chunks = await process_query(query=max(chat_data.messages, key=lambda msg: msg.timestamp).content)
+            async for token in async_llm_stream_response(chat_data.messages, chunks):
+                yield token
+                await asyncio.sleep(0.05)
+            yield "\n"
+
+        return StreamingResponse(stream_response(), media_type="text/plain")
+
+
+async def measure(client: httpx.AsyncClient, path: str):
+    started = time.perf_counter()
+    first = None
+    frames = 0
+    async with client.stream("POST", path, json=CHAT_DATA, timeout=None) as response:
+        async for chunk in response.aiter_bytes():
+            if not chunk.strip():
+                continue
+            frames += 1
+            if first is None:
+                first = time.perf_counter() - started
+    return first, time.perf_counter() - started, frames
+
+
+async def measure_disconnect(base_url: str, path: str, disconnect_after: float, fake_ollama, token_delay: float):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        async with client.stream("POST", path, json=CHAT_DATA, timeout=None) as response:
+            chunks = response.aiter_bytes()
+            async for chunk in chunks:
+                if chunk.strip():
+                    break
+
+            async def drain():
+                async for _ in chunks:
+                    pass
+
+            # İlk frame'den sonra disconnect_after boyunca okumaya devam et; akış bu sürede açık ve akar durumda kalır
+            reader = asyncio.create_task(drain())
+            await asyncio.sleep(disconnect_after)
+            reader.cancel()
+            try:
+                await reader
+            except asyncio.CancelledError:
+                pass
+        # Bağlantı context'ten çıkışta kapandı; sayaç kopma anında okunur
+        generated_at_disconnect = fake_ollama.state.generated
+    # Kopmadan sonra birkaç token süresi bekle; iptal ulaşmadıysa sahte Ollama üretmeye devam eder
+    await asyncio.sleep(max(0.2, token_delay * 20))
+    return fake_ollama.state.generated - generated_at_disconnect
+
+
+async def run(base_url: str, path: str, concurrency: int, repeats: int):
+    async with httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=concurrency)) as client:
+        results = []
+        for _ in range(repeats):
+            results.extend(await asyncio.gather(*(measure(client, path) for _ in range(concurrency))))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--token-delay-ms", type=float, default=10.0)
+    parser.add_argument("--concurrency", default="1,16")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--disconnect-after-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake_ollama, _, _ = start_fake_ollama(args.port + 1, args.tokens, args.token_delay_ms / 1000)
+    start_server(create_fake_rag(), args.port + 2)
+    os.environ.update({
+        "OLLAMA_URL": f"http://127.0.0.1:{args.port + 1}",
+        "RAG_URLS": f"http://127.0.0.1:{args.port + 2}",
+        "CHAT_MODEL_NAME": "fake", "NAMER_MODEL_NAME": "fake", "ANALYZER_MODEL_NAME": "fake", "TEMPERATURE": "0",
+    })
+    from main import app
+    add_legacy_route(app)
+    start_server(app, args.port)
+
+    modes = {"sleep": "/bench/answer-sleep", "text": "/chat/answer", "sse": "/chat/answer?mode=sse"}
+    print(f"{'mode':>6} {'streams':>8} {'ttft_p50_ms':>12} {'ttft_p99_ms':>12} {'total_p50_ms':>13} {'total_p99_ms':>13} {'frames':>7}")
+    for concurrency in [int(value) for value in args.concurrency.split(",")]:
+        for mode, path in modes.items():
+            results = asyncio.run(run(f"http://127.0.0.1:{args.port}", path, concurrency, args.repeats))
+            ttfts = [first * 1000 for first, _, _ in results if first is not None]
+            totals = [total * 1000 for _, total, _ in results]
+            frames = sum(count for _, _, count in results) / len(results)
+            print(
+                f"{mode:>6} {concurrency:>8} {percentile(ttfts, 50):>12.1f} {percentile(ttfts, 99):>12.1f} "
+                f"{percentile(totals, 50):>13.1f} {percentile(totals, 99):>13.1f} {frames:>7.0f}"
+            )
+
+    if args.disconnect_after_ms > 0:
+        for mode, path in modes.items():
+            after = asyncio.run(measure_disconnect(
+                f"http://127.0.0.1:{args.port}", path, args.disconnect_after_ms / 1000, fake_ollama, args.token_delay_ms / 1000,
+            ))
+            print(f"{mode:>6} disconnect: {after} tokens generated upstream after the client left")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Chat token akışı için eşzamanlılık testi: eski thread + queue köprüsü ile ChatOllama.astream.
+
+Ollama'nın /api/chat NDJSON akışını taklit eden sahte bir sunucu ayrı bir thread'de (kendi event loop'unda)
+başlatılır; her cevap --tokens kadar token'ı --token-delay-ms aralıklarla gönderir. "thread" modu önceki
+async_llm_stream_response davranışını (istek başına thread, token başına run_in_executor) yeniden üretir,
+"async" modu services.llm.async_llm_stream_response'u kullanır. Her eşzamanlılık seviyesi için toplam token/s
+ve event loop gecikmesi (10 ms'lik bir ticker'ın gecikmesi, p50/p99/max) raporlanır.
+
+Kullanım (app dizininden):
+    python -m benchmarks.bench_llm_streaming --concurrency 1,16,64 --tokens 200 --token-delay-ms 5
+"""
+from datetime import datetime
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from langchain_core.messages import HumanMessage
+from models.models import Message
+from utils.ollama_utils import OllamaClientFactory
+import argparse
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+import uvicorn
+
+MESSAGES = [Message(id="1", content="Üç gündür başım ağrıyor ve ateşim var.", timestamp=datetime.now(), sender="user")]
+CHUNKS = {"results": [{"context": "Baş ağrısı ve ateş birçok enfeksiyonun ortak belirtisidir."}]}
+
+
+def create_fake_ollama(tokens: int, token_delay: float, script=None) -> FastAPI:
+    """
+    /api/chat için, stop parametresine uyan ve istemci bağlantıyı kapattığında üretimi bırakan sahte Ollama.
+    script verilirse token'lar bu listeden, verilmezse "token{i} " olarak üretilir; app.state.generated
+    gönderilen token sayısını tutar.
+    """
+    app = FastAPI()
+    app.state.generated = 0
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        stop = (body.get("options") or {}).get("stop") or []
+        async def stream():
+            text = ""
+            for token in script or [f"token{i} " for i in range(tokens)]:
+                await asyncio.sleep(token_delay)
+                text += token
+                if any(sequence in text for sequence in stop):
+                    break
+                app.state.generated += 1
+                yield json.dumps({
+                    "model": body["model"], "created_at": datetime.utcnow().isoformat() + "Z",
+                    "message": {"role": "assistant", "content": token}, "done": False,
+                }) + "\n"
+            yield json.dumps({
+                "model": body["model"], "created_at": datetime.utcnow().isoformat() + "Z",
+                "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "stop",
+            }) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+def start_fake_ollama(port: int, tokens: int, token_delay: float, script=None):
+    app = create_fake_ollama(tokens, token_delay, script)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return app, server, thread
+
+
+async def thread_stream(messages, chunks):
+    # Önceki uygulama: istek başına thread, token başına varsayılan executor üzerinden queue.get
+    output_queue = queue.Queue()
+
+    def produce():
+        try:
+            llm = OllamaClientFactory.get_client(role="chat")
+            for token in llm.stream([HumanMessage(content=messages[-1].content)]):
+                output_queue.put(token.content)
+        except Exception as e:
+            output_queue.put(e)
+        finally:
+            output_queue.put(None)
+
+    threading.Thread(target=produce).start()
+    loop = asyncio.get_running_loop()
+    while True:
+        token = await loop.run_in_executor(None, output_queue.get)
+        if token is None:
+            break
+        if isinstance(token, Exception):
+            raise token
+        yield token
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.01):
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+    return lags
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+async def run(stream_fn, concurrency: int):
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+
+    async def consume():
+        count = 0
+        async for _ in stream_fn(MESSAGES, CHUNKS):
+            count += 1
+        return count
+
+    started = time.perf_counter()
+    counts = await asyncio.gather(*(consume() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    lags = await lag_task
+    return sum(counts), elapsed, lags
+
+
+async def run_all(levels, modes):
+    # ChatOllama'nın async istemcisi ilk kullanıldığı event loop'a bağlanır; tüm seviyeler aynı loop'ta çalışır
+    from services.llm import async_llm_stream_response
+    stream_fns = {"thread": thread_stream, "async": async_llm_stream_response}
+    print(f"{'mode':>8} {'streams':>8} {'tokens':>8} {'tok/s':>10} {'lag_p50_ms':>11} {'lag_p99_ms':>11} {'lag_max_ms':>11}")
+    for concurrency in levels:
+        for mode in modes:
+            tokens, elapsed, lags = await run(stream_fns[mode], concurrency)
+            print(
+                f"{mode:>8} {concurrency:>8} {tokens:>8} {tokens / elapsed:>10.0f} {percentile(lags, 50) * 1000:>11.2f} "
+                f"{percentile(lags, 99) * 1000:>11.2f} {max(lags, default=0.0) * 1000:>11.2f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", default="1,16,64")
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--token-delay-ms", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=11499)
+    parser.add_argument("--modes", default="thread,async")
+    args = parser.parse_args()
+
+    start_fake_ollama(args.port, args.tokens, args.token_delay_ms / 1000)
+    os.environ["OLLAMA_URL"] = f"http://127.0.0.1:{args.port}"
+    OllamaClientFactory.create_client(role="chat", model_name="fake", base_url=os.environ["OLLAMA_URL"], temperature=0.0)
+
+    asyncio.run(run_all([int(value) for value in args.concurrency.split(",")], args.modes.split(",")))
+
+
+if __name__ == "__main__":
+    main()
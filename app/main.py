@@ -2,8 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from utils.ollama_utils import OllamaClientFactory
+from utils.rag_client_utils import RagClientFactory
 from routers import chat
 from routers import prospectus
+from routers import metrics
 import logging 
 import os 
 
@@ -50,6 +52,7 @@ async def lifespan(app: FastAPI):
                 base_url=ollama_url,
                 temperature=temperature
             )
+        RagClientFactory.create_client()
         yield 
     except Exception as e:
         logging.error(f"Error during lifespan: {e}")
@@ -59,6 +62,7 @@ async def lifespan(app: FastAPI):
         OllamaClientFactory.delete_client(role="chat")
         OllamaClientFactory.delete_client(role="namer")
         OllamaClientFactory.delete_client(role="analyzer")
+        await RagClientFactory.close_client()
         
 
 app = FastAPI(title="LLM FastAPI", version="1.0.0", lifespan=lifespan)
@@ -73,6 +77,7 @@ app.add_middleware(
 
 app.include_router(chat.router, prefix="", tags=["Chat"])
 app.include_router(prospectus.router, prefix="", tags=["Drug"])
+app.include_router(metrics.router, prefix="", tags=["Metrics"])
 
 @app.get("/")
 def root():
@@ -1,41 +1,118 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse, Response
+from prometheus_client import Counter, Histogram
 from services.llm import async_llm_stream_response
 from services.llm import name_chat
 from services.retrieval import process_query
 from models.models import ChatData
+from utils.stream_utils import coalesce_tokens, format_sse, get_flush_settings
+from utils.stream_utils import cancel_on_disconnect, TokenCounter
+from utils.metrics_utils import TOKEN_BUCKETS, get_metrics_registry
 import logging
-import asyncio
 import json
+import time
 
 router = APIRouter(prefix="/chat")
 
+CHAT_STREAMS = Counter(
+    "app_chat_streams_total", "Chat answer streams by outcome.", ["outcome"], registry=get_metrics_registry(),
+)
+CHAT_STREAM_TOKENS = Histogram(
+    "app_chat_stream_tokens", "LLM tokens received per chat answer by outcome.", ["outcome"],
+    buckets=TOKEN_BUCKETS, registry=get_metrics_registry(),
+)
+CHAT_CANCEL_SECONDS = Histogram(
+    "app_chat_cancel_duration_seconds", "Time from client disconnect until the upstream LLM stream was closed.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0), registry=get_metrics_registry(),
+)
+
+def record_stream(outcome: str, counter: TokenCounter, started: float):
+    CHAT_STREAMS.labels(outcome).inc()
+    CHAT_STREAM_TOKENS.labels(outcome).observe(counter.tokens)
+    if outcome == "disconnected":
+        logging.info(
+            f"Chat stream cancelled by client after {counter.tokens} tokens ({(time.perf_counter() - started) * 1000:.0f} ms)."
+        )
+
+def disconnect_handler(counter: TokenCounter, started: float):
+    def on_disconnect(seconds: float):
+        CHAT_CANCEL_SECONDS.observe(seconds)
+        record_stream("disconnected", counter, started)
+    return on_disconnect
+
 @router.post("/answer")
-async def answer(chat_data: ChatData):
+async def answer(chat_data: ChatData, request: Request, mode: str = "text"):
     """
     Gelen soruya LLM üzerinden yanıt oluşturur ve StreamingResponse ile yanıtı token bazında (boşluk karakterleri de dahil)
     gönderir. Son tokenin sonuna ekstra newline eklenir.
-    Bu örnekte, llm.stream metodu kullanılarak asenkron streaming uygulanmaktadır.
+    Token'lar sabit bir bekleme yerine frame'lerde birleştirilir: ilk token hemen, sonrakiler CHAT_FLUSH_INTERVAL_MS
+    veya CHAT_FLUSH_MAX_CHARS eşiğinde gönderilir.
+    mode=sse (veya Accept: text/event-stream) ile yanıt Server-Sent Events olarak döner: retrieval, token, done ve error event'leri.
+    İstemci bağlantıyı kapatırsa RAG isteği veya Ollama akışı iptal edilir ve üretim durur.
     """
     logging.info(f"user_id: {chat_data.userId}")
+    flush_settings = get_flush_settings()
+    counter = TokenCounter()
+    started = time.perf_counter()
+    on_disconnect = disconnect_handler(counter, started)
+    if mode == "sse" or "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            cancel_on_disconnect(request.receive, stream_sse_response(chat_data, flush_settings, counter, started), on_disconnect),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     async def stream_response():
         try:
             chunks = await process_query(query=max(chat_data.messages, key=lambda msg: msg.timestamp).content)
 
-            async for token in async_llm_stream_response(
-                chat_data.messages,
-                chunks,
-            ):
-                yield token
-                await asyncio.sleep(0.05)
+            tokens = counter.count(async_llm_stream_response(chat_data.messages, chunks))
+            async for frame in coalesce_tokens(tokens, **flush_settings):
+                yield frame
             
             yield "\n"
+            record_stream("completed", counter, started)
             
         except Exception as e:
             logging.error(f"Streaming yanıt hatası: {e}")
+            record_stream("error", counter, started)
             yield f"Error: {str(e)}\n"
 
-    return StreamingResponse(stream_response(), media_type="text/plain")
+    return StreamingResponse(cancel_on_disconnect(request.receive, stream_response(), on_disconnect), media_type="text/plain")
+
+async def stream_sse_response(chat_data: ChatData, flush_settings: dict, counter: TokenCounter, started: float):
+    """
+    /chat/answer'ın SSE modu. retrieval event'i kullanılan RAG sonuçlarının id ve skorlarını, done event'i
+    token/frame sayılarını ve süreleri (ms) taşır. Hata durumunda error event'i ile akış kapanır.
+    """
+    try:
+        chunks = await process_query(query=max(chat_data.messages, key=lambda msg: msg.timestamp).content)
+        yield format_sse("retrieval", {
+            "results": [{"id": result.get("id"), "score": result.get("score")} for result in chunks.get("results") or []],
+            "tier": chunks.get("tier"),
+            "duration_ms": (time.perf_counter() - started) * 1000,
+        })
+
+        frames = 0
+        first_token_ms = None
+        tokens = counter.count(async_llm_stream_response(chat_data.messages, chunks))
+        async for frame in coalesce_tokens(tokens, **flush_settings):
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - started) * 1000
+            frames += 1
+            yield format_sse("token", {"text": frame})
+
+        record_stream("completed", counter, started)
+        yield format_sse("done", {
+            "tokens": counter.tokens,
+            "frames": frames,
+            "first_token_ms": first_token_ms,
+            "duration_ms": (time.perf_counter() - started) * 1000,
+        })
+    except Exception as e:
+        logging.error(f"Streaming yanıt hatası: {e}")
+        record_stream("error", counter, started)
+        yield format_sse("error", {"detail": str(e)})
 
 @router.post("/name")
 async def get_name(chat_data: ChatData):
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from utils.metrics_utils import get_metrics_registry, register_collector
+from utils.rag_client_utils import RagClientFactory
+
+router = APIRouter()
+
+def collect_rag_client_stats():
+    """
+    RAG client'ının havuz ve tekrar deneme istatistiklerini scrape anında gauge olarak döner.
+    """
+    for key, value in RagClientFactory.get_client().stats().items():
+        yield f"app_rag_client_{key}", f"RAG client state ({key})", {}, value
+
+register_collector("rag_client", collect_rag_client_stats)
+
+@router.get("/metrics", response_class=Response)
+def metrics():
+    """
+    Uygulama metrikleri, Prometheus text formatında.
+    """
+    return Response(generate_latest(get_metrics_registry()), media_type=CONTENT_TYPE_LATEST)
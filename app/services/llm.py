@@ -1,8 +1,7 @@
 from utils.ollama_utils import OllamaClientFactory
+from utils.stream_utils import StopSequenceMatcher, get_stop_sequences
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 import os
-import queue
-import threading
 import asyncio
 from typing import List
 from models.models import Message
@@ -11,63 +10,60 @@ from fastapi import HTTPException
 from fastapi.responses import Response
 import json
 
-def stream_response_with_context_sync(messages: List[Message], chunks, output_queue: queue.Queue):
+def build_chat_prompt(messages: List[Message], chunks) -> HumanMessage:
     """
-    Ollama container'ına prompt göndermek için, gelen chunks'tan section (bağlam)
-    oluşturur, kullanıcı mesajını prompt ile birleştirir ve llm.stream ile token'ları 
-    output_queue'ya aktarır.
+    Gelen chunks'tan section (bağlam) oluşturur ve kullanıcı mesajlarını sistem prompt'u ile birleştirir.
+    """
+    # chunks'tan section (bağlam) oluştur.
+    section_str = create_section(chunks)
+
+    # Build full prompt, including system, context, and conversation history
+    system_prompt = (
+        "Tıp alanında bilgi bir asistansın. Sadece önerilerde bulunabilirsin. Görevin teşhis koymak ve ilgili polikliniğe yönlendirmek. "
+        "Tıp alanı dışındaki sorulara cevap verme."
+        "Aşağıda, <doktor> ve <hasta> etiketleriyle gösterilmiş bir diyalog ve ilgili bilgilerin yer aldığı <bağlam> bölümü bulunuyor. "
+        "Sen <doktor> rolündesin; bu sohbette yer alan bir sonraki <doktor> yanıtını yalnızca Türkçe olarak oluştur."
+    )
+
+    # create_prompt now handles parsing of messages into tagged conversation
+    prompt_text = build_prompt(messages, section_str, system_prompt)
+    return HumanMessage(content=prompt_text)
+
+async def async_llm_stream_response(messages: List[Message], chunks):
+    """
+    Ollama container'ına prompt gönderir ve llm.astream ile token'ları doğrudan event loop üzerinden döner.
+    Yardımcı thread veya token başına executor çağrısı yoktur; akış hataları RuntimeError olarak fırlatılır.
+    Üretim, stop dizilerinden (<hasta>, <bağlam>, CHAT_STOP_SEQUENCES) birinde biter; dizi yanıta eklenmez.
     """
     ollama_url = os.getenv("OLLAMA_URL")
     if not ollama_url:
-        output_queue.put(ValueError("OLLAMA_URL environment variable is not set."))
-        return
+        raise ValueError("OLLAMA_URL environment variable is not set.")
 
     llm = OllamaClientFactory.get_client(role="chat")
 
     try:
-        # chunks'tan section (bağlam) oluştur.
-        section_str = create_section(chunks)
-
-        # Build full prompt, including system, context, and conversation history
-        system_prompt = (
-            "Tıp alanında bilgi bir asistansın. Sadece önerilerde bulunabilirsin. Görevin teşhis koymak ve ilgili polikliniğe yönlendirmek. "
-            "Tıp alanı dışındaki sorulara cevap verme."
-            "Aşağıda, <doktor> ve <hasta> etiketleriyle gösterilmiş bir diyalog ve ilgili bilgilerin yer aldığı <bağlam> bölümü bulunuyor. "
-            "Sen <doktor> rolündesin; bu sohbette yer alan bir sonraki <doktor> yanıtını yalnızca Türkçe olarak oluştur."
-        )
-
-        # create_prompt now handles parsing of messages into tagged conversation
-        prompt_text = build_prompt(messages, section_str, system_prompt)
-        prompt_message = HumanMessage(content=prompt_text)
+        prompt_message = build_chat_prompt(messages, chunks)
         logging.info(f"Prompt: {prompt_message.content}")
-        for token in llm.stream([prompt_message]):
-            if "<hasta>:" in token.content:
-                break
-            output_queue.put(token.content)
+        # Stop dizileri Ollama'ya da gönderilir; model uydurma hasta turuna geçtiğinde üretim kaynakta durur.
+        # Matcher, token sınırına bölünmüş dizileri akış tarafında da yakalar.
+        stop_sequences = get_stop_sequences()
+        matcher = StopSequenceMatcher(stop_sequences)
+        stream = llm.astream([prompt_message], stop=stop_sequences)
+        try:
+            async for token in stream:
+                text = matcher.feed(token.content)
+                if text:
+                    yield text
+                if matcher.stopped:
+                    break
+            tail = matcher.flush()
+            if tail:
+                yield tail
+        finally:
+            # Akış erken bırakıldığında Ollama HTTP bağlantısını hemen kapat
+            await stream.aclose()
     except Exception as e:
-        output_queue.put(RuntimeError(f"LLM streaming çağrısında hata oluştu: {e}"))
-    finally:
-        output_queue.put(None)
-
-async def async_llm_stream_response(messages: List[Message], chunks):
-    """
-    Senkron stream'i arka planda çalışan bir thread ve queue ile asenkron generator'a çevirir.
-    """
-    output_queue = queue.Queue()
-    thread = threading.Thread(
-        target=stream_response_with_context_sync,
-        args=(messages, chunks, output_queue)
-    )
-    thread.start()
-
-    loop = asyncio.get_running_loop()
-    while True:
-        token = await loop.run_in_executor(None, output_queue.get)
-        if token is None:
-            break
-        if isinstance(token, Exception):
-            raise token
-        yield token
+        raise RuntimeError(f"LLM streaming çağrısında hata oluştu: {e}") from e
 
 def message_to_langchain_message(message: Message):
     if message.sender == "user":
@@ -1,16 +1,13 @@
-import httpx
 from fastapi import HTTPException
+from utils.rag_client_utils import RagClientFactory
 
 async def process_query(query: str, top_k: int = 5):
+    """
+    Sorguyu uygulama ömrü boyunca açık kalan, havuzlu RAG client'ı ile gönderir;
+    tekrar deneme ve replikalar arası hedge client tarafından yapılır.
+    """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://rag_server:8001/rag/search",  # RAG container endpoint
-                json={"query": query, "top_k": top_k},
-                timeout=10.0,  # Set a timeout for the request
-            )
-        response.raise_for_status()
-        return response.json()
+        return await RagClientFactory.get_client().search(query, top_k=top_k)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"RAG Error: {str(e)}")
@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("langchain_ollama")
+
+
+def test_chat_router_imports():
+    from routers import chat
+
+    paths = {route.path for route in chat.router.routes}
+    assert {"/chat/answer", "/chat/name"} <= paths
+
+
+def test_app_imports():
+    from main import app
+
+    paths = set(app.openapi()["paths"])
+    assert {"/chat/answer", "/metrics"} <= paths
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("langchain_ollama")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from prometheus_client.parser import text_string_to_metric_families  # noqa: E402
+
+from main import app  # noqa: E402
+from routers import chat  # noqa: E402
+from utils.rag_client_utils import RagClientFactory  # noqa: E402
+
+
+def scrape() -> dict:
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    return {family.name: family for family in text_string_to_metric_families(response.text)}
+
+
+def test_metrics_skip_missing_rag_client():
+    RagClientFactory._client = None
+    chat.CHAT_STREAMS.labels("completed").inc()
+
+    families = scrape()
+
+    assert "app_chat_streams" in families
+    assert "app_rag_client_requests" not in families
+
+
+def test_metrics_include_rag_client_gauges(monkeypatch):
+    monkeypatch.setenv("RAG_URLS", "http://rag-a,http://rag-b")
+    RagClientFactory.create_client()
+    try:
+        families = scrape()
+    finally:
+        asyncio.run(RagClientFactory.close_client())
+
+    assert families["app_rag_client_replicas"].type == "gauge"
+    assert families["app_rag_client_replicas"].samples[0].value == 2
@@ -0,0 +1,106 @@
+import asyncio
+
+import httpx
+import pytest
+
+from utils.rag_client_utils import RagClient, RagRetryableStatus
+
+REPLICAS = ["http://rag-a", "http://rag-b"]
+
+
+def make_client(handler, urls=REPLICAS, **kwargs):
+    kwargs = {"retries": 2, "backoff_ms": 1, "backoff_max_ms": 5, **kwargs}
+    return RagClient(urls, transport=httpx.MockTransport(handler), **kwargs)
+
+
+def run(client, coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+def test_retries_retryable_status_on_next_replica():
+    hosts = []
+
+    def handler(request):
+        hosts.append(request.url.host)
+        if len(hosts) == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"results": [request.url.path]})
+
+    client = make_client(handler)
+    result = run(client, client.search("ateş"))
+
+    assert result == {"results": ["/rag/search"]}
+    assert hosts == ["rag-a", "rag-b"]
+    assert (client.attempts, client.retried, client.failures) == (2, 1, 0)
+
+
+def test_retries_transport_errors_until_exhausted():
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = make_client(handler)
+    with pytest.raises(httpx.ConnectError):
+        run(client, client.search("ateş"))
+
+    assert (client.attempts, client.retried, client.failures) == (3, 2, 1)
+
+
+def test_exhausted_retryable_status_raises_last_response():
+    client = make_client(lambda request: httpx.Response(429), retries=1)
+    with pytest.raises(RagRetryableStatus) as error:
+        run(client, client.search("ateş"))
+
+    assert error.value.response.status_code == 429
+    assert client.attempts == 2
+
+
+def test_does_not_retry_client_errors():
+    client = make_client(lambda request: httpx.Response(400))
+    with pytest.raises(httpx.HTTPStatusError):
+        run(client, client.search("ateş"))
+
+    assert (client.attempts, client.retried, client.failures) == (1, 0, 1)
+
+
+def test_hedged_request_wins_when_primary_is_slow():
+    cancelled = []
+
+    async def handler(request):
+        if request.url.host == "rag-a":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(request.url.host)
+                raise
+        return httpx.Response(200, json={"replica": request.url.host})
+
+    client = make_client(handler, hedge_after_ms=20)
+    result = run(client, client.search("ateş"))
+
+    assert result == {"replica": "rag-b"}
+    assert (client.hedged, client.hedge_wins) == (1, 1)
+    assert cancelled == ["rag-a"]
+    assert client.in_flight == 0
+
+
+def test_fast_primary_is_not_hedged():
+    client = make_client(lambda request: httpx.Response(200, json={"replica": request.url.host}), hedge_after_ms=1000)
+    result = run(client, client.search("ateş"))
+
+    assert result == {"replica": "rag-a"}
+    assert (client.attempts, client.hedged) == (1, 0)
+
+
+def test_round_robin_across_requests():
+    client = make_client(lambda request: httpx.Response(200, json={"replica": request.url.host}))
+
+    async def search_twice():
+        return [await client.search("a"), await client.search("b")]
+
+    assert run(client, search_twice()) == [{"replica": "rag-a"}, {"replica": "rag-b"}]
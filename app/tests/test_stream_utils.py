@@ -0,0 +1,137 @@
+import asyncio
+import json
+
+import pytest
+
+from utils.stream_utils import StopSequenceMatcher, coalesce_tokens, format_sse, get_stop_sequences
+
+
+async def token_stream(tokens, delays=None, closed=None):
+    try:
+        for i, token in enumerate(tokens):
+            if delays:
+                await asyncio.sleep(delays[i])
+            yield token
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+async def collect(stream):
+    return [frame async for frame in stream]
+
+
+def test_first_token_is_sent_alone_and_burst_is_coalesced():
+    frames = asyncio.run(collect(coalesce_tokens(token_stream(["Mer", "ha", "ba", " dü", "nya"]), max_delay_ms=1000)))
+
+    assert frames == ["Mer", "haba dünya"]
+
+
+def test_flushes_when_buffer_reaches_max_chars():
+    frames = asyncio.run(collect(coalesce_tokens(token_stream(["a", "bb", "cc", "dd", "e"]), max_delay_ms=1000, max_chars=4)))
+
+    assert frames == ["a", "bbcc", "dde"]
+
+
+def test_slow_tokens_are_not_delayed():
+    tokens = ["bir", " iki", " üç"]
+    frames = asyncio.run(collect(coalesce_tokens(token_stream(tokens, delays=[0, 0.05, 0.05]), max_delay_ms=10)))
+
+    assert frames == tokens
+
+
+def test_buffer_is_flushed_when_model_pauses():
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        frames = []
+        async for frame in coalesce_tokens(token_stream(["a", "b", "c", "d"], delays=[0, 0, 0, 0.3]), max_delay_ms=20):
+            frames.append((frame, loop.time() - started))
+        return frames
+
+    frames = asyncio.run(main())
+
+    assert [frame for frame, _ in frames] == ["a", "bc", "d"]
+    # "bc" modelin duraksaması bitmeden zamanlayıcı ile gönderilir
+    assert frames[1][1] < 0.2
+
+
+def test_empty_tokens_are_dropped():
+    frames = asyncio.run(collect(coalesce_tokens(token_stream(["", "a", "", "b"]), max_delay_ms=1000)))
+
+    assert "".join(frames) == "ab"
+    assert "" not in frames
+
+
+def test_closing_early_closes_source():
+    closed = []
+
+    async def main():
+        stream = coalesce_tokens(token_stream(["a", "b", "c"], delays=[0, 0.05, 0.05], closed=closed), max_delay_ms=1)
+        async for frame in stream:
+            await stream.aclose()
+            return frame
+
+    assert asyncio.run(main()) == "a"
+    assert closed == [True]
+
+
+def test_format_sse():
+    frame = format_sse("token", {"text": "ateş\nvar"})
+
+    event, data, blank = frame.split("\n", 2)
+    assert event == "event: token"
+    assert json.loads(data.removeprefix("data: ")) == {"text": "ateş\nvar"}
+    assert blank == "\n"
+
+
+def feed_all(matcher, tokens):
+    return "".join(matcher.feed(token) for token in tokens) + matcher.flush()
+
+
+@pytest.mark.parametrize("tokens", [
+    ["Tanı: grip.", "<hasta>", " ateşim var"],
+    ["Tanı: grip.", "<has", "ta> ateşim var"],
+    ["Tanı: grip.<", "h", "a", "s", "t", "a", ">", " ateşim var"],
+    ["Tanı: grip.<hasta> ateşim var"],
+])
+def test_stop_sequence_split_across_tokens(tokens):
+    matcher = StopSequenceMatcher(["<hasta>", "<bağlam>"])
+
+    assert feed_all(matcher, tokens) == "Tanı: grip."
+    assert matcher.stopped
+
+
+def test_partial_prefix_is_released_when_it_does_not_match():
+    matcher = StopSequenceMatcher(["<hasta>"])
+
+    assert matcher.feed("a <ha") == "a "
+    assert matcher.feed("li") == "<hali"
+    assert feed_all(matcher, [" iyi"]) == " iyi"
+    assert not matcher.stopped
+
+
+def test_held_prefix_is_flushed_at_end_of_stream():
+    matcher = StopSequenceMatcher(["<hasta>"])
+
+    assert feed_all(matcher, ["sonuç <has"]) == "sonuç <has"
+
+
+def test_earliest_stop_sequence_wins():
+    matcher = StopSequenceMatcher(["<bağlam>", "<hasta>"])
+
+    assert feed_all(matcher, ["cevap<has", "ta> ve <bağlam>"]) == "cevap"
+
+
+def test_nothing_is_emitted_after_stop():
+    matcher = StopSequenceMatcher(["STOP"])
+
+    assert matcher.feed("bitti STOP") == "bitti "
+    assert matcher.feed(" devam") == ""
+    assert matcher.flush() == ""
+
+
+def test_get_stop_sequences_adds_configured_sequences(monkeypatch):
+    monkeypatch.setenv("CHAT_STOP_SEQUENCES", " ### , <hasta>,,")
+
+    assert get_stop_sequences() == ["<hasta>", "<bağlam>", "###"]
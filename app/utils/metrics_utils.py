@@ -0,0 +1,49 @@
+from prometheus_client import CollectorRegistry
+from prometheus_client.core import GaugeMetricFamily
+from typing import Callable, Dict, Iterable, Tuple
+import logging
+
+# Saniye cinsinden gecikme kovaları (5 ms - 60 s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2000, 4000, 8000)
+
+
+class StatsCollector:
+    """
+    Scrape anında (ad, açıklama, etiketler, değer) dörtlülerini gauge olarak ekleyen prometheus_client collector'ı.
+    Hata veren collector (ör. henüz oluşturulmamış bir client) o scrape'te atlanır.
+    """
+
+    def __init__(self, name: str, collect_samples: Callable[[], Iterable[Tuple[str, str, dict, float]]]):
+        self.name = name
+        self.collect_samples = collect_samples
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        try:
+            samples = list(self.collect_samples())
+        except Exception as e:
+            logging.debug(f"Metrics collector {self.name} skipped: {e}")
+            return
+        families: Dict[str, GaugeMetricFamily] = {}
+        for name, documentation, labels, value in samples:
+            if value is None:
+                continue
+            family = families.get(name)
+            if family is None:
+                family = families[name] = GaugeMetricFamily(name, documentation, labels=list(labels))
+            family.add_metric([str(label) for label in labels.values()], float(value))
+        yield from families.values()
+
+
+registry = CollectorRegistry()
+
+
+def register_collector(name: str, collect_samples: Callable[[], Iterable[Tuple[str, str, dict, float]]]):
+    registry.register(StatsCollector(name, collect_samples))
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    return registry
@@ -0,0 +1,215 @@
+from prometheus_client import Histogram
+from utils.metrics_utils import LATENCY_BUCKETS, get_metrics_registry
+from typing import List, Optional
+import asyncio
+import httpx
+import itertools
+import logging
+import os
+import random
+import time
+
+# RAG servisinin geçici durumlarını (doygun kuyruk, açılış, gateway) belirten kodlar tekrar denenir
+RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+
+REQUEST_SECONDS = Histogram(
+    "app_rag_request_duration_seconds", "Duration of single HTTP attempts against RAG replicas.", ["replica", "outcome"],
+    buckets=LATENCY_BUCKETS, registry=get_metrics_registry(),
+)
+
+
+class RagRetryableStatus(RuntimeError):
+    """
+    RAG replikası tekrar denenebilir bir HTTP kodu döndüğünde fırlatılır.
+    """
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"RAG replica {response.request.url} returned {response.status_code}")
+        self.response = response
+
+
+class RagClient:
+    """
+    RAG servisine uygulama ömrü boyunca açık kalan, keep-alive havuzlu tek bir httpx.AsyncClient üzerinden istek atar.
+    Replikalar arasında round-robin yapılır; bağlantı hataları ve geçici HTTP kodları jitter'lı üstel geri çekilme
+    ile sınırlı sayıda tekrar denenir. hedge_after_ms > 0 ve birden fazla replika varsa, ilk istek bu süre içinde
+    dönmezse sıradaki replikaya ikinci (hedge) istek gönderilir; ilk başarılı cevap kullanılır, diğeri iptal edilir.
+    """
+
+    def __init__(self, urls: List[str], timeout: float = 10.0, connect_timeout: float = 2.0,
+                 max_connections: int = 100, max_keepalive_connections: int = 20, keepalive_expiry: float = 30.0,
+                 retries: int = 2, backoff_ms: float = 50.0, backoff_max_ms: float = 1000.0, hedge_after_ms: float = 0.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        if not urls:
+            raise ValueError("At least one RAG URL is required.")
+        self.urls = [url.rstrip("/") for url in urls]
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.retries = max(0, retries)
+        self.backoff = backoff_ms / 1000
+        self.backoff_max = backoff_max_ms / 1000
+        self.hedge_after = hedge_after_ms / 1000
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            transport=transport,
+        )
+        self._next_replica = itertools.count()
+        # Sayaçlar yalnızca event loop'tan güncellenir
+        self.in_flight = 0
+        self.requests = 0
+        self.attempts = 0
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    def _replica_order(self) -> List[str]:
+        start = next(self._next_replica) % len(self.urls)
+        return self.urls[start:] + self.urls[:start]
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        # Full jitter: [0, min(üst sınır, taban x 2^deneme)]
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (attempt - 1)))
+        if isinstance(error, RagRetryableStatus):
+            retry_after = error.response.headers.get("Retry-After")
+            if retry_after is not None and retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+        return delay
+
+    async def _attempt(self, url: str, path: str, payload: dict):
+        self.attempts += 1
+        self.in_flight += 1
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._client.post(f"{url}{path}", json=payload)
+            outcome = str(response.status_code)
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise RagRetryableStatus(response)
+            response.raise_for_status()
+            return response.json()
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            self.in_flight -= 1
+            REQUEST_SECONDS.labels(url, outcome).observe(time.perf_counter() - started)
+
+    async def _hedged_attempt(self, replicas: List[str], path: str, payload: dict):
+        if self.hedge_after <= 0 or len(replicas) < 2:
+            return await self._attempt(replicas[0], path, payload)
+        primary = asyncio.create_task(self._attempt(replicas[0], path, payload))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done:
+                self.hedged += 1
+                tasks.add(asyncio.create_task(self._attempt(replicas[1], path, payload)))
+            error = None
+            pending = tasks
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Kaybeden (veya çağıran iptal edildiyse tüm) istekleri iptal et; bağlantılar havuza döner
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def post(self, path: str, payload: dict):
+        """
+        payload'ı JSON olarak gönderir ve cevabın JSON gövdesini döner. Tekrar denenemeyen HTTP hataları
+        (4xx, 500) hemen, tekrar denenebilenler deneme hakkı bitince son hata ile fırlatılır.
+        """
+        self.requests += 1
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                await asyncio.sleep(self._backoff_delay(attempt, last_error))
+            try:
+                return await self._hedged_attempt(self._replica_order(), path, payload)
+            except (httpx.TransportError, RagRetryableStatus) as e:
+                last_error = e
+                logging.warning(f"RAG request failed (attempt {attempt + 1}/{self.retries + 1}): {e}")
+            except Exception:
+                self.failures += 1
+                raise
+        self.failures += 1
+        raise last_error
+
+    async def search(self, query: str, top_k: int = 5):
+        return await self.post("/rag/search", {"query": query, "top_k": top_k})
+
+    def stats(self) -> dict:
+        # httpx havuz durumunu herkese açık bir API ile vermez; httpcore havuzu yoksa yalnızca sayaçlar döner
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", None) or [])
+        return {
+            "replicas": len(self.urls),
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "connections": len(connections),
+            "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "retries": self.retried,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failures": self.failures,
+        }
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class RagClientFactory:
+    _client: Optional[RagClient] = None
+
+    @classmethod
+    def create_client(cls) -> RagClient:
+        """
+        RAG client'ını ortam değişkenlerinden oluşturur ve singleton olarak kaydeder.
+        RAG_URLS virgülle ayrılmış replika adresleridir.
+        """
+        if cls._client is None:
+            urls = [url.strip() for url in os.getenv("RAG_URLS", "http://rag_server:8001").split(",") if url.strip()]
+            cls._client = RagClient(
+                urls=urls,
+                timeout=float(os.getenv("RAG_TIMEOUT_S", "10")),
+                connect_timeout=float(os.getenv("RAG_CONNECT_TIMEOUT_S", "2")),
+                max_connections=int(os.getenv("RAG_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("RAG_MAX_KEEPALIVE_CONNECTIONS", "20")),
+                keepalive_expiry=float(os.getenv("RAG_KEEPALIVE_EXPIRY_S", "30")),
+                retries=int(os.getenv("RAG_RETRIES", "2")),
+                backoff_ms=float(os.getenv("RAG_RETRY_BACKOFF_MS", "50")),
+                backoff_max_ms=float(os.getenv("RAG_RETRY_BACKOFF_MAX_MS", "1000")),
+                hedge_after_ms=float(os.getenv("RAG_HEDGE_AFTER_MS", "0")),
+            )
+            logging.info(f"RAG client oluşturuldu: replicas={urls}, hedge_after_ms={cls._client.hedge_after * 1000:.0f}")
+        return cls._client
+
+    @classmethod
+    def get_client(cls) -> RagClient:
+        if cls._client is None:
+            raise RuntimeError("RAG client bulunamadı! Önce create_client çağırın.")
+        return cls._client
+
+    @classmethod
+    async def close_client(cls):
+        if cls._client is not None:
+            await cls._client.close()
+            cls._client = None
+            logging.info("RAG client kapatıldı.")
@@ -0,0 +1,182 @@
+from typing import AsyncIterator, List
+import asyncio
+import json
+import os
+import time
+
+DEFAULT_STOP_SEQUENCES = ["<hasta>", "<bağlam>"]
+
+
+def get_flush_settings() -> dict:
+    return {
+        "max_delay_ms": float(os.getenv("CHAT_FLUSH_INTERVAL_MS", "25")),
+        "max_chars": int(os.getenv("CHAT_FLUSH_MAX_CHARS", "64")),
+    }
+
+
+async def coalesce_tokens(tokens: AsyncIterator[str], max_delay_ms: float = 25.0, max_chars: int = 64) -> AsyncIterator[str]:
+    """
+    Token'ları frame'lerde birleştirir. Son frame'den bu yana max_delay_ms geçmişse gelen token beklemeden
+    gönderilir; böylece ilk token (hızlı TTFT) ve yavaş üretilen token'lar gecikmez. Hızlı gelen token'lar
+    tamponda toplanır ve tampondaki ilk token'dan bu yana max_delay_ms geçtiğinde veya tampon max_chars
+    karaktere ulaştığında tek frame olarak gönderilir. Model duraksarsa tampon zamanlayıcı ile boşaltılır.
+    """
+    loop = asyncio.get_running_loop()
+    max_delay = max_delay_ms / 1000
+    iterator = tokens.__aiter__()
+    next_token = asyncio.ensure_future(iterator.__anext__())
+    buffer, size, deadline, last_flush = [], 0, None, float("-inf")
+    try:
+        while True:
+            timeout = max(0.0, deadline - loop.time()) if buffer else None
+            done, _ = await asyncio.wait({next_token}, timeout=timeout)
+            if not done:
+                last_flush = loop.time()
+                yield "".join(buffer)
+                buffer, size = [], 0
+                continue
+            try:
+                token = next_token.result()
+            except StopAsyncIteration:
+                break
+            next_token = asyncio.ensure_future(iterator.__anext__())
+            if not token:
+                continue
+            buffer.append(token)
+            size += len(token)
+            now = loop.time()
+            if size >= max_chars or (len(buffer) == 1 and now - last_flush >= max_delay):
+                last_flush = now
+                yield "".join(buffer)
+                buffer, size = [], 0
+            elif len(buffer) == 1:
+                deadline = now + max_delay
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        # Erken çıkışta (hata, istemci kopması) bekleyen okumayı iptal et ve kaynak akışı kapat
+        if not next_token.done():
+            next_token.cancel()
+            await asyncio.wait({next_token})
+        if not next_token.cancelled():
+            next_token.exception()
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def format_sse(event: str, data: dict) -> str:
+    """
+    Server-Sent Events frame'i; data tek satır JSON'dur.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def get_stop_sequences() -> List[str]:
+    """
+    Sohbet modelinin üretimi keseceği diziler: modelin uydurduğu bir sonraki hasta turu ve bağlam etiketi her zaman,
+    CHAT_STOP_SEQUENCES ile verilen (virgülle ayrılmış) diziler ek olarak.
+    """
+    extra = [sequence.strip() for sequence in os.getenv("CHAT_STOP_SEQUENCES", "").split(",") if sequence.strip()]
+    return list(dict.fromkeys(DEFAULT_STOP_SEQUENCES + extra))
+
+
+class StopSequenceMatcher:
+    """
+    Akış tarafında stop dizilerini token sınırlarından bağımsız yakalar. feed() güvenle gönderilebilecek metni döner;
+    bir stop dizisinin başlangıcı olabilecek son ek, sonraki token'lar belli olana kadar tutulur. Dizi bulunduğunda
+    stopped True olur ve dizinin öncesi döner. Akış bitince tutulan metin flush() ile alınır.
+    """
+
+    def __init__(self, stop_sequences: List[str]):
+        self.stop_sequences = [sequence for sequence in stop_sequences if sequence]
+        self.stopped = False
+        self._pending = ""
+
+    def _held_suffix_length(self, text: str) -> int:
+        held = 0
+        for sequence in self.stop_sequences:
+            for length in range(min(len(sequence) - 1, len(text)), held, -1):
+                if text.endswith(sequence[:length]):
+                    held = length
+                    break
+        return held
+
+    def feed(self, token: str) -> str:
+        if self.stopped:
+            return ""
+        text = self._pending + token
+        positions = [text.find(sequence) for sequence in self.stop_sequences]
+        positions = [position for position in positions if position >= 0]
+        if positions:
+            self.stopped = True
+            self._pending = ""
+            return text[:min(positions)]
+        held = self._held_suffix_length(text)
+        self._pending = text[len(text) - held:] if held else ""
+        return text[:len(text) - held]
+
+    def flush(self) -> str:
+        text, self._pending = self._pending, ""
+        return "" if self.stopped else text
+
+
+class TokenCounter:
+    """
+    Bir token akışından geçen token sayısını sayar; iptal edilen isteklerde ne kadar üretildiğini raporlamak içindir.
+    """
+
+    def __init__(self):
+        self.tokens = 0
+
+    async def count(self, tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+        async for token in tokens:
+            self.tokens += 1
+            yield token
+
+
+async def wait_for_disconnect(receive):
+    # Gövde okunduktan sonra receive() yalnızca istemci bağlantıyı kapattığında http.disconnect döner
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(receive, stream: AsyncIterator[str], on_disconnect=None) -> AsyncIterator[str]:
+    """
+    stream'den okurken istemci bağlantısını izler. İstemci koptuğunda (veya yanıt görevi iptal edildiğinde)
+    bekleyen okuma iptal edilir; iptal akış zinciri boyunca Ollama HTTP isteğine kadar iner ve bağlantıyı kapatır.
+    on_disconnect, kopmadan upstream kapanana kadar geçen saniye ile çağrılır.
+    """
+    iterator = stream.__aiter__()
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    next_item = None
+    detected_at = None
+    try:
+        while True:
+            next_item = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait({next_item, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if next_item not in done:
+                detected_at = time.perf_counter()
+                return
+            try:
+                item = next_item.result()
+            except StopAsyncIteration:
+                return
+            yield item
+    except asyncio.CancelledError:
+        detected_at = time.perf_counter()
+        raise
+    finally:
+        disconnected.cancel()
+        if next_item is not None and not next_item.done():
+            # İptal isteği senkron verilir; bekleme yarıda kalsa bile upstream iptal edilir
+            next_item.cancel()
+            try:
+                await asyncio.wait({next_item})
+            finally:
+                if detected_at is not None and on_disconnect is not None:
+                    on_disconnect(time.perf_counter() - detected_at)
+        elif detected_at is not None and on_disconnect is not None:
+            on_disconnect(time.perf_counter() - detected_at)
@@ -0,0 +1,68 @@
+"""
+Chunking throughput benchmark'ı.
+
+Mevcut split_text_on_tokens (tüm dokümanı encode edip her pencereyi decode eder) ile offset mapping
+kullanan iter_offset_chunks'ı aynı dosya üzerinde MB/s cinsinden karşılaştırır. Ayrıca kaç chunk'ın
+kaynak metnin birebir alt dizisi olduğunu (round-trip) raporlar.
+
+Kullanım (rag dizininden):
+    python -m benchmarks.bench_chunking --file /path/to/document.txt --repeats 3
+"""
+from services.vector_service import split_text_on_tokens
+from transformers import AutoTokenizer
+from utils.chunk_utils import iter_offset_chunks
+from utils.stream_utils import iter_text_blocks
+import argparse
+import os
+import statistics
+import time
+
+
+def run(fn, repeats):
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        chunks = fn()
+        durations.append(time.perf_counter() - started)
+    return chunks, statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", required=True)
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--overlap", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    model_name = os.getenv("EMBEDDING_MODEL_NAME")
+    model_path = f"/app/embedding_models/{model_name}"
+    tokenizer = AutoTokenizer.from_pretrained(model_path if os.path.exists(model_path) else model_name)
+    with open(args.file, "r", encoding="utf-8") as file:
+        text = file.read()
+    size_mb = len(text.encode("utf-8")) / (1024 * 1024)
+
+    def stream_chunks(boundary_mode):
+        with open(args.file, "rb") as file:
+            return list(iter_offset_chunks(
+                iter_text_blocks(file), tokenizer=tokenizer, chunk_size=args.chunk_size,
+                chunk_overlap=args.overlap, boundary_mode=boundary_mode,
+            ))
+
+    candidates = {
+        "decode": lambda: split_text_on_tokens(
+            text=text, tokenizer=tokenizer, chunk_size=args.chunk_size, chunk_overlap=args.overlap
+        ),
+        "offset": lambda: stream_chunks("none"),
+        "offset+sentence": lambda: stream_chunks("sentence"),
+        "offset+paragraph": lambda: stream_chunks("paragraph"),
+    }
+    print(f"{'chunker':>18} {'MB/s':>8} {'chunks':>8} {'exact_slices':>13}")
+    for name, fn in candidates.items():
+        chunks, duration = run(fn, args.repeats)
+        exact = sum(1 for chunk in chunks if chunk in text) / len(chunks) if chunks else 0.0
+        print(f"{name:>18} {size_mb / duration:>8.2f} {len(chunks):>8} {exact:>13.1%}")
+
+
+if __name__ == "__main__":
+    main()
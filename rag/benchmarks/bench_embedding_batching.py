@@ -0,0 +1,93 @@
+"""
+Sorgu embedding'i için micro-batching benchmark'ı.
+
+Eşzamanlı istemcileri thread'lerle simüle eder ve batch penceresine (max_wait_ms) göre
+QPS ve p99 gecikmesini raporlar. "off" satırı, her sorgunun ayrı bir encode çağrısı
+yaptığı mevcut davranıştır.
+
+Kullanım (rag dizininden):
+    python -m benchmarks.bench_embedding_batching --concurrency 32 --duration 10 --windows 0,1,2,5,10
+"""
+from concurrent.futures import ThreadPoolExecutor
+from utils.batching_utils import EmbeddingBatcher
+from utils.model_utils import load_embedding_model, unload_embedding_model
+import argparse
+import statistics
+import threading
+import time
+
+QUERIES = [
+    "Üç gündür süren ateş ve boğaz ağrısı",
+    "Göğüs ağrısı sol kola yayılıyor",
+    "Sabahları baş dönmesi ve bulantı",
+    "Çocukta döküntü ve yüksek ateş",
+    "Uzun süren kuru öksürük ve nefes darlığı",
+    "Karın sağ alt bölgesinde şiddetli ağrı",
+    "Sık idrara çıkma ve aşırı susama",
+    "Dizlerde şişlik ve sabah tutukluğu",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_load(encode, concurrency: int, duration: float):
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(worker_id: int):
+        local = []
+        i = worker_id
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            encode(QUERIES[i % len(QUERIES)])
+            local.append(time.perf_counter() - started)
+            i += 1
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--windows", default="0,1,2,5,10", help="Virgülle ayrılmış max_wait_ms değerleri")
+    args = parser.parse_args()
+
+    model = load_embedding_model()
+    # Isınma: ilk forward pass'in maliyeti ölçümlere karışmasın
+    model.encode(QUERIES)
+
+    print(f"{'window_ms':>10} {'qps':>10} {'p50_ms':>10} {'p99_ms':>10} {'avg_batch':>10}")
+    qps, latencies = run_load(model.encode, args.concurrency, args.duration)
+    print(f"{'off':>10} {qps:>10.1f} {statistics.median(latencies) * 1000:>10.1f} "
+          f"{percentile(latencies, 99) * 1000:>10.1f} {1.0:>10.1f}")
+
+    for window in [float(w) for w in args.windows.split(",")]:
+        batcher = EmbeddingBatcher(model, max_batch_size=args.max_batch_size, max_wait_ms=window).start()
+        try:
+            qps, latencies = run_load(batcher.encode, args.concurrency, args.duration)
+        finally:
+            batcher.stop()
+        avg_batch = batcher.items / batcher.batches if batcher.batches else 0.0
+        print(f"{window:>10g} {qps:>10.1f} {statistics.median(latencies) * 1000:>10.1f} "
+              f"{percentile(latencies, 99) * 1000:>10.1f} {avg_batch:>10.1f}")
+
+    unload_embedding_model()
+
+
+if __name__ == "__main__":
+    main()
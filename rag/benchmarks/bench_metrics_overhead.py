@@ -0,0 +1,62 @@
+"""
+Metrik kaydının sıcak yola eklediği maliyet.
+
+observe_stage, time_stage ve time_iter çağrılarının çağrı başına süresini tek thread'de ve eşzamanlı
+thread'lerle ölçer; ayrıca dolu bir registry'nin render süresini raporlar. Model veya Weaviate gerekmez.
+
+Kullanım (rag dizininden):
+    python -m benchmarks.bench_metrics_overhead --calls 200000 --threads 1,4,16
+"""
+from concurrent.futures import ThreadPoolExecutor
+from prometheus_client import generate_latest
+from utils.metrics_utils import get_metrics_registry, observe_stage, time_iter, time_stage
+import argparse
+import time
+
+
+def per_call_ns(fn, calls: int, threads: int) -> float:
+    per_thread = calls // threads
+
+    def worker(_):
+        for _ in range(per_thread):
+            fn()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+    return (time.perf_counter() - started) / (per_thread * threads) * 1e9
+
+
+def timed_block():
+    with time_stage("bench_block", batch_size=8):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--threads", default="1,4,16")
+    args = parser.parse_args()
+
+    cases = {
+        "baseline (empty call)": lambda: None,
+        "observe_stage": lambda: observe_stage("bench_observe", 0.004),
+        "observe_stage + batch + tokens": lambda: observe_stage("bench_full", 0.004, batch_size=16, tokens=2048),
+        "time_stage": timed_block,
+    }
+    print(f"{'case':>32} {'threads':>8} {'ns/call':>10}")
+    for threads in [int(value) for value in args.threads.split(",")]:
+        for name, fn in cases.items():
+            print(f"{name:>32} {threads:>8} {per_call_ns(fn, args.calls, threads):>10.0f}")
+
+    started = time.perf_counter()
+    consumed = sum(1 for _ in time_iter(range(args.calls), "bench_iter"))
+    print(f"{'time_iter':>32} {1:>8} {(time.perf_counter() - started) / consumed * 1e9:>10.0f}")
+
+    started = time.perf_counter()
+    body = generate_latest(get_metrics_registry())
+    print(f"render: {(time.perf_counter() - started) * 1000:.2f} ms, {len(body.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
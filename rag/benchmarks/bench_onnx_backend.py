@@ -0,0 +1,72 @@
+"""
+ONNX Runtime backend'i için parity kontrolü ve gecikme benchmark'ı.
+
+torch ve onnx backend'leriyle aynı embedding ve reranker modellerini oluşturur, aynı girdiler
+üzerinde çıktıları karşılaştırır ve batch boyutuna göre medyan gecikmeyi raporlar.
+Parity eşikleri aşılırsa script sıfırdan farklı bir kodla çıkar.
+
+Kullanım (rag dizininden):
+    python -m benchmarks.bench_onnx_backend --batch-sizes 1,8,32 --repeats 10
+"""
+from benchmarks.bench_precision import QUERY_SET, timed
+from services.rerank_service import score_pairs
+from utils.model_utils import build_embedding_model, build_reranker_model
+import argparse
+import os
+import sys
+import numpy as np
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--min-cosine", type=float, default=0.999)
+    parser.add_argument("--max-score-diff", type=float, default=0.05)
+    args = parser.parse_args()
+
+    embedding_models = {
+        backend: build_embedding_model(os.getenv("EMBEDDING_MODEL_NAME"), backend=backend)
+        for backend in ("torch", "onnx")
+    }
+    rerankers = {
+        backend: build_reranker_model(os.getenv("RERANKER_MODEL_NAME"), backend=backend)
+        for backend in ("torch", "onnx")
+    }
+
+    # Parity: aynı girdiler için iki backend'in çıktıları
+    texts = [query for query, _ in QUERY_SET] + [p for _, passages in QUERY_SET for p in passages]
+    pairs = [(query, passage) for query, passages in QUERY_SET for passage in passages]
+    embeddings = {
+        backend: np.asarray(model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+        for backend, model in embedding_models.items()
+    }
+    scores = {backend: np.asarray(score_pairs(model, pairs)) for backend, model in rerankers.items()}
+    min_cosine = float(np.min(np.sum(embeddings["torch"] * embeddings["onnx"], axis=1)))
+    max_score_diff = float(np.max(np.abs(scores["torch"] - scores["onnx"])))
+    print(f"parity: min embedding cosine={min_cosine:.6f}, max rerank score diff={max_score_diff:.6f}")
+
+    print(f"{'batch':>6} {'stage':>10} {'torch_ms':>10} {'onnx_ms':>10} {'speedup':>8}")
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        batch_texts = (texts * (batch_size // len(texts) + 1))[:batch_size]
+        batch_pairs = (pairs * (batch_size // len(pairs) + 1))[:batch_size]
+        embed_ms = {
+            backend: timed(lambda: model.encode(batch_texts), args.repeats)[1]
+            for backend, model in embedding_models.items()
+        }
+        rerank_ms = {
+            backend: timed(lambda: score_pairs(model, batch_pairs), args.repeats)[1]
+            for backend, model in rerankers.items()
+        }
+        for stage, latency in (("embed", embed_ms), ("rerank", rerank_ms)):
+            print(f"{batch_size:>6} {stage:>10} {latency['torch']:>10.1f} {latency['onnx']:>10.1f} "
+                  f"{latency['torch'] / latency['onnx']:>8.2f}")
+
+    if min_cosine < args.min_cosine or max_score_diff > args.max_score_diff:
+        print("parity check FAILED", file=sys.stderr)
+        sys.exit(1)
+    print("parity check passed")
+
+
+if __name__ == "__main__":
+    main()
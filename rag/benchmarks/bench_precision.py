@@ -0,0 +1,160 @@
+"""
+Hassasiyet modları (fp32, bf16, int8) için doğruluk ve gecikme kontrolü.
+
+Sabit bir sorgu/pasaj kümesinde her modun reranker skorlarını ve embedding'lerini fp32
+referansıyla karşılaştırır: skor farkı, sorgu başına Spearman sıra korelasyonu, top-1
+uyumu, embedding kosinüs benzerliği ve medyan gecikme raporlanır. Bir mod PRECISION_THRESHOLDS'taki
+uyum eşiklerinin altında kalırsa script sıfırdan farklı bir kodla çıkar.
+
+Kullanım (rag dizininden):
+    python -m benchmarks.bench_precision --modes bf16,int8 --repeats 5
+"""
+from services.rerank_service import score_pairs
+from utils.model_utils import apply_precision, load_embedding_model, load_reranker_model
+import argparse
+import copy
+import os
+import statistics
+import sys
+import time
+import numpy as np
+
+# Sabit değerlendirme kümesi: her sorgu için ilk pasaj en ilgili olandır
+QUERY_SET = [
+    ("Üç gündür süren ateş ve boğaz ağrısı", [
+        "Akut tonsillit, ateş, boğaz ağrısı ve yutma güçlüğü ile seyreden bademcik iltihabıdır.",
+        "Soğuk algınlığı çoğunlukla burun akıntısı ve hapşırma ile başlar.",
+        "Migren, tek taraflı zonklayıcı baş ağrısı ile karakterizedir.",
+        "Gastrit mide mukozasının iltihabıdır ve hazımsızlığa yol açabilir.",
+        "Kırıklarda ilk yardım, etkilenen bölgenin sabitlenmesini içerir.",
+    ]),
+    ("Göğüs ağrısı sol kola yayılıyor", [
+        "Miyokard enfarktüsünde göğüs ağrısı sıklıkla sol kola ve çeneye yayılır.",
+        "Kostokondrit, göğüs duvarında basmakla artan ağrıya neden olur.",
+        "Reflü hastalığında yanma hissi göğüs kemiğinin arkasında hissedilir.",
+        "Anemi halsizlik ve çabuk yorulma ile kendini gösterebilir.",
+        "Egzama ciltte kaşıntılı ve kuru lezyonlara neden olur.",
+    ]),
+    ("Sık idrara çıkma ve aşırı susama", [
+        "Diabetes mellitusta poliüri ve polidipsi klasik belirtilerdir.",
+        "İdrar yolu enfeksiyonunda sık idrara çıkma ve yanma görülür.",
+        "Hipotiroidide kilo alma ve soğuğa tahammülsüzlük olur.",
+        "Astım nöbetlerinde hışıltılı solunum duyulur.",
+        "Sinüzitte yüzde dolgunluk hissi ve baş ağrısı olur.",
+    ]),
+    ("Karın sağ alt bölgesinde şiddetli ağrı ve ateş", [
+        "Akut apandisitte ağrı göbek çevresinde başlayıp sağ alt kadrana yerleşir.",
+        "Böbrek taşı yan ağrısı ve idrarda kan ile kendini gösterebilir.",
+        "Over kisti rüptürü alt karın ağrısına neden olabilir.",
+        "Konjonktivitte gözde kızarıklık ve akıntı olur.",
+        "Uykusuzluk gündüz yorgunluğuna yol açar.",
+    ]),
+    ("Dizlerde şişlik ve sabah tutukluğu", [
+        "Romatoid artritte sabah tutukluğu bir saatten uzun sürer ve eklemler şişer.",
+        "Osteoartritte eklem ağrısı hareketle artar ve dinlenmeyle azalır.",
+        "Gut hastalığında ayak başparmağında ani şişlik görülür.",
+        "Bronşit öksürük ve balgam çıkarma ile seyreder.",
+        "Akne ergenlikte sık görülen bir cilt hastalığıdır.",
+    ]),
+]
+
+# fp32 referansına göre modların sağlaması gereken en düşük uyum değerleri
+PRECISION_THRESHOLDS = {
+    "bf16": {"spearman": 0.95, "top1": 1.0, "min_cosine": 0.99},
+    "int8": {"spearman": 0.9, "top1": 0.8, "min_cosine": 0.98},
+}
+
+
+def spearman(a, b):
+    rank_a = np.argsort(np.argsort(a))
+    rank_b = np.argsort(np.argsort(b))
+    if np.std(rank_a) == 0 or np.std(rank_b) == 0:
+        return 1.0
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def timed(fn, repeats):
+    fn()
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        latencies.append(time.perf_counter() - started)
+    return result, statistics.median(latencies) * 1000
+
+
+def rerank_scores(model):
+    return [score_pairs(model, [(query, passage) for passage in passages]) for query, passages in QUERY_SET]
+
+
+def embed_all(model):
+    texts = [query for query, _ in QUERY_SET] + [p for _, passages in QUERY_SET for p in passages]
+    return np.asarray(model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+
+def with_precision(embedding_model, reranker, mode):
+    """
+    fp32 modellerin kopyalarını verilen hassasiyete çevirir; referans modeller değişmez.
+    """
+    mode_reranker = copy.copy(reranker)
+    mode_reranker.model = apply_precision(copy.deepcopy(reranker.model), mode)
+    mode_reranker.precision = mode
+    return apply_precision(copy.deepcopy(embedding_model), mode), mode_reranker
+
+
+def agreement(scores, reference_scores, embeddings, reference_embeddings) -> dict:
+    cosines = np.sum(embeddings * reference_embeddings, axis=1)
+    return {
+        "max_abs_diff": max(float(np.max(np.abs(np.asarray(s) - np.asarray(r)))) for s, r in zip(scores, reference_scores)),
+        "spearman": statistics.mean(spearman(s, r) for s, r in zip(scores, reference_scores)),
+        "top1": statistics.mean(float(np.argmax(s) == np.argmax(r)) for s, r in zip(scores, reference_scores)),
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+    }
+
+
+def failed_thresholds(mode: str, metrics: dict) -> list:
+    return [name for name, minimum in PRECISION_THRESHOLDS.get(mode, {}).items() if metrics[name] < minimum]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default="bf16,int8")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    # Referans modeller fp32 olarak yüklenir
+    os.environ["EMBEDDING_MODEL_PRECISION"] = "fp32"
+    os.environ["RERANKER_MODEL_PRECISION"] = "fp32"
+    embedding_model = load_embedding_model()
+    reranker = load_reranker_model()
+
+    reference_scores, reference_rerank_ms = timed(lambda: rerank_scores(reranker), args.repeats)
+    reference_embeddings, reference_embed_ms = timed(lambda: embed_all(embedding_model), args.repeats)
+
+    print(f"{'mode':>6} {'rerank_ms':>10} {'max_abs_diff':>13} {'spearman':>9} {'top1_agree':>11} "
+          f"{'embed_ms':>9} {'min_cos':>8} {'mean_cos':>9}")
+    print(f"{'fp32':>6} {reference_rerank_ms:>10.1f} {0.0:>13.4f} {1.0:>9.3f} {1.0:>11.2f} "
+          f"{reference_embed_ms:>9.1f} {1.0:>8.4f} {1.0:>9.4f}")
+
+    failures = {}
+    for mode in args.modes.split(","):
+        mode_embedding_model, mode_reranker = with_precision(embedding_model, reranker, mode)
+
+        scores, rerank_ms = timed(lambda: rerank_scores(mode_reranker), args.repeats)
+        embeddings, embed_ms = timed(lambda: embed_all(mode_embedding_model), args.repeats)
+
+        metrics = agreement(scores, reference_scores, embeddings, reference_embeddings)
+        print(f"{mode:>6} {rerank_ms:>10.1f} {metrics['max_abs_diff']:>13.4f} {metrics['spearman']:>9.3f} "
+              f"{metrics['top1']:>11.2f} {embed_ms:>9.1f} {metrics['min_cosine']:>8.4f} {metrics['mean_cosine']:>9.4f}")
+        if failed_thresholds(mode, metrics):
+            failures[mode] = failed_thresholds(mode, metrics)
+
+    if failures:
+        print(f"agreement check FAILED: {failures}", file=sys.stderr)
+        sys.exit(1)
+    print("agreement check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Rerank batching benchmark'ı.
+
+Eski davranış (tüm çiftler tek batch'te, en uzun çifte göre pad edilir, max_length yok) ile
+uzunluğa göre sıralanan, token bütçeli alt batch'lere bölünen score_pairs'i top_k=5, 20, 50
+için karşılaştırır. Her ölçüm ayrı bir process'te yapılır, böylece peak RSS birbirine karışmaz.
+
+Kullanım (rag dizininden):
+    python -m benchmarks.bench_rerank_batching --corpus /path/to/document.txt --repeats 10
+"""
+from multiprocessing import get_context
+from services.rerank_service import score_pairs
+from utils.model_utils import load_reranker_model
+import argparse
+import random
+import resource
+import statistics
+import time
+import torch
+
+QUERY = "Üç gündür süren ateş, boğaz ağrısı ve yutkunma güçlüğü"
+
+
+def load_contexts(corpus_path: str, count: int, seed: int = 13):
+    """
+    Corpus'tan farklı uzunluklarda bağlamlar üretir; gerçek aramalardaki 50-512 token arası chunk'ları taklit eder.
+    """
+    if corpus_path:
+        with open(corpus_path, "r", encoding="utf-8") as file:
+            words = file.read().split()
+    else:
+        words = ("Ateş vücut sıcaklığının normalin üzerine çıkmasıdır ve genellikle enfeksiyona işaret eder. " * 2000).split()
+    rng = random.Random(seed)
+    contexts = []
+    for _ in range(count):
+        length = rng.randint(40, 400)
+        start = rng.randint(0, max(0, len(words) - length))
+        contexts.append(" ".join(words[start:start + length]))
+    return contexts
+
+
+def padded_single_batch(model, pairs):
+    # Eski rerank_documents davranışı
+    with torch.no_grad():
+        inputs = model.tokenizer([list(pair) for pair in pairs], padding=True, truncation=True, return_tensors="pt")
+        inputs = {k: v.to(model.model.device) for k, v in inputs.items()}
+        return model.model(**inputs).logits.view(-1).float().tolist()
+
+
+def measure(mode: str, top_k: int, corpus_path: str, repeats: int):
+    model = load_reranker_model()
+    pairs = [(QUERY, context) for context in load_contexts(corpus_path, top_k)]
+    scorer = padded_single_batch if mode == "single" else score_pairs
+    scorer(model, pairs[:2])
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    latencies = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        scorer(model, pairs)
+        latencies.append(time.perf_counter() - started)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return statistics.median(latencies) * 1000, rss_after / 1024, (rss_after - rss_before) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=None, help="Bağlamların örnekleneceği düz metin dosyası")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--top-k", default="5,20,50")
+    args = parser.parse_args()
+
+    context = get_context("spawn")
+    print(f"{'top_k':>6} {'mode':>10} {'p50_ms':>10} {'peak_rss_mb':>12} {'rss_growth_mb':>14}")
+    for top_k in [int(k) for k in args.top_k.split(",")]:
+        for mode in ("single", "bucketed"):
+            with context.Pool(1) as pool:
+                latency, peak_rss, growth = pool.apply(measure, (mode, top_k, args.corpus, args.repeats))
+            print(f"{top_k:>6} {mode:>10} {latency:>10.1f} {peak_rss:>12.1f} {growth:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Rerank aday sayısı ve adaptif rerank politikası için kalite/gecikme eğrisi.
+
+Her sorgu için koleksiyondan en büyük candidate_k kadar aday bir kez getirilir; her konfigürasyon bu adayların
+hybrid sıralamasındaki ilk candidate_k tanesini kendi politikasıyla rerank eder. Referans, en büyük aday kümesinin
+tamamının rerank edilmesidir. Konfigürasyon başına medyan rerank gecikmesi, skorlanan çift ve token sayısı,
+atlanan/erken duran sorgu oranı ve referansa göre top_k örtüşmesi raporlanır.
+
+Kullanım (rag dizininden, koleksiyon dolu olmalı):
+    python -m benchmarks.bench_rerank_policy --top-k 5 --candidate-ks 5,10,20,50 --margins 0.1,0.2 --budgets 2048,4096
+"""
+from benchmarks.bench_embedding_batching import QUERIES
+from models.models import QueryRequest
+from services.rerank_service import adaptive_rerank
+from services.vector_service import search_documents
+from utils.batching_utils import load_embedding_batcher, unload_embedding_batcher
+from utils.cache_utils import create_embedding_cache, close_embedding_cache
+from utils.model_utils import load_embedding_model, load_reranker_model, get_reranker_model
+from utils.vector_store_utils import create_vector_store, close_vector_store
+import argparse
+import statistics
+import time
+
+
+def run_policy(model, candidate_sets, top_k, repeats, **policy):
+    latencies, scored, tokens, skipped, stopped, results = [], 0, 0, 0, 0, []
+    for query, candidates in candidate_sets:
+        durations = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            reranked, info = adaptive_rerank(model, query, [dict(c) for c in candidates], top_k=top_k, **policy)
+            durations.append(time.perf_counter() - started)
+        latencies.append(statistics.median(durations) * 1000)
+        scored += info["scored"]
+        tokens += info["tokens"]
+        skipped += info["skipped"]
+        stopped += info["stopped"] is not None
+        results.append([result["id"] for result in reranked])
+    count = len(candidate_sets)
+    return results, {
+        "p50_ms": statistics.median(latencies), "pairs": scored / count, "tokens": tokens / count,
+        "skipped": skipped / count, "stopped": stopped / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries-file", help="Satır başına bir sorgu; verilmezse yerleşik örnek sorgular kullanılır")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--candidate-ks", default="5,10,20,50")
+    parser.add_argument("--margins", default="0.1,0.2,0.3")
+    parser.add_argument("--budgets", default="2048,4096")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.queries_file:
+        with open(args.queries_file, "r", encoding="utf-8") as file:
+            queries = [line.strip() for line in file if line.strip()]
+    else:
+        queries = QUERIES
+    candidate_ks = [int(k) for k in args.candidate_ks.split(",")]
+    max_candidates = max(candidate_ks)
+
+    load_embedding_model()
+    load_reranker_model()
+    load_embedding_batcher()
+    create_embedding_cache()
+    create_vector_store()
+    try:
+        model = get_reranker_model()
+        candidate_sets = [
+            (query, search_documents(QueryRequest(query=query, top_k=args.top_k, candidate_k=max_candidates)))
+            for query in queries
+        ]
+        reference, _ = run_policy(model, candidate_sets, args.top_k, 1)
+
+        configs = [(f"candidate_k={k}", k, {}) for k in candidate_ks]
+        for margin in [float(m) for m in args.margins.split(",") if m]:
+            configs.append((f"skip_margin={margin}", max_candidates, {"skip_margin": margin}))
+            configs.append((f"stop_margin={margin}", max_candidates, {"stop_margin": margin}))
+        for budget in [int(b) for b in args.budgets.split(",") if b]:
+            configs.append((f"token_budget={budget}", max_candidates, {"token_budget": budget}))
+
+        print(f"{'config':>20} {'p50_ms':>8} {'pairs':>7} {'tokens':>8} {'skipped':>8} {'stopped':>8} {'overlap':>8}")
+        for name, k, policy in configs:
+            sliced = [(query, candidates[:k]) for query, candidates in candidate_sets]
+            results, stats = run_policy(model, sliced, args.top_k, args.repeats, **policy)
+            overlap = statistics.mean(
+                len(set(a) & set(b)) / max(1, len(b)) for a, b in zip(results, reference)
+            )
+            print(
+                f"{name:>20} {stats['p50_ms']:>8.1f} {stats['pairs']:>7.1f} {stats['tokens']:>8.0f} "
+                f"{stats['skipped']:>8.0%} {stats['stopped']:>8.0%} {overlap:>8.1%}"
+            )
+    finally:
+        close_vector_store()
+        unload_embedding_batcher()
+        close_embedding_cache()
+
+
+if __name__ == "__main__":
+    main()
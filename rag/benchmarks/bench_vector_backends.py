@@ -0,0 +1,78 @@
+"""
+Vektör veritabanı katmanı benchmark'ı: süreç içi LocalVectorStore ile Weaviate'in hybrid sorgusu.
+
+Her backend için geçici bir koleksiyona rastgele vektörler ve sentetik metinlerden oluşan bir korpus yazar,
+ardından aynı sorgularla hybrid_search gecikmesini (p50/p99) ve iki backend'in ilk top_k sonuçlarının
+örtüşmesini raporlar. Embedding modeli yüklenmez; sorgu vektörleri de rastgeledir.
+
+Kullanım (rag dizininden):
+    python -m benchmarks.bench_vector_backends --docs 20000 --dim 1024 --queries 200 --backends local,weaviate
+"""
+from benchmarks.bench_embedding_batching import QUERIES, percentile
+from utils.vector_store_utils import LocalVectorStore, WeaviateVectorStore
+import argparse
+import random
+import tempfile
+import time
+import uuid
+import numpy as np
+
+WORDS = " ".join(QUERIES).split()
+
+
+def build_corpus(docs: int, dim: int, seed: int):
+    rng = np.random.default_rng(seed)
+    words = random.Random(seed)
+    vectors = rng.standard_normal((docs, dim), dtype=np.float32)
+    contexts = [" ".join(words.choices(WORDS, k=words.randint(20, 120))) for _ in range(docs)]
+    ids = [str(uuid.UUID(int=words.getrandbits(128))) for _ in range(docs)]
+    return ids, contexts, vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=0.5)
+    parser.add_argument("--backends", default="local,weaviate")
+    parser.add_argument("--collection", default="BenchVectorBackends")
+    args = parser.parse_args()
+
+    ids, contexts, vectors = build_corpus(args.docs, args.dim, seed=0)
+    rng = np.random.default_rng(1)
+    queries = [(random.Random(i).choice(QUERIES), rng.standard_normal(args.dim).astype(np.float32)) for i in range(args.queries)]
+
+    top_results = {}
+    print(f"{'backend':>10} {'load_s':>8} {'p50_ms':>8} {'p99_ms':>8}")
+    for backend in args.backends.split(","):
+        store = LocalVectorStore(directory=tempfile.mkdtemp()) if backend == "local" else WeaviateVectorStore()
+        try:
+            store.create_collection(args.collection)
+            started = time.perf_counter()
+            with store.batch_writer(args.collection, batch_size=1000, concurrency=4) as batch:
+                for object_id, context, vector in zip(ids, contexts, vectors):
+                    batch.add_object(properties={"context": context}, vector=vector.tolist(), uuid=object_id)
+            load_seconds = time.perf_counter() - started
+
+            latencies, top_results[backend] = [], []
+            for query, vector in queries:
+                started = time.perf_counter()
+                results = store.hybrid_search(args.collection, query, vector, limit=args.top_k, alpha=args.alpha)
+                latencies.append((time.perf_counter() - started) * 1000)
+                top_results[backend].append({result["id"] for result in results})
+            print(f"{backend:>10} {load_seconds:>8.1f} {percentile(latencies, 50):>8.2f} {percentile(latencies, 99):>8.2f}")
+        finally:
+            if backend == "weaviate":
+                store.delete_ids(args.collection, ids)
+            store.close()
+
+    if len(top_results) == 2:
+        first, second = top_results.values()
+        overlap = np.mean([len(a & b) / max(1, len(a)) for a, b in zip(first, second)])
+        print(f"top-{args.top_k} overlap between backends: {overlap:.1%}")
+
+
+if __name__ == "__main__":
+    main()
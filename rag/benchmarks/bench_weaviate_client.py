@@ -0,0 +1,113 @@
+"""
+Weaviate hybrid sorguları için eşzamanlı yük testi: senkron client + worker thread'ler ile async client.
+
+Yerel bir Weaviate'e (ör. `docker run -p 8080:8080 -p 50051:50051 semitechnologies/weaviate`, WEAVIATE_HOST=localhost)
+geçici bir koleksiyon yazar. Ardından aynı sorgu kümesini iki yoldan gönderir: "sync", önceki davranış gibi her
+sorguyu INFERENCE_WORKERS kadar thread'den bloklayan client ile; "async", tek async client üzerinden event loop'tan
+eşzamanlı olarak. Her eşzamanlılık seviyesi için QPS, p50 ve p99 gecikmesi raporlanır.
+
+Kullanım (rag dizininden):
+    WEAVIATE_HOST=localhost python -m benchmarks.bench_weaviate_client --docs 20000 --concurrency 1,8,32,128 --duration 10
+"""
+from benchmarks.bench_embedding_batching import QUERIES, percentile
+from benchmarks.bench_vector_backends import build_corpus
+from concurrent.futures import ThreadPoolExecutor
+from utils.vector_store_utils import WeaviateVectorStore
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+import numpy as np
+
+
+def make_queries(count: int, dim: int):
+    rng = np.random.default_rng(1)
+    return [(random.Random(i).choice(QUERIES), rng.standard_normal(dim).astype(np.float32).tolist()) for i in range(count)]
+
+
+def run_sync(store, collection, queries, concurrency: int, workers: int, duration: float):
+    # İstemci sayısı kadar thread istek üretir, sorgular sınırlı sayıda worker'da bloklayarak çalışır
+    latencies, lock = [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    pool = ThreadPoolExecutor(max_workers=workers)
+
+    def client(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            query, vector = rng.choice(queries)
+            started = time.perf_counter()
+            pool.submit(store.hybrid_search, collection, query, vector, 20, 0.5).result()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.shutdown()
+    return latencies
+
+
+async def run_async(store, collection, queries, concurrency: int, duration: float):
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def client(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            query, vector = rng.choice(queries)
+            started = time.perf_counter()
+            await store.hybrid_search_async(collection, query, vector, 20, 0.5)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return latencies
+
+
+async def main_async(args):
+    ids, contexts, vectors = build_corpus(args.docs, args.dim, seed=0)
+    queries = make_queries(256, args.dim)
+    store = WeaviateVectorStore()
+    await store.open_async()
+    try:
+        store.create_collection(args.collection)
+        with store.batch_writer(args.collection, batch_size=1000, concurrency=4) as batch:
+            for object_id, context, vector in zip(ids, contexts, vectors):
+                batch.add_object(properties={"context": context}, vector=vector.tolist(), uuid=object_id)
+
+        workers = int(os.getenv("INFERENCE_WORKERS", "4"))
+        print(f"{'mode':>6} {'clients':>8} {'qps':>8} {'p50_ms':>8} {'p99_ms':>8}")
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            for mode in ("sync", "async"):
+                if mode == "sync":
+                    latencies = await asyncio.to_thread(
+                        run_sync, store, args.collection, queries, concurrency, workers, args.duration
+                    )
+                else:
+                    latencies = await run_async(store, args.collection, queries, concurrency, args.duration)
+                latencies_ms = [latency * 1000 for latency in latencies]
+                print(
+                    f"{mode:>6} {concurrency:>8} {len(latencies) / args.duration:>8.1f} "
+                    f"{percentile(latencies_ms, 50):>8.2f} {percentile(latencies_ms, 99):>8.2f}"
+                )
+    finally:
+        store.delete_ids(args.collection, ids)
+        await store.close_async()
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--collection", default="BenchWeaviateClient")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
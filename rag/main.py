@@ -1,8 +1,24 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from routers import search
+from routers import jobs
+from routers import health
+from routers import metrics
 from contextlib import asynccontextmanager
 from utils.model_utils import load_embedding_model, unload_embedding_model, load_reranker_model, unload_reranker_model
-from utils.vector_db_utils import create_client, create_collection, close_client_conection
+from utils.model_utils import warm_up_models
+from utils.startup_utils import start_startup, get_startup, stop_startup
+from utils.batching_utils import load_embedding_batcher, unload_embedding_batcher
+from utils.executor_utils import create_inference_executor, close_inference_executor
+from utils.admission_utils import create_admission_controller, close_admission_controller
+from utils.cache_utils import create_embedding_cache, close_embedding_cache
+from utils.cache_utils import create_result_cache, close_result_cache
+from utils.vector_store_utils import create_vector_store, close_vector_store
+from utils.vector_store_utils import open_async_vector_store, close_async_vector_store
+from utils.manifest_utils import create_document_manifest, close_document_manifest
+from utils.embedding_store import create_embedding_store, close_embedding_store
+from services.job_service import create_job_queue, close_job_queue
+import asyncio
 import logging 
 import os
 
@@ -16,31 +32,79 @@ logger = logging.getLogger(__name__)
 
 logger.info("This is an info message from rag container.")
 
+def open_vector_store(loop):
+    create_vector_store().create_collection(os.getenv("COLLECTION_NAME"))
+    # Async client uygulamanın event loop'una bağlı olmalıdır
+    asyncio.run_coroutine_threadsafe(open_async_vector_store(), loop).result()
+
+def startup_phases(loop):
+    """
+    Açılış aşamaları: modeller ve vektör veritabanı eşzamanlı yüklenir, ardından embedding batcher
+    başlatılır ve modeller ısıtılır, en son indeksleme kuyruğu açılır.
+    """
+    phases = [
+        [
+            ("embedding_model", load_embedding_model),
+            ("reranker_model", load_reranker_model),
+            ("vector_store", lambda: open_vector_store(loop)),
+        ],
+        [("embedding_batcher", load_embedding_batcher)],
+        [("job_queue", create_job_queue)],
+    ]
+    if os.getenv("STARTUP_WARMUP", "true").lower() == "true":
+        phases[1].append(("warm_up", warm_up_models))
+    return phases
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     FastAPI uygulaması başlatılırken modeli yükler ve weaviate collection olusturur, uygulama sonlandığında ise boşaltır.
+    Modeller ve Weaviate bağlantısı arka planda yüklenir; uygulama hemen canlı (live) olur, açılış bitene kadar
+    /rag uç noktaları 503 döner ve /health/ready hazır değildir.
     """
     try:
         logging.info("Starting lifespan context - loading model.")
-        load_embedding_model()  
-        load_reranker_model()
-        logging.info("Creating Weaviate client and collection.")
-        create_client()
-        create_collection(collection_name=os.getenv("COLLECTION_NAME"))
+        create_embedding_cache()
+        create_result_cache()
+        create_inference_executor()
+        create_admission_controller()
+        create_document_manifest()
+        create_embedding_store()
+        start_startup(startup_phases(asyncio.get_running_loop()))
         yield 
     except Exception as e:
         logging.error(f"Error during lifespan: {e}")
         raise e
     finally:
         logging.info("Ending lifespan context - unloading model.")
+        await asyncio.to_thread(stop_startup)
+        close_job_queue()
+        close_document_manifest()
+        close_embedding_store()
+        close_inference_executor()
+        close_admission_controller()
+        unload_embedding_batcher()
+        close_embedding_cache()
+        close_result_cache()
         unload_embedding_model() 
         unload_reranker_model()
-        close_client_conection()
+        await close_async_vector_store()
+        close_vector_store()
 
 app = FastAPI(title="RAG API", version="1.0.0", lifespan=lifespan)
 
+@app.middleware("http")
+async def readiness_gate(request: Request, call_next):
+    # Açılış tamamlanmadan gelen arama/indeksleme isteklerini modellere ulaşmadan reddet
+    startup = get_startup()
+    if request.url.path.startswith("/rag") and (startup is None or not startup.ready):
+        return JSONResponse(status_code=503, content={"detail": "Service is starting."}, headers={"Retry-After": "5"})
+    return await call_next(request)
+
+app.include_router(health.router, prefix="", tags=["Health"])
 app.include_router(search.router, prefix="", tags=["Rag"])
+app.include_router(jobs.router, prefix="", tags=["Jobs"])
+app.include_router(metrics.router, prefix="", tags=["Metrics"])
 
 @app.get("/")
 def root():
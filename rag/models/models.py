@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import List, Optional
 from fastapi import File, UploadFile
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 import os
@@ -8,6 +9,13 @@ class QueryRequest(BaseModel):
     top_k: int = 5
     collection_name: str = os.getenv("COLLECTION_NAME")
     hybrid_alpha: float = 0.5
+    # Rerank için getirilecek aday sayısı; verilmezse RERANK_CANDIDATE_K (en az top_k) kullanılır
+    candidate_k: Optional[int] = None
+    # İstek başına rerank token bütçesi; verilmezse RERANK_TOKEN_BUDGET kullanılır
+    rerank_token_budget: Optional[int] = None
+
+class BatchQueryRequest(BaseModel):
+    queries: List[QueryRequest]
 
 class IndexDocumentRequest(BaseModel):
     file: UploadFile = File(...)
@@ -16,5 +24,5 @@ class IndexDocumentRequest(BaseModel):
 class RerankerModel():
     model: AutoModelForSequenceClassification
     tokenizer: AutoTokenizer
-    use_fp16: bool = False
+    precision: str = "fp32"
     
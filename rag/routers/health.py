@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from utils.startup_utils import get_startup
+
+router = APIRouter(prefix="/health")
+
+@router.get("/live")
+def live():
+    """
+    Süreç ayakta mı? Açılış hata ile sonuçlandıysa 503 döner, böylece container yeniden başlatılır.
+    """
+    startup = get_startup()
+    if startup is not None and startup.failed:
+        return JSONResponse(status_code=503, content={"status": "failed"})
+    return {"status": "alive"}
+
+@router.get("/ready")
+def ready():
+    """
+    Modeller yüklenip ısıtıldı ve vektör veritabanı bağlantısı kurulduysa 200, aksi halde 503 döner.
+    Gövde, açılış aşamalarının durum ve sürelerini içerir.
+    """
+    startup = get_startup()
+    if startup is None:
+        return JSONResponse(status_code=503, content={"status": "starting", "phases": {}})
+    report = startup.report()
+    return JSONResponse(status_code=200 if startup.ready else 503, content=report)
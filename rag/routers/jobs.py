@@ -0,0 +1,21 @@
+from fastapi import APIRouter, HTTPException
+from services.job_service import get_job_queue
+
+router = APIRouter(prefix="/rag/jobs")
+
+@router.get("")
+def list_jobs(limit: int = 50):
+    """
+    Son indeksleme işlerini en yeniden eskiye doğru listeler.
+    """
+    return {"jobs": get_job_queue().list(limit=limit), "counts": get_job_queue().counts()}
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """
+    İndeksleme işinin durumunu ve ilerlemesini döner: chunk sayıları, throughput ve batch hataları.
+    """
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from services.job_service import get_job_queue
+from utils.admission_utils import get_admission_controller
+from utils.batching_utils import get_embedding_batcher
+from utils.cache_utils import get_embedding_cache
+from utils.cache_utils import get_result_cache
+from utils.executor_utils import get_inference_executor
+from utils.metrics_utils import get_metrics_registry, register_collector, stats_samples
+
+router = APIRouter()
+
+def collect_component_stats():
+    """
+    /rag/stats'taki anlık bileşen istatistiklerini scrape anında gauge olarak döner.
+    """
+    yield from stats_samples("rag_inference_executor", "Inference executor state", get_inference_executor().stats())
+    yield from stats_samples("rag_embedding_cache", "Query embedding cache state", get_embedding_cache().stats())
+    result_cache = get_result_cache()
+    if result_cache is not None:
+        yield from stats_samples("rag_result_cache", "Search result cache state", result_cache.stats())
+    yield from stats_samples(
+        "rag_admission", "Admission controller state", get_admission_controller().stats(),
+        label_names={"tiers": "tier", "latency_ms": "stage"},
+    )
+
+def collect_startup_dependent_stats():
+    # Batcher ve iş kuyruğu açılış bitene kadar yüklenmemiş olabilir
+    yield from stats_samples("rag_embedding_batcher", "Embedding micro-batcher state", get_embedding_batcher().stats())
+    yield from stats_samples("rag_ingestion", "Ingestion jobs by status", {"jobs": get_job_queue().counts()},
+                             label_names={"jobs": "status"})
+
+register_collector("components", collect_component_stats)
+register_collector("startup_dependent", collect_startup_dependent_stats)
+
+@router.get("/metrics", response_class=Response)
+def metrics():
+    """
+    Aşama gecikmeleri, batch boyutları, token sayıları ve bileşen istatistikleri; Prometheus text formatında.
+    """
+    return Response(generate_latest(get_metrics_registry()), media_type=CONTENT_TYPE_LATEST)
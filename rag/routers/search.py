@@ -1,36 +1,130 @@
 from fastapi import APIRouter, HTTPException
 from fastapi import File, UploadFile
-from models.models import QueryRequest
-from services.vector_service import search_documents
-from services.vector_service import embed_and_index_documents
-from services.vector_service import rerank_documents
-from services.vector_service import construct_context_and_score_list
+from models.models import QueryRequest, BatchQueryRequest
+from services.vector_service import retrieve, retrieve_batch
+from services.vector_service import delete_document
+from services.job_service import get_job_queue
+from starlette.concurrency import run_in_threadpool
+from utils.batching_utils import get_embedding_batcher
+from utils.cache_utils import get_embedding_cache
+from utils.cache_utils import get_result_cache
+from utils.executor_utils import get_inference_executor
+from utils.executor_utils import InferenceExecutorSaturated
+from utils.manifest_utils import get_document_manifest
+from utils.admission_utils import get_admission_controller
+from utils.metrics_utils import observe_request
 import os
-import logging
+import shutil
+import time
 router = APIRouter(prefix="/rag")
 
 @router.post("/search")
 async def search(request: QueryRequest):
     """
     Weaviate ve SentenceTransformer ile sorgu işlemi.
+    Sorgu embedding'i micro-batching motorunda, rerank inference executor üzerinde, Weaviate sorgusu async client ile
+    çalışır; event loop bloklanmaz.
+    Yük altında admission controller daha ucuz bir servis seviyesi seçebilir; kullanılan seviye "tier" alanındadır.
     """
     try:
-        search_results = search_documents(query_obj=request)
-        context_and_scores = construct_context_and_score_list(search_results)
-        results = rerank_documents(query_obj=request, context_and_scores=context_and_scores)
-        return {"query": request.query, "results": results}
+        started = time.perf_counter()
+        results, tier = await retrieve(request, started)
+        observe_request("search", tier, time.perf_counter() - started)
+        return {"query": request.query, "results": results, "tier": tier}
+    except InferenceExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-@router.post("/index-document")
+@router.post("/search/batch")
+async def search_batch(request: BatchQueryRequest):
+    """
+    Birden fazla sorguyu tek istekte işler; embedding ve rerank tüm sorgular için ortak çalışır.
+    Sonuçlar istekteki sıra ile döner.
+    """
+    max_queries = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", "64"))
+    if len(request.queries) > max_queries:
+        raise HTTPException(status_code=400, detail=f"At most {max_queries} queries are allowed per batch.")
+    try:
+        started = time.perf_counter()
+        results = await retrieve_batch(request.queries)
+        observe_request("search_batch", "full", time.perf_counter() - started)
+        return {"results": [
+            {"query": query_obj.query, "results": query_results}
+            for query_obj, query_results in zip(request.queries, results)
+        ]}
+    except InferenceExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/index-document", status_code=202)
 async def index_document(file: UploadFile = File(...)):
+    """
+    Yüklenen dosyayı spool dizinine yazar ve indeksleme işini kuyruğa alır.
+    İşin durumu /rag/jobs/{job_id} üzerinden takip edilir.
+    """
+    spool_path = None
     try:
-        byte_data = await file.read()
-        content = byte_data.decode("utf-8")
-        embed_and_index_documents(content=content, collection_name=os.getenv("COLLECTION_NAME"))
+        job_queue = get_job_queue()
+        job_id = job_queue.new_job_id()
+        spool_path = job_queue.spool_path(job_id)
+        with open(spool_path, "wb") as spool_file:
+            await run_in_threadpool(shutil.copyfileobj, file.file, spool_file, 1 << 20)
+        job = job_queue.submit(job_id, filename=file.filename, collection_name=os.getenv("COLLECTION_NAME"))
             
-        return {"filename": file.filename, "message": "File indexed successfully!"}
+        return {"filename": file.filename, "message": "File queued for indexing.", "job_id": job_id, "status": job["status"]}
     except Exception as e:
+        # Kuyruğa alınamayan işin yarım kalmış spool dosyasını bırakma
+        if spool_path is not None and os.path.exists(spool_path):
+            os.remove(spool_path)
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         file.file.close()
+
+@router.get("/documents")
+def list_documents():
+    """
+    Koleksiyona indekslenmiş dokümanları ve chunk sayılarını manifest üzerinden listeler.
+    """
+    return {"documents": get_document_manifest().list_documents(os.getenv("COLLECTION_NAME"))}
+
+@router.delete("/documents/{source}")
+async def remove_document(source: str):
+    """
+    Bir dokümana ait tüm chunk'ları koleksiyondan siler.
+    """
+    try:
+        deleted = await get_inference_executor().run(delete_document, os.getenv("COLLECTION_NAME"), source)
+        return {"source": source, "deleted": deleted}
+    except InferenceExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/cache/invalidate")
+def invalidate_result_cache(collection_name: str = None):
+    """
+    Koleksiyonun sonuç cache'i generation'ını artırır; koleksiyonu servis dışından dolduran araçlar
+    (ör. tools.load_embedding_store) bellekteki cache'i bununla geçersiz kılar.
+    """
+    collection_name = collection_name or os.getenv("COLLECTION_NAME")
+    result_cache = get_result_cache()
+    if result_cache is None:
+        return {"collection_name": collection_name, "generation": None}
+    return {"collection_name": collection_name, "generation": result_cache.bump_generation(collection_name)}
+
+@router.get("/stats")
+def stats():
+    """
+    Inference kuyruğu, embedding batcher ve cache'ler için anlık istatistikleri döner.
+    """
+    result_cache = get_result_cache()
+    return {
+        "inference_executor": get_inference_executor().stats(),
+        "embedding_batcher": get_embedding_batcher().stats(),
+        "embedding_cache": get_embedding_cache().stats(),
+        "result_cache": result_cache.stats() if result_cache is not None else None,
+        "ingestion_jobs": get_job_queue().counts(),
+        "admission": get_admission_controller().stats(),
+    }
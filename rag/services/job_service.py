@@ -0,0 +1,259 @@
+from services.vector_service import embed_and_index_stream
+from utils.executor_utils import get_inference_executor
+from utils.stream_utils import iter_text_blocks
+from typing import List, Optional
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+_job_queue = None
+
+JOB_COLUMNS = (
+    "id", "status", "filename", "collection_name", "spool_path", "created_at", "started_at", "finished_at",
+    "bytes_total", "bytes_read", "chunks", "inserted", "failed", "batches", "errors", "error",
+)
+
+
+class JobInterrupted(Exception):
+    """
+    Kuyruk durdurulurken çalışan işi bir sonraki batch sınırında keser; iş tekrar kuyruğa alınır.
+    """
+
+
+class JobQueue:
+    """
+    SQLite üzerinde kalıcı indeksleme iş kuyruğu. Yüklenen dosyalar spool dizinine yazılır,
+    işler arama executor'ından bağımsız, sayısı sınırlı ingestion worker thread'lerinde çalışır.
+    Kapanışta çalışan işler kesilip spool dosyalarıyla birlikte tekrar kuyruğa alınır; servis yeniden
+    başladığında kaldıkları yerden (önceden yazılmış chunk'lar atlanarak) devam eder.
+    """
+
+    def __init__(self, db_path: str, spool_dir: str, workers: int = 1, progress_interval: float = 1.0,
+                 yield_max_wait: float = 0.5):
+        self.db_path = db_path
+        self.spool_dir = spool_dir
+        self.workers = max(1, workers)
+        self.progress_interval = progress_interval
+        self.yield_max_wait = yield_max_wait
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        os.makedirs(spool_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT, collection_name TEXT NOT NULL, "
+            "spool_path TEXT NOT NULL, created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+            "bytes_total INTEGER NOT NULL DEFAULT 0, bytes_read INTEGER NOT NULL DEFAULT 0, "
+            "chunks INTEGER NOT NULL DEFAULT 0, inserted INTEGER NOT NULL DEFAULT 0, failed INTEGER NOT NULL DEFAULT 0, "
+            "batches INTEGER NOT NULL DEFAULT 0, errors TEXT NOT NULL DEFAULT '[]', error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created_at ON jobs (status, created_at)")
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopped = False
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        # Önceki çalışmada yarım kalan işleri tekrar kuyruğa al
+        with self._lock:
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            ).rowcount
+        if requeued:
+            logging.info(f"Requeued {requeued} interrupted ingestion jobs.")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"ingestion-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stopped = True
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        if any(thread.is_alive() for thread in self._threads):
+            # Süresinde kesilemeyen işler de kuyruğa döner; worker bitirirse sonucunu yine yazabilsin diye
+            # bağlantı açık bırakılır
+            with self._lock:
+                self._conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+            return
+        with self._lock:
+            self._conn.close()
+
+    def spool_path(self, job_id: str) -> str:
+        return os.path.join(self.spool_dir, f"{job_id}.txt")
+
+    def new_job_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def submit(self, job_id: str, filename: str, collection_name: str) -> dict:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, filename, collection_name, spool_path, created_at, bytes_total) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, filename, collection_name, self.spool_path(job_id), time.time(),
+                 os.path.getsize(self.spool_path(job_id))),
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, limit: int = 50) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(zip(JOB_COLUMNS, row))
+        job["errors"] = json.loads(job["errors"])
+        job.pop("spool_path")
+        job["progress"] = job["bytes_read"] / job["bytes_total"] if job["bytes_total"] else 0.0
+        if job["started_at"] is not None:
+            elapsed = (job["finished_at"] or time.time()) - job["started_at"]
+            job["elapsed_seconds"] = elapsed
+            job["chunks_per_second"] = job["chunks"] / elapsed if elapsed > 0 else 0.0
+        return job
+
+    def _claim(self) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, collection_name, spool_path, filename FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), row[0]),
+            ).rowcount
+            return row if claimed else None
+
+    def _update_progress(self, job_id: str, report: dict, bytes_read: int):
+        # Rapordaki inserted yalnızca akış sonunda hesaplanır; değişmediği için atlanan chunk'lar eklenmiş sayılmaz
+        inserted = report["chunks"] - report["skipped"] - report["failed"]
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET bytes_read = ?, chunks = ?, inserted = ?, failed = ?, batches = ?, errors = ? WHERE id = ?",
+                (bytes_read, report["chunks"], inserted, report["failed"], report["batches"],
+                 json.dumps(report["errors"], ensure_ascii=False), job_id),
+            )
+
+    def _requeue(self, job_id: str):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE id = ?", (job_id,))
+
+    def _finish(self, job_id: str, status: str, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                (status, time.time(), error, job_id),
+            )
+
+    def _yield_to_search(self):
+        """
+        Arama istekleri kuyruktaysa veya çalışıyorsa bir sonraki embedding batch'ini kısa bir süre ertele;
+        böylece toplu indeksleme sırasında arama gecikmesi sabit kalır.
+        """
+        executor = get_inference_executor()
+        deadline = time.perf_counter() + self.yield_max_wait
+        while time.perf_counter() < deadline and not self._stopped:
+            stats = executor.stats()
+            if stats["running"] == 0 and stats["queue_depth"] == 0:
+                return
+            time.sleep(0.005)
+
+    def _run_job(self, job_id: str, collection_name: str, spool_path: str, source: str):
+        last_update = 0.0
+        logging.info(f"Starting ingestion job {job_id} for {collection_name}.")
+        with open(spool_path, "rb") as file:
+
+            def on_progress(report: dict):
+                nonlocal last_update
+                if self._stopped:
+                    raise JobInterrupted(f"Ingestion job {job_id} interrupted by shutdown.")
+                now = time.perf_counter()
+                if now - last_update >= self.progress_interval:
+                    # Chunking aşaması önden okuduğu için dosya konumu yaklaşık bir ilerleme verir
+                    self._update_progress(job_id, report, bytes_read=file.tell())
+                    last_update = now
+                self._yield_to_search()
+
+            report = embed_and_index_stream(
+                iter_text_blocks(file), collection_name, source=source, progress_callback=on_progress
+            )
+            self._update_progress(job_id, report, bytes_read=file.tell())
+        return report
+
+    def _run(self):
+        while not self._stopped:
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=1.0)
+                continue
+            job_id, collection_name, spool_path, filename = job
+            interrupted = False
+            try:
+                # Dosya adı, dokümanın manifest'teki kaynak anahtarıdır
+                report = self._run_job(job_id, collection_name, spool_path, source=filename or job_id)
+                self._finish(job_id, "completed" if report["failed"] == 0 else "completed_with_errors")
+                logging.info(f"Ingestion job {job_id} finished: {report['inserted']}/{report['chunks']} chunks inserted.")
+            except Exception as e:
+                if self._stopped:
+                    # Kapanış sırasında kesilen (veya kapatılan bileşenler yüzünden hata veren) iş sonraki açılışta sürer
+                    interrupted = True
+                    self._requeue(job_id)
+                    logging.info(f"Ingestion job {job_id} requeued on shutdown: {e}")
+                else:
+                    logging.error(f"Ingestion job {job_id} failed: {e}")
+                    self._finish(job_id, "failed", error=str(e))
+            finally:
+                if not interrupted and os.path.exists(spool_path):
+                    os.remove(spool_path)
+
+
+def create_job_queue():
+    global _job_queue
+    if _job_queue is None:
+        workers = int(os.getenv("INGEST_WORKERS", "1"))
+        _job_queue = JobQueue(
+            db_path=os.getenv("INGEST_DB_PATH", "/app/ingest/jobs.sqlite3"),
+            spool_dir=os.getenv("INGEST_SPOOL_DIR", "/app/ingest/spool"),
+            workers=workers,
+            yield_max_wait=float(os.getenv("INGEST_YIELD_MAX_WAIT_MS", "500")) / 1000,
+        ).start()
+        logging.info(f"Ingestion job queue started (workers={workers}).")
+    return _job_queue
+
+
+def get_job_queue():
+    if _job_queue is None:
+        raise RuntimeError("Ingestion job queue is not loaded!")
+    return _job_queue
+
+
+def close_job_queue():
+    global _job_queue
+    if _job_queue is not None:
+        logging.info("Stopping ingestion job queue...")
+        _job_queue.stop()
+        _job_queue = None
+    logging.info("Ingestion job queue stopped successfully.")
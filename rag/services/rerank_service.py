@@ -0,0 +1,160 @@
+from models.models import RerankerModel
+from typing import Iterator, List, Sequence, Tuple
+from utils.metrics_utils import observe_stage, time_stage
+import os
+import time
+import torch
+
+
+def get_rerank_settings() -> Tuple[int, int]:
+    """
+    Reranker için maksimum sekans uzunluğunu ve bir alt batch'in padding dahil token bütçesini döner.
+    """
+    max_length = int(os.getenv("RERANK_MAX_LENGTH", "512"))
+    max_tokens_per_batch = int(os.getenv("RERANK_MAX_TOKENS_PER_BATCH", "8192"))
+    return max_length, max_tokens_per_batch
+
+
+def token_budget_batches(order: Sequence[int], lengths: Sequence[int], max_tokens_per_batch: int) -> Iterator[List[int]]:
+    """
+    Uzunluğa göre sıralanmış indeksleri, padding sonrası token sayısı (batch boyu x en uzun örnek)
+    bütçeyi aşmayacak şekilde alt batch'lere böler. Tek başına bütçeyi aşan örnek kendi batch'inde kalır.
+    """
+    batch: List[int] = []
+    batch_max = 0
+    for index in order:
+        length = lengths[index]
+        new_max = max(batch_max, length)
+        if batch and (len(batch) + 1) * new_max > max_tokens_per_batch:
+            yield batch
+            batch, new_max = [], length
+        batch.append(index)
+        batch_max = new_max
+    if batch:
+        yield batch
+
+
+def encode_pairs(model: RerankerModel, pairs: Sequence[Tuple[str, str]], max_length: int = None):
+    """
+    (sorgu, bağlam) çiftlerini padding'siz tokenize eder; encoding'i ve her çiftin token sayısını döner.
+    """
+    max_length = max_length or get_rerank_settings()[0]
+    queries = [query for query, _ in pairs]
+    contexts = [context for _, context in pairs]
+    with time_stage("rerank_tokenize", batch_size=len(pairs)):
+        encoded = model.tokenizer(queries, contexts, truncation=True, max_length=max_length)
+    lengths = [len(input_ids) for input_ids in encoded["input_ids"]]
+    return encoded, lengths
+
+
+def score_encoded(model: RerankerModel, encoded, lengths: Sequence[int], indices: Sequence[int],
+                  max_tokens_per_batch: int = None) -> List[float]:
+    """
+    Tokenize edilmiş çiftlerden indices ile seçilenleri skorlar. Seçilen çiftler uzunluğa göre sıralanıp
+    token bütçeli alt batch'lerde yalnızca kendi içindeki en uzun örneğe göre pad edilir; skorlar indices sırasıyla döner.
+    """
+    max_tokens_per_batch = max_tokens_per_batch or get_rerank_settings()[1]
+    order = sorted(indices, key=lengths.__getitem__)
+    scores = {}
+    device = model.model.device  # Modelin çalıştığı cihazı al
+    with torch.no_grad():
+        for batch_indices in token_budget_batches(order, lengths, max_tokens_per_batch):
+            started = time.perf_counter()
+            features = [{key: encoded[key][i] for key in encoded.keys()} for i in batch_indices]
+            inputs = model.tokenizer.pad(features, padding=True, return_tensors="pt")
+            inputs = {k: v.to(device) for k, v in inputs.items()}  # Girdileri ilgili cihaza taşı
+            batch_scores = model.model(**inputs).logits.view(-1).float().tolist()
+            scores.update(zip(batch_indices, batch_scores))
+            # Token sayısı padding dahildir: alt batch boyu x en uzun örnek
+            observe_stage(
+                "rerank_forward", time.perf_counter() - started, batch_size=len(batch_indices),
+                tokens=len(batch_indices) * max(lengths[i] for i in batch_indices),
+            )
+    return [scores[index] for index in indices]
+
+
+def score_pairs(model: RerankerModel, pairs: Sequence[Tuple[str, str]], max_length: int = None,
+                max_tokens_per_batch: int = None) -> List[float]:
+    """
+    (sorgu, bağlam) çiftlerini cross-encoder ile skorlar.
+    Çiftler bir kez padding'siz tokenize edilir, uzunluğa göre sıralanıp token bütçeli alt batch'lerde
+    yalnızca kendi içindeki en uzun örneğe göre pad edilir; skorlar orijinal sırada döner.
+    """
+    if not pairs:
+        return []
+    encoded, lengths = encode_pairs(model, pairs, max_length)
+    return score_encoded(model, encoded, lengths, range(len(pairs)), max_tokens_per_batch)
+
+
+def get_rerank_policy() -> dict:
+    """
+    Adaptif rerank politikası. Marjlar hybrid skor ölçeğindedir (0-1); 0 ilgili kuralı kapatır.
+    skip_margin: top_k'nıncı ve bir sonraki aday arasındaki hybrid skor farkı bu değeri aşarsa rerank atlanır.
+    stop_margin: sıradaki aşamanın en iyi hybrid skoru ilk adayın bu kadar gerisindeyse ve yeterli sonuç
+    toplandıysa rerank erken durur. token_budget: istek başına rerank edilecek toplam token sınırı.
+    """
+    return {
+        "candidate_k": int(os.getenv("RERANK_CANDIDATE_K", "20")),
+        "skip_margin": float(os.getenv("RERANK_SKIP_MARGIN", "0")),
+        "stop_margin": float(os.getenv("RERANK_STOP_MARGIN", "0")),
+        "stage_size": int(os.getenv("RERANK_STAGE_SIZE", "0")),
+        "token_budget": int(os.getenv("RERANK_TOKEN_BUDGET", "0")),
+    }
+
+
+def should_skip_rerank(hybrid_scores: Sequence[float], top_k: int, skip_margin: float) -> bool:
+    """
+    İlk top_k aday, geri kalanlardan hybrid skorda skip_margin kadar net ayrışıyorsa True döner.
+    """
+    return skip_margin > 0 and len(hybrid_scores) > top_k and hybrid_scores[top_k - 1] - hybrid_scores[top_k] >= skip_margin
+
+
+def adaptive_rerank(model: RerankerModel, query: str, candidates: List[dict], top_k: int, skip_margin: float = 0.0,
+                    stop_margin: float = 0.0, stage_size: int = 0, token_budget: int = 0) -> Tuple[List[dict], dict]:
+    """
+    Hybrid skora göre azalan sırada gelen adayları rerank eder ve skoru -1'in altında kalanları atarak en iyi top_k
+    sonucu döner. Adaylar hybrid sırasıyla stage_size'lık aşamalarda skorlanır; marjlar ve token bütçesi
+    izin verdiğinde kalan adaylar skorlanmaz. Token bütçesi top_k sonucu toplamaya yetmezse boş kalan yerler
+    rerank edilenlerin ardından skorlanmamış adaylarla (hybrid sırası ve skoruyla) doldurulur.
+    İkinci değer, yapılan işi özetleyen bir sözlüktür.
+    """
+    info = {"candidates": len(candidates), "scored": 0, "tokens": 0, "skipped": False, "stopped": None, "filled": 0}
+    if not candidates:
+        return [], info
+    hybrid_scores = [candidate["score"] for candidate in candidates]
+    if should_skip_rerank(hybrid_scores, top_k, skip_margin):
+        info["skipped"] = True
+        return candidates[:top_k], info
+
+    encoded, lengths = encode_pairs(model, [(query, candidate["context"]) for candidate in candidates])
+    order = list(range(len(candidates)))
+    if token_budget > 0:
+        used = 0
+        for position, index in enumerate(order):
+            # Bütçe en az bir adayın skorlanmasına izin verir
+            if position > 0 and used + lengths[index] > token_budget:
+                order = order[:position]
+                info["stopped"] = "token_budget"
+                break
+            used += lengths[index]
+
+    stage_size = (stage_size or top_k) if stop_margin > 0 else len(order)
+    scores = {}
+    for start in range(0, len(order), stage_size):
+        if start > 0:
+            accepted = sum(1 for score in scores.values() if score >= -1)
+            if accepted >= top_k and hybrid_scores[0] - hybrid_scores[order[start]] >= stop_margin:
+                info["stopped"] = "margin"
+                break
+        stage = order[start:start + stage_size]
+        scores.update(zip(stage, score_encoded(model, encoded, lengths, stage)))
+
+    info["scored"] = len(scores)
+    info["tokens"] = sum(lengths[index] for index in scores)
+    results = [dict(candidates[index], score=score) for index, score in scores.items() if score >= -1]
+    results = sorted(results, key=lambda result: result["score"], reverse=True)[:top_k]
+    if info["stopped"] == "token_budget" and len(results) < top_k:
+        filled = [candidates[index] for index in range(len(candidates)) if index not in scores][:top_k - len(results)]
+        info["filled"] = len(filled)
+        results.extend(filled)
+    return results, info
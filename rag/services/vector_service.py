@@ -1,97 +1,493 @@
 from tqdm import tqdm
 import math
 from models.models import QueryRequest
-from utils.model_utils import get_embedding_model
+from utils.model_utils import get_embedding_model, get_embedding_model_id
 from utils.model_utils import get_reranker_model
-from weaviate.classes.data import DataObject
-from weaviate.classes.query import MetadataQuery
-from weaviate.collections.classes.internal import QueryReturn
-from utils.vector_db_utils import get_client
-from typing import List
-import torch
+from weaviate.util import generate_uuid5
+from utils.vector_store_utils import get_vector_store
+from utils.batching_utils import get_embedding_batcher
+from utils.cache_utils import get_embedding_cache
+from utils.cache_utils import get_result_cache
+from utils.admission_utils import get_admission_controller
+from utils.executor_utils import get_inference_executor
+from services.rerank_service import adaptive_rerank, get_rerank_policy, score_pairs, should_skip_rerank
+from utils.manifest_utils import get_document_manifest
+from utils.embedding_store import get_embedding_store
+from utils.metrics_utils import observe_stage, time_iter, time_stage
+from utils.chunk_utils import iter_offset_chunks
+from utils.stream_utils import iter_batches, prefetch
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import time
+import numpy as np
 import logging
+import os
 
-def search_documents(query_obj: QueryRequest):  
-    model = get_embedding_model()
-    query_vector = model.encode(query_obj.query).tolist()
-    client = get_client()
-    documents = client.collections.get(query_obj.collection_name)
+def embed_query(query: str):
+    """
+    Sorgunun embedding'ini önce cache'te arar; yoksa micro-batching motoru üzerinden encode eder,
+    böylece eşzamanlı sorgular tek bir encode çağrısında toplanır.
+    """
+    cache = get_embedding_cache()
+    key = cache.make_key(query, get_embedding_model_id())
+    query_vector = cache.get(key)
+    if query_vector is None:
+        query_vector = cache.put(key, np.asarray(get_embedding_batcher().encode(query), dtype=np.float32))
+    return query_vector
+
+async def embed_query_async(query: str):
+    """
+    embed_query'nin event loop karşılığı: batcher'ın future'ı beklenir ve hiçbir worker thread bloklanmaz.
+    Böylece eşzamanlı sorgular executor worker sayısıyla sınırlanmadan aynı encode çağrısında toplanır.
+    """
+    cache = get_embedding_cache()
+    key = cache.make_key(query, get_embedding_model_id())
+    query_vector = cache.get(key)
+    if query_vector is None:
+        embedding = await asyncio.wrap_future(get_embedding_batcher().submit(query))
+        query_vector = cache.put(key, np.asarray(embedding, dtype=np.float32))
+    return query_vector
+
+def get_candidate_k(query_obj: QueryRequest) -> int:
+    candidate_k = query_obj.candidate_k or get_rerank_policy()["candidate_k"]
+    return max(query_obj.top_k, candidate_k)
+
+def search_stage(query_obj: QueryRequest) -> str:
+    return "keyword_search" if query_obj.hybrid_alpha == 0 else "search"
+
+def search_documents(query_obj: QueryRequest, query_vector=None):
+    # alpha=0 yalnızca BM25 aramasıdır, sorgu embedding'i gerekmez
+    if query_vector is None and query_obj.hybrid_alpha > 0:
+        query_vector = embed_query(query_obj.query)
+    query_vector = query_vector.tolist() if query_vector is not None else None
     
-    relevant_chunks = documents.query.hybrid(
-        query=query_obj.query,
-        vector=query_vector,
-        limit=query_obj.top_k,
-        alpha=query_obj.hybrid_alpha,
-        return_metadata=MetadataQuery(score=True)
-    )
+    with time_stage(search_stage(query_obj)):
+        relevant_chunks = get_vector_store().hybrid_search(
+            collection_name=query_obj.collection_name,
+            query=query_obj.query,
+            vector=query_vector,
+            limit=get_candidate_k(query_obj),
+            alpha=query_obj.hybrid_alpha,
+        )
     
     return relevant_chunks
 
+async def search_documents_async(query_obj: QueryRequest, query_vector=None):
+    """
+    Hybrid sorguyu event loop üzerinden gönderir; embedding önceden hesaplanmış olmalıdır.
+    """
+    with time_stage(search_stage(query_obj)):
+        return await get_vector_store().hybrid_search_async(
+            collection_name=query_obj.collection_name,
+            query=query_obj.query,
+            vector=query_vector.tolist() if query_vector is not None else None,
+            limit=get_candidate_k(query_obj),
+            alpha=query_obj.hybrid_alpha,
+        )
+
 def rerank_documents(query_obj: QueryRequest, context_and_scores: List[dict]):
     try: 
         model = get_reranker_model()
-        model.model.eval()
-        query = query_obj.query
-        contexts = [result["context"] for result in context_and_scores]
-        query_context_pairs = [[query, context] for context in contexts]
-        
-        with torch.no_grad():
-            inputs = model.tokenizer(query_context_pairs, padding=True, truncation=True, return_tensors="pt")
-            device = next(model.model.parameters()).device  # Modelin çalıştığı cihazı al
-            inputs = {k: v.to(device) for k, v in inputs.items()}  # Girdileri ilgili cihaza taşı
-            scores = model.model(**inputs).logits.view(-1).tolist()
+        policy = get_rerank_policy()
+        token_budget = policy["token_budget"] if query_obj.rerank_token_budget is None else query_obj.rerank_token_budget
         
-        # Her belgeye ilgili skoru ekle
-        for i, result in enumerate(context_and_scores):
-            result["score"] = scores[i]
-        
-        # Skoru -1'in altında olan belgeleri hariç tut
-        filtered_results = [result for result in context_and_scores if result["score"] >= -1]
-        
-        # Kalan sonuçları skora göre azalan sırada yeniden sırala
-        reranked_search_results = sorted(filtered_results, key=lambda x: x["score"], reverse=True)
-        return reranked_search_results
+        # Adaylar hybrid sırasıyla, marj ve token bütçesi izin verdiği kadar rerank edilir
+        started = time.perf_counter()
+        results, info = adaptive_rerank(
+            model, query_obj.query, context_and_scores, top_k=query_obj.top_k,
+            skip_margin=policy["skip_margin"], stop_margin=policy["stop_margin"],
+            stage_size=policy["stage_size"], token_budget=token_budget,
+        )
+        observe_stage("rerank", time.perf_counter() - started, batch_size=info["scored"], tokens=info["tokens"])
+        logging.debug(f"Rerank for '{query_obj.query}': {info}")
+        return results
     except Exception as e:
         logging.error(f"Error during reranking: {e}")
+
+def apply_rerank_scores(context_and_scores: List[dict], scores: List[float]) -> List[dict]:
+    # Her belgeye ilgili skoru ekle
+    for i, result in enumerate(context_and_scores):
+        result["score"] = scores[i]
+    
+    # Skoru -1'in altında olan belgeleri hariç tut
+    filtered_results = [result for result in context_and_scores if result["score"] >= -1]
+    
+    # Kalan sonuçları skora göre azalan sırada yeniden sırala
+    return sorted(filtered_results, key=lambda x: x["score"], reverse=True)
         
     
-def construct_context_and_score_list(search_results: QueryReturn):
+def plan_retrieval(query_obj: QueryRequest, enqueued_at: Optional[float] = None) -> Tuple[str, QueryRequest]:
+    """
+    Admission controller'dan servis seviyesini alır. Beklenen gecikme, isteğin geldiğinden (enqueued_at,
+    time.perf_counter) beri geçen süreye inference executor'da son görülen kuyruk beklemesi eklenerek bulunur;
+    rerank ve arama aynı kuyrukta bekleyecektir. (seviye, aramada kullanılacak istek) döner.
+    """
+    admission = get_admission_controller()
+    waited = time.perf_counter() - enqueued_at if enqueued_at is not None else 0.0
+    waited += get_inference_executor().recent_wait()
+    candidate_k = get_candidate_k(query_obj)
+    reduced_candidate_k = admission.reduced_candidates(query_obj.top_k, candidate_k)
+    tier = admission.choose_tier(waited, candidate_k, reduced_candidate_k)
+    admission.record_tier(tier)
+    if tier == "bm25_only":
+        return tier, query_obj.model_copy(update={"hybrid_alpha": 0.0, "candidate_k": query_obj.top_k})
+    if tier == "reduced_candidates":
+        return tier, query_obj.model_copy(update={"candidate_k": reduced_candidate_k})
+    if tier == "no_rerank":
+        return tier, query_obj.model_copy(update={"candidate_k": query_obj.top_k})
+    return tier, query_obj
+
+def rerank_stage(query_obj: QueryRequest, context_and_scores: List[dict]):
+    started = time.perf_counter()
+    results = rerank_documents(query_obj=query_obj, context_and_scores=context_and_scores)
+    get_admission_controller().observe("rerank", time.perf_counter() - started, pairs=len(context_and_scores))
+    return results
+
+async def retrieve(query_obj: QueryRequest, enqueued_at: Optional[float] = None) -> Tuple[Optional[list], str]:
+    """
+    Sorgu embedding'i event loop'tan micro-batching motoruna gönderilip beklenir, hybrid sorgu async client ile
+    gönderilir; inference executor yalnızca rerank gibi CPU/GPU'ya bağlı adımları çalıştırır. Aynı istek daha önce cevaplandıysa ve koleksiyona
+    o zamandan beri doküman eklenmediyse sonuç cache'ten döner.
+    Servis seviyesi admission controller tarafından seçilir; (sonuçlar, seviye) döner.
+    Yalnızca tam seviyedeki sonuçlar cache'lenir.
+    """
+    admission = get_admission_controller()
+    executor = get_inference_executor()
+    result_cache = get_result_cache()
+    if result_cache is not None:
+        # Generation hesaplamadan önce okunur; arada yapılan indeksleme bu kaydı geçersiz kılar
+        generation = result_cache.generation(query_obj.collection_name)
+        cached_results = result_cache.get(query_obj, generation)
+        if cached_results is not None:
+            admission.record_tier("cached")
+            return cached_results, "cached"
+
+    tier, search_obj = plan_retrieval(query_obj, enqueued_at)
+    query_vector = None
+    if tier != "bm25_only":
+        started = time.perf_counter()
+        query_vector = await embed_query_async(query_obj.query)
+        elapsed = time.perf_counter() - started
+        admission.observe("embed", elapsed)
+        observe_stage("embed", elapsed)
+    started = time.perf_counter()
+    context_and_scores = await search_documents_async(search_obj, query_vector)
+    admission.observe("keyword_search" if tier == "bm25_only" else "search", time.perf_counter() - started)
+    if tier in ("no_rerank", "bm25_only"):
+        return context_and_scores[:query_obj.top_k], tier
+
+    results = await executor.run(rerank_stage, query_obj, context_and_scores)
+    if result_cache is not None and results is not None and tier == "full":
+        result_cache.set(query_obj, generation, results)
+    return results, tier
+
+def embed_queries(queries: List[str]) -> List[np.ndarray]:
+    """
+    Sorguların embedding'lerini döner; cache'te olmayan (ve normalize edilmiş hali tekrarlanmayan) sorgular
+    tek bir encode çağrısında embed edilir.
+    """
+    cache = get_embedding_cache()
+    model_id = get_embedding_model_id()
+    keys = [cache.make_key(query, model_id) for query in queries]
+    vectors = {}
+    missing = {}
+    for key, query in zip(keys, queries):
+        if key in vectors or key in missing:
+            continue
+        vector = cache.get(key)
+        if vector is None:
+            missing[key] = query
+        else:
+            vectors[key] = vector
+    if missing:
+        with time_stage("embed_batch", batch_size=len(missing)):
+            embeddings = get_embedding_model().encode(list(missing.values()), batch_size=len(missing))
+        for key, embedding in zip(missing, embeddings):
+            vectors[key] = cache.put(key, np.asarray(embedding, dtype=np.float32))
+    return [vectors[key] for key in keys]
+
+def rerank_batch(query_objs: List[QueryRequest], context_and_scores: List[List[dict]]) -> List[Optional[list]]:
+    """
+    Bütün (sorgu, bağlam) çiftlerini tek bir token bütçeli geçişte rerank eder. Adaptif politikadan yalnızca
+    skip_margin uygulanır; erken durma ortak geçişi böleceği için kullanılmaz.
+    """
+    skip_margin = get_rerank_policy()["skip_margin"]
+    # Hybrid skorları net ayrışan sorgular rerank'e girmez
+    skipped = {
+        i for i, candidates in enumerate(context_and_scores)
+        if should_skip_rerank([result["score"] for result in candidates], query_objs[i].top_k, skip_margin)
+    }
+    pairs = [
+        (query_objs[i].query, result["context"])
+        for i, candidates in enumerate(context_and_scores) if i not in skipped for result in candidates
+    ]
     try:
-        context_and_scores = []
-        for result in search_results.objects:
-            context_and_scores.append({
-                "id": result.uuid.int,
-                "context": result.properties["context"],
-                "score": result.metadata.score
-            })
-        return context_and_scores
+        with time_stage("rerank_batch", batch_size=len(pairs)):
+            scores = score_pairs(get_reranker_model(), pairs)
     except Exception as e:
-        logging.error(f"Error during constructing context and score dict: {e}")
-       
-
-def embed_and_index_documents(content: str, collection_name: str):
-        model = get_embedding_model()
-        client = get_client()
-
-        chunked_texts = chunk_text(content)
-
-        embeddings = model.encode(chunked_texts, show_progress_bar=True)
-
-        collection = client.collections.get(collection_name)
-
-        data_objects = []
-        for text, embedding in zip(chunked_texts, embeddings):
-            properties={
-                    "context": text
-            }
-            data_objects.append(DataObject(
-                properties=properties,
-                vector=embedding
-            ))
-        try:    
-            uuids = collection.data.insert_many(data_objects)
-        except Exception as e:
-            logging.info(f"Error while inserting data to collection: {e}")
+        logging.error(f"Error during batch reranking: {e}")
+        return [None] * len(query_objs)
+    results = []
+    offset = 0
+    for i, candidates in enumerate(context_and_scores):
+        if i in skipped:
+            results.append(candidates[:query_objs[i].top_k])
+        else:
+            reranked = apply_rerank_scores(candidates, scores[offset:offset + len(candidates)])
+            results.append(reranked[:query_objs[i].top_k])
+            offset += len(candidates)
+    return results
+
+async def retrieve_batch(query_objs: List[QueryRequest]) -> List[list]:
+    """
+    Birden fazla sorguyu birlikte çalıştırır: tüm sorgular tek encode çağrısında embed edilir,
+    hybrid sorgular event loop'tan eşzamanlı gönderilir ve bütün (sorgu, bağlam) çiftleri birlikte,
+    token bütçeli alt batch'lerde rerank edilir. Sonuçlar istek sırasıyla döner.
+    """
+    executor = get_inference_executor()
+    result_cache = get_result_cache()
+    results: List[Optional[list]] = [None] * len(query_objs)
+    generations = {}
+    pending = []
+    for i, query_obj in enumerate(query_objs):
+        if result_cache is not None:
+            if query_obj.collection_name not in generations:
+                generations[query_obj.collection_name] = result_cache.generation(query_obj.collection_name)
+            cached_results = result_cache.get(query_obj, generations[query_obj.collection_name])
+            if cached_results is not None:
+                results[i] = cached_results
+                continue
+        pending.append(i)
+    if not pending:
+        return results
+
+    query_vectors = await executor.run(embed_queries, [query_objs[i].query for i in pending])
+    semaphore = asyncio.Semaphore(int(os.getenv("SEARCH_BATCH_CONCURRENCY", "8")))
+
+    async def search(i, query_vector):
+        async with semaphore:
+            return await search_documents_async(query_objs[i], query_vector)
+
+    context_and_scores = await asyncio.gather(*(search(i, vector) for i, vector in zip(pending, query_vectors)))
+    reranked = await executor.run(rerank_batch, [query_objs[i] for i in pending], list(context_and_scores))
+    for i, query_results in zip(pending, reranked):
+        results[i] = query_results
+        if result_cache is not None and query_results is not None:
+            result_cache.set(query_objs[i], generations[query_objs[i].collection_name], query_results)
+    return results
+
+def get_ingestion_settings() -> dict:
+    return {
+        "embed_batch_size": int(os.getenv("INDEX_EMBED_BATCH_SIZE", "32")),
+        "insert_batch_size": int(os.getenv("INDEX_INSERT_BATCH_SIZE", "100")),
+        "insert_concurrency": int(os.getenv("INDEX_INSERT_CONCURRENCY", "2")),
+        "prefetch_batches": int(os.getenv("INDEX_PREFETCH_BATCHES", "2")),
+    }
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def chunk_id(source: str, text: str) -> str:
+    """
+    Chunk'ın kaynağı ve içeriğinden deterministik bir UUID üretir; aynı chunk her zaman aynı id'yi alır.
+    """
+    return generate_uuid5(f"{source}\x00{chunk_hash(text)}")
+
+def iter_new_chunk_batches(store, collection_name: str, source: str, chunk_batches: Iterable[List[str]]) -> Iterator[tuple]:
+    """
+    Her chunk batch'i için deterministik id'leri hesaplar ve koleksiyonda zaten bulunan (veya aynı dokümanda
+    daha önce görülen) chunk'ları embedding modeline ulaşmadan ayıklar.
+    (tüm id'ler, yeni (id, metin) çiftleri) döner.
+    """
+    seen: Set[str] = set()
+    for texts in chunk_batches:
+        ids = [chunk_id(source, text) for text in texts]
+        with time_stage("ingest_dedup", batch_size=len(ids)):
+            existing = store.fetch_existing_ids(collection_name, [i for i in ids if i not in seen])
+        new_chunks = []
+        for object_id, text in zip(ids, texts):
+            if object_id not in seen and object_id not in existing:
+                new_chunks.append((object_id, text))
+            seen.add(object_id)
+        yield ids, new_chunks
+
+def embed_and_index_stream(text_blocks: Iterable[str], collection_name: str, source: str,
+                           progress_callback=None) -> dict:
+    """
+    Metin bloklarını üç üst üste çalışan aşamada indeksler: chunk'lar bir generator'dan üretilir,
+    sabit boyutlu batch'ler halinde embed edilir ve Weaviate'in fixed-size batch API'si ile arka planda yazılır.
+    Bellek kullanımı doküman boyutundan bağımsızdır. Hatalar batch bazında raporlanır; bir batch'teki
+    hata diğer batch'lerin indekslenmesini engellemez.
+    Chunk id'leri kaynak ve içerikten türetilir: koleksiyonda zaten olan chunk'lar tekrar embed edilmez,
+    dokümanın önceki sürümünde olup yeni sürümde olmayan chunk'lar manifest üzerinden silinir.
+    Üretilen her vektör yerel embedding store'a da yazılır; store'da vektörü bulunan chunk'lar tekrar embed edilmez.
+    """
+    model = get_embedding_model()
+    vector_store = get_vector_store()
+    manifest = get_document_manifest()
+    store = get_embedding_store()
+    settings = get_ingestion_settings()
+
+    previous_ids = manifest.get_chunk_ids(collection_name, source)
+    current_ids: Set[str] = set()
+    chunks = iter_document_chunks(text_blocks, tokenizer=model.tokenizer)
+    chunk_batches = prefetch(
+        iter_new_chunk_batches(
+            vector_store, collection_name, source,
+            time_iter(iter_batches(chunks, settings["embed_batch_size"]), "ingest_chunk", size=len),
+        ),
+        depth=settings["prefetch_batches"],
+    )
+
+    report = {"chunks": 0, "inserted": 0, "skipped": 0, "reused": 0, "failed": 0, "deleted": 0, "batches": 0, "errors": []}
+    uuid_to_batch = {}
+    started = time.perf_counter()
+    try:
+        with vector_store.batch_writer(
+            collection_name,
+            batch_size=settings["insert_batch_size"],
+            concurrency=settings["insert_concurrency"],
+        ) as batch:
+            for batch_number, (ids, new_chunks) in enumerate(chunk_batches):
+                report["batches"] += 1
+                report["chunks"] += len(ids)
+                report["skipped"] += len(ids) - len(new_chunks)
+                current_ids.update(ids)
+                if not new_chunks:
+                    continue
+                with time_stage("ingest_store_read", batch_size=len(new_chunks)):
+                    embeddings = store.get([object_id for object_id, _ in new_chunks])
+                missing = [(object_id, text) for object_id, text in new_chunks if object_id not in embeddings]
+                report["reused"] += len(new_chunks) - len(missing)
+                if missing:
+                    texts = [text for _, text in missing]
+                    missing_ids = [object_id for object_id, _ in missing]
+                    try:
+                        with time_stage("ingest_embed", batch_size=len(texts)):
+                            vectors = model.encode(texts, batch_size=len(texts))
+                    except Exception as e:
+                        logging.error(f"Error while embedding batch {batch_number} ({len(texts)} chunks): {e}")
+                        report["failed"] += len(new_chunks)
+                        report["errors"].append({"batch": batch_number, "chunks": len(new_chunks), "stage": "embed", "error": str(e)})
+                        continue
+                    try:
+                        with time_stage("ingest_store_write", batch_size=len(texts)):
+                            store.append(
+                                missing_ids,
+                                vectors,
+                                [{"context": text, "source": source, "chunk_hash": chunk_hash(text)} for text in texts],
+                            )
+                    except Exception as e:
+                        # Store yalnızca yeniden indekslemeyi hızlandırır; yazılamaması indekslemeyi durdurmaz
+                        logging.warning(f"Could not write batch {batch_number} to embedding store: {e}")
+                    embeddings.update(zip(missing_ids, vectors))
+                # Batch writer dolu olduğunda add_object arka plandaki yazmayı bekler; süre insert baskısını gösterir
+                with time_stage("ingest_insert", batch_size=len(new_chunks)):
+                    for object_id, text in new_chunks:
+                        embedding = embeddings[object_id]
+                        uuid_to_batch[object_id] = batch_number
+                        batch.add_object(
+                            properties={"context": text, "source": source, "chunk_hash": chunk_hash(text)},
+                            vector=embedding.tolist(),
+                            uuid=object_id,
+                        )
+                if progress_callback is not None:
+                    progress_callback(report)
+            flush_started = time.perf_counter()
+        # Context'ten çıkış kuyrukta kalan nesnelerin yazılmasını bekler
+        observe_stage("ingest_flush", time.perf_counter() - flush_started)
+
+        failed_per_batch = {}
+        for object_uuid, message in batch.failed_objects:
+            batch_number = uuid_to_batch.get(object_uuid, -1)
+            entry = failed_per_batch.setdefault(batch_number, {"batch": batch_number, "chunks": 0, "stage": "insert", "errors": set()})
+            entry["chunks"] += 1
+            entry["errors"].add(message)
+        for entry in failed_per_batch.values():
+            logging.error(f"Error while inserting batch {entry['batch']} to collection: {entry['chunks']} chunks failed: {entry['errors']}")
+            report["failed"] += entry["chunks"]
+            report["errors"].append({**entry, "error": "; ".join(sorted(entry.pop("errors")))})
+
+        if report["failed"] == 0:
+            # Dokümanın yeni sürümünde olmayan eski chunk'ları sil
+            with time_stage("ingest_delete"):
+                report["deleted"] = vector_store.delete_ids(collection_name, previous_ids - current_ids)
+            manifest.replace(collection_name, source, current_ids)
+        else:
+            # Eksik yazılan bir sürümde eski chunk'lar silinmez; sonraki deneme temizler
+            manifest.replace(collection_name, source, previous_ids | current_ids)
+    finally:
+        report["inserted"] = report["chunks"] - report["skipped"] - report["failed"]
+        observe_stage("ingest_document", time.perf_counter() - started, batch_size=report["chunks"])
+        # Koleksiyon değişti; bu koleksiyona ait cache'lenmiş arama sonuçlarını geçersiz kıl
+        if report["inserted"] or report["deleted"]:
+            result_cache = get_result_cache()
+            if result_cache is not None:
+                result_cache.bump_generation(collection_name)
+    logging.info(
+        f"Indexed {source} to {collection_name}: {report['inserted']} inserted ({report['reused']} from embedding store), "
+        f"{report['skipped']} unchanged, {report['deleted']} deleted, {report['failed']} failed in {report['batches']} batches."
+    )
+    return report
+
+def embed_and_index_documents(content: str, collection_name: str, source: str) -> dict:
+    return embed_and_index_stream([content], collection_name, source=source)
+
+def delete_document(collection_name: str, source: str) -> int:
+    """
+    Bir dokümana ait tüm chunk'ları manifest üzerinden koleksiyondan siler.
+    """
+    manifest = get_document_manifest()
+    deleted = get_vector_store().delete_ids(collection_name, manifest.get_chunk_ids(collection_name, source))
+    manifest.delete(collection_name, source)
+    result_cache = get_result_cache()
+    if result_cache is not None:
+        result_cache.bump_generation(collection_name)
+    logging.info(f"Deleted {deleted} chunks of {source} from {collection_name}.")
+    return deleted
+
+def iter_document_chunks(text_blocks: Iterable[str], *, tokenizer, chunk_size: int = 512, chunk_overlap: int = 20) -> Iterator[str]:
+    """
+    İndeksleme için chunk üretir. Fast tokenizer varsa chunk'lar offset mapping ile doğrudan kaynak metinden
+    kesilir (CHUNK_BOUNDARY_MODE ile cümle/paragraf sınırına hizalanabilir); yoksa token pencereleri decode edilir.
+    """
+    if getattr(tokenizer, "is_fast", False):
+        return iter_offset_chunks(
+            text_blocks,
+            tokenizer=tokenizer,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            boundary_mode=os.getenv("CHUNK_BOUNDARY_MODE", "none").lower(),
+        )
+    return iter_text_chunks(text_blocks, tokenizer=tokenizer, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+def iter_text_chunks(text_blocks: Iterable[str], *, tokenizer, chunk_size: int = 512, chunk_overlap: int = 20) -> Iterator[str]:
+    """
+    Metin bloklarından, split_text_on_tokens ile aynı pencere mantığıyla chunk üretir ancak tüm dokümanı
+    belleğe almaz: her blokta tamamlanan pencereler hemen döner, yarım kalan son pencere bir sonraki blokla birleştirilir.
+    """
+    max_model_length = getattr(tokenizer, "model_max_length", 8192)
+    chunk_size = min(chunk_size, max_model_length)
+    step = chunk_size - chunk_overlap
+    pending = ""
+    pending_tokens = 0
+    emitted = False
+    for block in text_blocks:
+        # Bloklar boşlukta bölündüğünden, decode sırasında kaybolan ayırıcı boşluğu geri ekle
+        if pending and not pending[-1].isspace() and not block[:1].isspace():
+            pending += " "
+        input_ids = tokenizer.encode(pending + block, add_special_tokens=False)
+        start_idx = 0
+        while start_idx + chunk_size <= len(input_ids):
+            yield tokenizer.decode(input_ids[start_idx:start_idx + chunk_size])
+            emitted = True
+            start_idx += step
+        pending = tokenizer.decode(input_ids[start_idx:])
+        pending_tokens = len(input_ids) - start_idx
+    # Son pencere yalnızca bir önceki chunk'ın örtüşme kısmından ibaretse tekrar ekleme
+    if pending.strip() and (not emitted or pending_tokens > chunk_overlap):
+        yield pending
 
 def chunk_text(content: str, chunk_size: int = 512, overlap: int = 20) -> List[str]:
     model = get_embedding_model()
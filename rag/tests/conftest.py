@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def model_paths() -> dict:
+    """
+    Modellerin model_utils'in kullandığı yerel dizinleri; testler modelleri hub'dan indirmez.
+    """
+    embedding = os.getenv("EMBEDDING_MODEL_NAME")
+    reranker = os.getenv("RERANKER_MODEL_NAME")
+    if not embedding or not reranker:
+        pytest.skip("EMBEDDING_MODEL_NAME and RERANKER_MODEL_NAME are not set")
+    return {
+        "embedding": f"/app/embedding_models/{embedding}",
+        "reranker": f"/app/reranker_models/{reranker}",
+    }
+
+
+@pytest.fixture(scope="session")
+def reference_models(model_paths):
+    """
+    fp32 torch embedding ve reranker modelleri; yerelde indirilmiş değillerse testler atlanır.
+    """
+    if not os.path.exists(model_paths["embedding"]) or not os.path.exists(f"{model_paths['reranker']}/model"):
+        pytest.skip("Models are not downloaded to /app")
+    from utils.model_utils import build_embedding_model, build_reranker_model
+
+    return (
+        build_embedding_model(os.getenv("EMBEDDING_MODEL_NAME")),
+        build_reranker_model(os.getenv("RERANKER_MODEL_NAME")),
+    )
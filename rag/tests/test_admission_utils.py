@@ -0,0 +1,70 @@
+from utils.admission_utils import AdmissionController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_controller(clock):
+    return AdmissionController(
+        slo_ms=1000, headroom=1.0, smoothing=0.5, decay_half_life_s=10,
+        baseline_ms={"embed": 10, "search": 20, "rerank_per_pair": 1, "keyword_search": 5}, clock=clock,
+    )
+
+
+def test_starts_from_baseline():
+    controller = make_controller(FakeClock())
+
+    assert controller.choose_tier(0.0, candidate_k=50, reduced_candidate_k=25) == "full"
+    assert controller.stats()["latency_ms"]["rerank_per_pair"] == 1.0
+
+
+def test_first_sample_is_smoothed():
+    controller = make_controller(FakeClock())
+
+    controller.observe("rerank", 2.0, pairs=50)
+
+    assert controller.stats()["latency_ms"]["rerank_per_pair"] == 20.5
+
+
+def test_recovers_full_tier_after_latencies_drop():
+    clock = FakeClock()
+    controller = make_controller(clock)
+
+    # Yavaş rerank ve arama tahminleri seviyeyi BM25'e düşürür
+    for _ in range(10):
+        controller.observe("rerank", 5.0, pairs=50)
+        controller.observe("search", 1.5)
+    assert controller.choose_tier(0.0, candidate_k=50, reduced_candidate_k=25) == "bm25_only"
+
+    # BM25 seviyesinde embedding, arama ve rerank ölçülmez; tahminleri zamanla baseline'a döner
+    clock.now += 5
+    controller.observe("keyword_search", 0.005)
+    assert controller.choose_tier(0.0, candidate_k=50, reduced_candidate_k=25) == "bm25_only"
+    clock.now += 60
+    assert controller.choose_tier(0.0, candidate_k=50, reduced_candidate_k=25) == "full"
+
+    # Tam seviyede gelen hızlı ölçümler seviyeyi korur
+    for _ in range(10):
+        clock.now += 1
+        controller.observe("embed", 0.01)
+        controller.observe("search", 0.02)
+        controller.observe("rerank", 0.05, pairs=50)
+    assert controller.choose_tier(0.0, candidate_k=50, reduced_candidate_k=25) == "full"
+
+
+def test_queue_wait_reduces_tier():
+    controller = make_controller(FakeClock())
+
+    assert controller.choose_tier(0.95, candidate_k=50, reduced_candidate_k=25) == "no_rerank"
+    assert controller.choose_tier(2.0, candidate_k=50, reduced_candidate_k=25) == "bm25_only"
+
+
+def test_disabled_always_full():
+    controller = AdmissionController(enabled=False)
+
+    assert controller.choose_tier(10.0, candidate_k=50, reduced_candidate_k=25) == "full"
@@ -0,0 +1,105 @@
+import time
+
+import numpy as np
+import pytest
+
+from utils.batching_utils import EmbeddingBatcher
+from utils.executor_utils import InferenceExecutorSaturated
+
+
+class FakeModel:
+    def __init__(self, error=None):
+        self.batches = []
+        self.error = error
+
+    def encode(self, texts, batch_size=None):
+        self.batches.append(list(texts))
+        if self.error is not None:
+            raise self.error
+        return np.array([[len(text), i] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def test_flushes_when_batch_is_full():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=4, max_wait_ms=10_000)
+    # Worker başlamadan kuyruğa alınan istekler ilk turda toplanır
+    futures = [batcher.submit(f"sorgu {i}") for i in range(4)]
+    started = time.perf_counter()
+    batcher.start()
+    try:
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.stop()
+
+    assert time.perf_counter() - started < 5
+    assert model.batches == [[f"sorgu {i}" for i in range(4)]]
+    assert [int(result[1]) for result in results] == [0, 1, 2, 3]
+
+
+def test_flushes_partial_batch_at_deadline():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=32, max_wait_ms=50).start()
+    try:
+        started = time.perf_counter()
+        futures = [batcher.submit(text) for text in ("a", "bb", "ccc")]
+        results = [future.result(timeout=5) for future in futures]
+        elapsed = time.perf_counter() - started
+    finally:
+        batcher.stop()
+
+    assert model.batches == [["a", "bb", "ccc"]]
+    assert [int(result[0]) for result in results] == [1, 2, 3]
+    assert 0.04 <= elapsed < 5
+    assert batcher.stats()["avg_batch_size"] == 3
+
+
+def test_splits_queue_into_max_size_batches():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=4, max_wait_ms=20)
+    futures = [batcher.submit(str(i)) for i in range(10)]
+    batcher.start()
+    try:
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        batcher.stop()
+
+    assert [len(batch) for batch in model.batches] == [4, 4, 2]
+
+
+def test_encode_error_is_set_on_every_future():
+    batcher = EmbeddingBatcher(FakeModel(error=ValueError("boom")), max_batch_size=8, max_wait_ms=10)
+    futures = [batcher.submit(str(i)) for i in range(3)]
+    batcher.start()
+    try:
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_submit_after_stop_raises():
+    batcher = EmbeddingBatcher(FakeModel()).start()
+    batcher.stop()
+
+    with pytest.raises(RuntimeError):
+        batcher.submit("sorgu")
+
+
+def test_rejects_when_queue_is_full():
+    model = FakeModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=8, max_wait_ms=10, max_queue_size=2)
+    futures = [batcher.submit(str(i)) for i in range(2)]
+
+    with pytest.raises(InferenceExecutorSaturated):
+        batcher.submit("taşan sorgu")
+
+    batcher.start()
+    try:
+        for future in futures:
+            future.result(timeout=5)
+        batcher.submit("yeni sorgu").result(timeout=5)
+    finally:
+        batcher.stop()
+    assert batcher.stats()["rejected"] == 1
@@ -0,0 +1,110 @@
+import time
+
+import numpy as np
+import pytest
+
+from models.models import QueryRequest
+from utils.cache_utils import EmbeddingCache, InMemoryResultBackend, ResultCache, SqliteResultBackend
+from utils.model_utils import get_embedding_model_id
+
+
+def vector(value: float) -> np.ndarray:
+    return np.full(4, value, dtype=np.float32)
+
+
+def entry_size(cache: EmbeddingCache, query: str) -> int:
+    key = cache.make_key(query, "model")
+    return cache._entry_size(key, vector(0.0))
+
+
+def test_make_key_normalizes_query():
+    assert EmbeddingCache.make_key("  ATEŞ ve  Öksürük ", "model") == EmbeddingCache.make_key("ateş ve öksürük", "model")
+    assert EmbeddingCache.make_key("baş ağrısı", "model") != EmbeddingCache.make_key("baş ağrısı", "other")
+
+
+@pytest.mark.parametrize("backend, precision, expected", [
+    ("torch", "fp32", "bge"),
+    ("torch", "int8", "bge@torch-int8"),
+    ("onnx", "bf16", "bge@onnx-fp32"),
+])
+def test_model_id_separates_backend_and_precision(monkeypatch, backend, precision, expected):
+    monkeypatch.setenv("EMBEDDING_MODEL_NAME", "bge")
+    monkeypatch.setenv("EMBEDDING_MODEL_BACKEND", backend)
+    monkeypatch.setenv("EMBEDDING_MODEL_PRECISION", precision)
+
+    assert get_embedding_model_id() == expected
+    assert EmbeddingCache.make_key("ateş", get_embedding_model_id()) == (expected, "ateş")
+
+
+def test_evicts_least_recently_used_entry():
+    probe = EmbeddingCache(max_bytes=1 << 20, ttl_seconds=60)
+    cache = EmbeddingCache(max_bytes=entry_size(probe, "q1") * 2, ttl_seconds=60)
+    keys = [cache.make_key(query, "model") for query in ("q1", "q2", "q3")]
+    cache.put(keys[0], vector(1))
+    cache.put(keys[1], vector(2))
+    # q1'e erişim onu en son kullanılan yapar; q3 eklenince q2 çıkarılır
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], vector(3))
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0])[0] == 1
+    assert cache.get(keys[2])[0] == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_expires_entries_after_ttl():
+    cache = EmbeddingCache(max_bytes=1 << 20, ttl_seconds=0.01)
+    key = cache.make_key("q", "model")
+    cache.put(key, vector(1))
+    time.sleep(0.02)
+
+    assert cache.get(key) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_cached_vectors_are_read_only():
+    cache = EmbeddingCache(max_bytes=1 << 20, ttl_seconds=60)
+    stored = cache.put(cache.make_key("q", "model"), vector(1))
+
+    with pytest.raises(ValueError):
+        stored[0] = 2
+
+
+@pytest.fixture(params=["memory", "disk"])
+def result_cache(request, tmp_path):
+    if request.param == "memory":
+        backend = InMemoryResultBackend(max_entries=100)
+    else:
+        backend = SqliteResultBackend(str(tmp_path / "results.sqlite3"), max_entries=100)
+    cache = ResultCache(backend, ttl_seconds=60)
+    yield cache
+    cache.close()
+
+
+def test_result_cache_is_invalidated_by_generation_bump(result_cache):
+    query = QueryRequest(query="ateş", collection_name="docs")
+    generation = result_cache.generation("docs")
+    result_cache.set(query, generation, [{"context": "a", "score": 1.0}])
+    assert result_cache.get(query, generation) == [{"context": "a", "score": 1.0}]
+
+    new_generation = result_cache.bump_generation("docs")
+
+    assert new_generation == generation + 1
+    assert result_cache.get(query, new_generation) is None
+    assert result_cache.stats()["stale"] == 1
+
+
+def test_result_cache_generations_are_per_collection(result_cache):
+    result_cache.bump_generation("docs")
+
+    assert result_cache.generation("docs") == 1
+    assert result_cache.generation("other") == 0
+
+
+def test_result_cache_keys_include_every_request_field(result_cache):
+    query = QueryRequest(query="ateş", collection_name="docs", top_k=5)
+    result_cache.set(query, 0, [])
+
+    assert result_cache.get(query.model_copy(update={"top_k": 3}), 0) is None
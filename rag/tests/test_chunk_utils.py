@@ -0,0 +1,80 @@
+import re
+
+import pytest
+
+from utils.chunk_utils import iter_offset_chunks
+
+TEXT = " ".join(
+    f"Hasta {i}. gün ateş, öksürük ve baş ağrısı tarif ediyor; muayenede bulgu {i % 7} saptandı."
+    for i in range(60)
+)
+
+
+class WordTokenizer:
+    """
+    Kelime ve noktalama başına bir token üreten, offset mapping veren fast tokenizer benzeri.
+    """
+    is_fast = True
+    model_max_length = 8192
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        return {"offset_mapping": [match.span() for match in re.finditer(r"\w+|[^\w\s]", text)]}
+
+
+def token_count(text: str) -> int:
+    return len(WordTokenizer()(text)["offset_mapping"])
+
+
+def split_blocks(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def chunks(blocks, **kwargs):
+    return list(iter_offset_chunks(blocks, tokenizer=WordTokenizer(), **kwargs))
+
+
+def test_chunks_are_exact_slices_of_source():
+    position = 0
+    for chunk in chunks([TEXT], chunk_size=40, chunk_overlap=5):
+        # Örtüşme nedeniyle her chunk bir öncekinin bitişinden önce başlayabilir, ama kaynakta sırayla bulunur
+        found = TEXT.find(chunk, max(0, position - len(chunk)))
+        assert found >= 0
+        position = found + len(chunk)
+    assert position == len(TEXT.rstrip())
+
+
+def test_chunks_respect_size_and_overlap():
+    result = chunks([TEXT], chunk_size=40, chunk_overlap=5)
+
+    assert len(result) > 1
+    assert all(token_count(chunk) <= 40 for chunk in result)
+    for previous, current in zip(result, result[1:]):
+        previous_tokens = re.findall(r"\w+|[^\w\s]", previous)
+        current_tokens = re.findall(r"\w+|[^\w\s]", current)
+        assert previous_tokens[-5:] == current_tokens[:5]
+
+
+@pytest.mark.parametrize("block_size", [7, 64, 1000])
+def test_streamed_blocks_match_single_block(block_size):
+    expected = chunks([TEXT], chunk_size=40, chunk_overlap=5)
+
+    assert chunks(split_blocks(TEXT, block_size), chunk_size=40, chunk_overlap=5) == expected
+
+
+def test_sentence_mode_ends_chunks_on_sentence_boundaries():
+    result = chunks([TEXT], chunk_size=40, chunk_overlap=0, boundary_mode="sentence")
+
+    assert all(chunk.rstrip().endswith(".") for chunk in result)
+    assert all(token_count(chunk) <= 40 for chunk in result)
+
+
+def test_short_text_is_one_chunk():
+    assert chunks(["Kısa bir ", "metin."], chunk_size=40) == ["Kısa bir metin."]
+
+
+def test_requires_fast_tokenizer():
+    class SlowTokenizer(WordTokenizer):
+        is_fast = False
+
+    with pytest.raises(ValueError):
+        list(iter_offset_chunks([TEXT], tokenizer=SlowTokenizer()))
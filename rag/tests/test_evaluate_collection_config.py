@@ -0,0 +1,32 @@
+import io
+import urllib.error
+
+from tools import evaluate_collection_config
+from tools.evaluate_collection_config import read_weaviate_memory
+
+METRICS = b"""# HELP go_memstats_heap_inuse_bytes Number of heap bytes that are in use.
+# TYPE go_memstats_heap_inuse_bytes gauge
+go_memstats_heap_inuse_bytes 1.048576e+08
+# HELP vector_index_size The size of the vector index.
+# TYPE vector_index_size gauge
+vector_index_size{class_name="ConfigEval0",shard_name="a"} 1000
+vector_index_size{class_name="ConfigEval0",shard_name="b"} 24
+vector_index_size{class_name="Other",shard_name="a"} 5000
+"""
+
+
+def test_reads_heap_and_collection_index_size(monkeypatch):
+    monkeypatch.setattr(evaluate_collection_config.urllib.request, "urlopen", lambda url, timeout: io.BytesIO(METRICS))
+
+    memory = read_weaviate_memory("http://weaviate:2112/metrics", "ConfigEval0")
+
+    assert memory == {"heap_inuse_bytes": 104857600.0, "vector_index_size": 1024.0}
+
+
+def test_unreachable_metrics_endpoint(monkeypatch):
+    def unreachable(url, timeout):
+        raise urllib.error.URLError("connection refused")
+
+    monkeypatch.setattr(evaluate_collection_config.urllib.request, "urlopen", unreachable)
+
+    assert read_weaviate_memory("http://weaviate:2112/metrics", "ConfigEval0") is None
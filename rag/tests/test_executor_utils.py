@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import search
+from utils.executor_utils import InferenceExecutor, InferenceExecutorSaturated
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_rejects_when_workers_and_queue_are_full(executor):
+    release = threading.Event()
+    running = executor.submit(release.wait)
+    wait_until(lambda: executor.stats()["running"] == 1)
+    queued = executor.submit(lambda: "done")
+
+    assert executor.queue_depth() == 1
+    with pytest.raises(InferenceExecutorSaturated):
+        executor.submit(lambda: "rejected")
+
+    release.set()
+    running.result(timeout=5)
+    assert queued.result(timeout=5) == "done"
+    stats = executor.stats()
+    assert (stats["queue_depth"], stats["running"], stats["completed"], stats["rejected"]) == (0, 0, 2, 1)
+
+
+def test_recent_wait_reports_queueing_only_while_backlogged(executor):
+    first, second = threading.Event(), threading.Event()
+    executor.submit(first.wait)
+    wait_until(lambda: executor.stats()["running"] == 1)
+    executor.submit(second.wait)
+    time.sleep(0.05)
+    first.set()
+    wait_until(lambda: executor.queue_depth() == 0 and executor.stats()["completed"] == 1)
+    # İkinci iş ~50 ms bekledi; kuyrukta iş olmadıkça tahmin sıfırdır
+    assert executor.recent_wait() == 0.0
+    third = executor.submit(lambda: None)
+
+    assert executor.recent_wait() >= 0.04
+    second.set()
+    third.result(timeout=5)
+    assert executor.recent_wait() == 0.0
+    assert executor.stats()["wait_ms_max"] >= 40
+
+
+def test_search_returns_503_when_saturated(monkeypatch):
+    executor = InferenceExecutor(max_workers=1, max_queue_size=0)
+    release = threading.Event()
+    executor.submit(release.wait)
+
+    async def retrieve(request, started):
+        return await executor.run(lambda: []), "full"
+
+    monkeypatch.setattr(search, "retrieve", retrieve)
+    app = FastAPI()
+    app.include_router(search.router)
+    try:
+        response = TestClient(app).post("/rag/search", json={"query": "baş ağrısı"})
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert response.status_code == 503
+    assert "Inference queue is full" in response.json()["detail"]
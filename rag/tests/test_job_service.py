@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import search
+from services import job_service
+from services.job_service import JobQueue
+
+
+class IdleExecutor:
+    def stats(self):
+        return {"running": 0, "queue_depth": 0}
+
+
+def empty_report():
+    return {"chunks": 0, "inserted": 0, "skipped": 0, "reused": 0, "failed": 0, "deleted": 0, "batches": 0, "errors": []}
+
+
+@pytest.fixture
+def make_queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_service, "get_inference_executor", IdleExecutor)
+
+    def make(index):
+        monkeypatch.setattr(job_service, "embed_and_index_stream", index)
+        return JobQueue(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "spool"), progress_interval=0.0)
+
+    return make
+
+
+def submit(queue, text="ilk satır\nikinci satır\n"):
+    job_id = queue.new_job_id()
+    with open(queue.spool_path(job_id), "w") as spool_file:
+        spool_file.write(text)
+    queue.submit(job_id, filename="doc.txt", collection_name="docs")
+    return job_id
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_progress_excludes_skipped_chunks(make_queue):
+    def index(text_blocks, collection_name, source, progress_callback=None):
+        list(text_blocks)
+        report = {**empty_report(), "chunks": 10, "skipped": 6, "failed": 1, "batches": 1}
+        report["inserted"] = 3
+        return report
+
+    queue = make_queue(index).start()
+    job_id = submit(queue)
+    assert wait_for(lambda: queue.get(job_id)["status"] == "completed_with_errors")
+    job = queue.get(job_id)
+    queue.stop()
+
+    assert (job["chunks"], job["inserted"], job["failed"]) == (10, 3, 1)
+
+
+def test_stop_requeues_running_job_and_keeps_spool(make_queue):
+    started = threading.Event()
+
+    def index(text_blocks, collection_name, source, progress_callback=None):
+        report = empty_report()
+        started.set()
+        while True:
+            report["batches"] += 1
+            progress_callback(report)
+            time.sleep(0.01)
+
+    queue = make_queue(index).start()
+    job_id = submit(queue)
+    assert started.wait(5.0)
+    queue.stop()
+
+    queue = make_queue(lambda *args, **kwargs: empty_report())
+    job = queue.get(job_id)
+    assert job["status"] == "queued"
+    assert job["started_at"] is None
+    assert os.path.exists(queue.spool_path(job_id))
+
+    # Yeniden başlatıldığında iş kaldığı yerden tamamlanır
+    queue.start()
+    assert wait_for(lambda: queue.get(job_id)["status"] == "completed")
+    queue.stop()
+
+
+def test_upload_removes_spool_when_submit_fails(make_queue, monkeypatch):
+    queue = make_queue(lambda *args, **kwargs: empty_report())
+
+    def failing_submit(job_id, filename, collection_name):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(queue, "submit", failing_submit)
+    monkeypatch.setattr(search, "get_job_queue", lambda: queue)
+    app = FastAPI()
+    app.include_router(search.router)
+
+    response = TestClient(app).post("/rag/index-document", files={"file": ("doc.txt", "ilk satır\n".encode("utf-8"))})
+
+    assert response.status_code == 500
+    assert os.listdir(queue.spool_dir) == []
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from services.vector_service import chunk_hash, chunk_id
+from tools.load_embedding_store import load_collection
+from utils.embedding_store import EmbeddingStore
+from utils.manifest_utils import DocumentManifest
+from utils.vector_store_utils import LocalVectorStore
+
+
+def index(store, manifest, collection, source, texts):
+    """
+    Dokümanı indeksleme yolunun store ve manifest'e bıraktığı durumu kurar.
+    """
+    ids = [chunk_id(source, text) for text in texts]
+    vectors = np.random.default_rng(len(store)).random((len(texts), 4), dtype=np.float32)
+    store.append(ids, vectors, [{"context": text, "source": source, "chunk_hash": chunk_hash(text)} for text in texts])
+    manifest.replace(collection, source, ids)
+    return ids
+
+
+@pytest.fixture
+def state(tmp_path):
+    store = EmbeddingStore(str(tmp_path / "store"), model_name="test-model")
+    manifest = DocumentManifest(str(tmp_path / "manifest.sqlite3"))
+    vector_store = LocalVectorStore(str(tmp_path / "vectors"), candidates=10)
+    index(store, manifest, "docs", "doc.txt", ["alpha beta gamma"])
+    v2_ids = index(store, manifest, "docs", "doc.txt", ["alpha beta delta"])
+    index(store, manifest, "docs", "other.txt", ["epsilon zeta"])
+    manifest.delete("docs", "other.txt")
+    yield store, manifest, vector_store, v2_ids
+    vector_store.close()
+    manifest.close()
+    store.close()
+
+
+def contexts(vector_store, collection, query):
+    return [result["context"] for result in vector_store.hybrid_search(collection, query, None, limit=10, alpha=0.0)]
+
+
+def test_load_skips_replaced_and_deleted_chunks(state):
+    store, manifest, vector_store, v2_ids = state
+
+    report = load_collection(store, manifest, vector_store, "restored", source_collection="docs", batch_size=2, concurrency=1)
+
+    assert report["loaded"] == 1 and report["stale"] == 2
+    assert contexts(vector_store, "restored", "alpha") == ["alpha beta delta"]
+    assert contexts(vector_store, "restored", "gamma") == []
+    assert contexts(vector_store, "restored", "epsilon") == []
+    assert manifest.get_collection_chunk_ids("restored") == {"doc.txt": set(v2_ids)}
+
+
+def test_all_chunks_loads_every_stored_vector(state):
+    store, manifest, vector_store, _ = state
+
+    report = load_collection(store, manifest, vector_store, "restored", batch_size=2, concurrency=1, all_chunks=True)
+
+    assert report["loaded"] == 3 and report["stale"] == 0
+    assert set(manifest.get_collection_chunk_ids("restored")) == {"doc.txt", "other.txt"}
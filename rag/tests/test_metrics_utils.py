@@ -0,0 +1,58 @@
+import pytest
+from prometheus_client import CollectorRegistry, generate_latest
+from prometheus_client.parser import text_string_to_metric_families
+
+from utils.metrics_utils import StatsCollector, get_metrics_registry, stats_samples, time_stage
+
+
+def families(registry) -> dict:
+    text = generate_latest(registry).decode("utf-8")
+    return {family.name: family for family in text_string_to_metric_families(text)}
+
+
+def test_stats_samples_flattens_nested_stats():
+    stats = {"hits": 3, "backend": "memory", "tiers": {"full": 2, "bm25_only": 1}, "latency": None}
+
+    samples = list(stats_samples("rag_test", "Test state", stats, label_names={"tiers": "tier"}))
+
+    assert samples == [
+        ("rag_test_hits", "Test state (hits)", {}, 3),
+        ("rag_test_tiers", "Test state (tiers)", {"tier": "full"}, 2),
+        ("rag_test_tiers", "Test state (tiers)", {"tier": "bm25_only"}, 1),
+    ]
+
+
+def test_stats_collector_exposes_gauges_and_skips_failures():
+    registry = CollectorRegistry()
+    registry.register(StatsCollector("ok", lambda: stats_samples(
+        "rag_test", "Test state", {"queue_depth": 4, "tiers": {"full": 2, "cached": None}}, label_names={"tiers": "tier"},
+    )))
+
+    def failing():
+        raise RuntimeError("not loaded")
+        yield
+
+    registry.register(StatsCollector("failing", failing))
+
+    exposed = families(registry)
+
+    assert exposed["rag_test_queue_depth"].type == "gauge"
+    assert exposed["rag_test_queue_depth"].samples[0].value == 4
+    assert [(sample.labels, sample.value) for sample in exposed["rag_test_tiers"].samples] == [({"tier": "full"}, 2)]
+
+
+def test_time_stage_records_duration_and_errors():
+    with pytest.raises(ValueError):
+        with time_stage("test_failing_stage", batch_size=3):
+            raise ValueError("boom")
+
+    exposed = families(get_metrics_registry())
+    durations = {
+        sample.name: sample.value for sample in exposed["rag_stage_duration_seconds"].samples
+        if sample.labels.get("stage") == "test_failing_stage"
+    }
+    errors = [sample.value for sample in exposed["rag_stage_errors"].samples
+              if sample.labels.get("stage") == "test_failing_stage" and sample.name == "rag_stage_errors_total"]
+
+    assert durations["rag_stage_duration_seconds_count"] == 1
+    assert errors == [1]
@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("optimum.onnxruntime")
+
+from benchmarks.bench_precision import QUERY_SET, embed_all  # noqa: E402
+from services.rerank_service import score_pairs  # noqa: E402
+from utils.model_utils import build_embedding_model, build_reranker_model  # noqa: E402
+
+# bench_onnx_backend ile aynı eşikler
+MIN_COSINE = 0.999
+MAX_SCORE_DIFF = 0.05
+
+
+@pytest.fixture(scope="module")
+def onnx_models(model_paths):
+    if not all(os.path.exists(f"{model_paths[model]}/onnx/model.onnx") for model in ("embedding", "reranker")):
+        pytest.skip("Exported ONNX models are not available")
+    return (
+        build_embedding_model(os.getenv("EMBEDDING_MODEL_NAME"), backend="onnx"),
+        build_reranker_model(os.getenv("RERANKER_MODEL_NAME"), backend="onnx"),
+    )
+
+
+def test_embedding_parity(reference_models, onnx_models):
+    cosines = np.sum(embed_all(reference_models[0]) * embed_all(onnx_models[0]), axis=1)
+
+    assert cosines.min() >= MIN_COSINE
+
+
+def test_reranker_parity(reference_models, onnx_models):
+    pairs = [(query, passage) for query, passages in QUERY_SET for passage in passages]
+    reference = np.asarray(score_pairs(reference_models[1], pairs))
+    scores = np.asarray(score_pairs(onnx_models[1], pairs))
+
+    assert np.max(np.abs(reference - scores)) <= MAX_SCORE_DIFF
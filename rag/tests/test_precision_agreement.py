@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.bench_precision import (
+    PRECISION_THRESHOLDS, agreement, embed_all, failed_thresholds, rerank_scores, with_precision,
+)
+
+
+@pytest.fixture(scope="module")
+def reference_outputs(reference_models):
+    embedding_model, reranker = reference_models
+    return rerank_scores(reranker), embed_all(embedding_model)
+
+
+@pytest.mark.parametrize("mode", sorted(PRECISION_THRESHOLDS))
+def test_precision_mode_agrees_with_fp32(mode, reference_models, reference_outputs):
+    embedding_model, reranker = with_precision(*reference_models, mode)
+    reference_scores, reference_embeddings = reference_outputs
+
+    metrics = agreement(rerank_scores(reranker), reference_scores, embed_all(embedding_model), reference_embeddings)
+
+    assert failed_thresholds(mode, metrics) == [], metrics
+
+
+def test_failed_thresholds():
+    metrics = {"max_abs_diff": 0.3, "spearman": 0.85, "top1": 1.0, "min_cosine": 0.999, "mean_cosine": 0.999}
+
+    assert failed_thresholds("bf16", metrics) == ["spearman"]
+    assert failed_thresholds("int8", metrics) == ["spearman"]
+    assert failed_thresholds("fp32", metrics) == []
@@ -0,0 +1,46 @@
+import pytest
+
+from services import rerank_service
+from services.rerank_service import adaptive_rerank
+
+# Her bağlamın token uzunluğu ve cross-encoder skoru
+PAIRS = {"a": (10, 0.5), "b": (10, 2.0), "c": (10, -3.0), "d": (10, 1.0), "e": (10, 0.0)}
+
+
+@pytest.fixture(autouse=True)
+def fake_scoring(monkeypatch):
+    def encode_pairs(model, pairs, max_length=None):
+        return [context for _, context in pairs], [PAIRS[context][0] for _, context in pairs]
+
+    def score_encoded(model, encoded, lengths, indices, max_tokens_per_batch=None):
+        return [PAIRS[encoded[index]][1] for index in indices]
+
+    monkeypatch.setattr(rerank_service, "encode_pairs", encode_pairs)
+    monkeypatch.setattr(rerank_service, "score_encoded", score_encoded)
+
+
+def candidates(*contexts):
+    return [{"context": context, "score": 1.0 - i / 10} for i, context in enumerate(contexts)]
+
+
+def test_reranks_and_drops_rejected_candidates():
+    results, info = adaptive_rerank(None, "sorgu", candidates("a", "b", "c", "d"), top_k=3)
+
+    assert [result["context"] for result in results] == ["b", "d", "a"]
+    assert info["scored"] == 4 and info["filled"] == 0
+
+
+def test_token_budget_fills_remaining_slots_in_hybrid_order():
+    results, info = adaptive_rerank(None, "sorgu", candidates("a", "b", "c", "d", "e"), top_k=4, token_budget=30)
+
+    # a, b, c skorlandı (c reddedildi); boş kalan yerler skorlanmamış d ve e ile hybrid sırasıyla dolar
+    assert [result["context"] for result in results] == ["b", "a", "d", "e"]
+    assert [result["score"] for result in results] == [2.0, 0.5, 0.7, 0.6]
+    assert (info["stopped"], info["scored"], info["filled"]) == ("token_budget", 3, 2)
+
+
+def test_token_budget_returns_at_least_top_k_results():
+    results, info = adaptive_rerank(None, "sorgu", candidates("b", "d", "a", "e"), top_k=3, token_budget=10)
+
+    assert [result["context"] for result in results] == ["b", "d", "a"]
+    assert info["filled"] == 2
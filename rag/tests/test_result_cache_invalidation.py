@@ -0,0 +1,43 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import search
+from tools.load_embedding_store import invalidate_result_cache
+from utils import cache_utils
+
+
+@pytest.fixture
+def memory_result_cache(monkeypatch):
+    monkeypatch.setenv("RESULT_CACHE_BACKEND", "memory")
+    cache = cache_utils.create_result_cache()
+    yield cache
+    cache_utils.close_result_cache()
+
+
+def test_invalidate_endpoint_bumps_generation(memory_result_cache):
+    app = FastAPI()
+    app.include_router(search.router)
+
+    response = TestClient(app).post("/rag/cache/invalidate", params={"collection_name": "docs"})
+
+    assert response.json() == {"collection_name": "docs", "generation": 1}
+    assert memory_result_cache.generation("docs") == 1
+
+
+def test_tool_bumps_shared_disk_generation(monkeypatch, tmp_path):
+    path = tmp_path / "results.sqlite3"
+    monkeypatch.setenv("RESULT_CACHE_BACKEND", "disk")
+    monkeypatch.setenv("RESULT_CACHE_PATH", str(path))
+    server_cache = cache_utils.ResultCache(cache_utils.SqliteResultBackend(str(path), max_entries=10), ttl_seconds=60)
+
+    invalidate_result_cache("docs", server_url="http://127.0.0.1:9")
+
+    assert server_cache.generation("docs") == 1
+    server_cache.close()
+
+
+def test_tool_tolerates_stopped_server(monkeypatch):
+    monkeypatch.setenv("RESULT_CACHE_BACKEND", "memory")
+
+    invalidate_result_cache("docs", server_url="http://127.0.0.1:9")
@@ -0,0 +1,116 @@
+import asyncio
+import uuid
+
+import numpy as np
+import pytest
+
+from utils import executor_utils
+from utils.vector_store_utils import LocalVectorStore, relative_score_fusion, top_k
+
+DOCUMENTS = {
+    "fever": ("Ateş ve boğaz ağrısı tonsillit belirtisidir.", [1.0, 0.0, 0.0]),
+    "chest": ("Göğüs ağrısı sol kola yayılabilir.", [0.0, 1.0, 0.0]),
+    "thirst": ("Aşırı susama ve sık idrara çıkma diyabeti düşündürür.", [0.0, 0.0, 1.0]),
+}
+
+
+def object_id(name: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, name))
+
+
+def write(store, documents, collection="docs"):
+    with store.batch_writer(collection, batch_size=2, concurrency=1) as batch:
+        for name, (context, vector) in documents.items():
+            batch.add_object(properties={"context": context, "source": "test"}, vector=vector, uuid=object_id(name))
+    return batch
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalVectorStore(str(tmp_path), candidates=10)
+    write(store, DOCUMENTS)
+    yield store
+    store.close()
+
+
+def contexts(results):
+    return [result["context"] for result in results]
+
+
+def test_vector_search_ranks_nearest_first(store):
+    results = store.hybrid_search("docs", "", [0.1, 0.9, 0.0], limit=2, alpha=1.0)
+
+    assert contexts(results)[0] == DOCUMENTS["chest"][0]
+    assert results[0]["id"] == uuid.UUID(object_id("chest")).int
+
+
+def test_keyword_search_without_vector(store):
+    results = store.hybrid_search("docs", "SUSAMA", None, limit=3, alpha=0.0)
+
+    assert contexts(results) == [DOCUMENTS["thirst"][0]]
+
+
+def test_hybrid_search_combines_both_signals(store):
+    results = store.hybrid_search("docs", "boğaz", [0.0, 0.0, 1.0], limit=3, alpha=0.5)
+
+    assert set(contexts(results[:2])) == {DOCUMENTS["fever"][0], DOCUMENTS["thirst"][0]}
+
+
+def test_delete_and_overwrite(store):
+    assert store.delete_ids("docs", [object_id("chest"), object_id("missing")]) == 1
+    write(store, {"fever": ("Yüksek ateş ve titreme.", [1.0, 0.0, 0.0])})
+
+    assert store.fetch_existing_ids("docs", [object_id(name) for name in DOCUMENTS]) == {
+        object_id("fever"), object_id("thirst"),
+    }
+    assert contexts(store.hybrid_search("docs", "ağrısı", None, limit=3, alpha=0.0)) == []
+    assert contexts(store.hybrid_search("docs", "", [1.0, 0.0, 0.0], limit=1, alpha=1.0)) == ["Yüksek ateş ve titreme."]
+
+
+def test_reopened_store_keeps_index(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    write(store, DOCUMENTS)
+    store.delete_ids("docs", [object_id("thirst")])
+    store.close()
+
+    reopened = LocalVectorStore(str(tmp_path))
+    try:
+        assert reopened.fetch_existing_ids("docs", [object_id(name) for name in DOCUMENTS]) == {
+            object_id("fever"), object_id("chest"),
+        }
+        assert contexts(reopened.hybrid_search("docs", "göğüs", None, limit=1, alpha=0.0)) == [DOCUMENTS["chest"][0]]
+    finally:
+        reopened.close()
+
+
+def test_dimension_mismatch_is_reported_as_failed_objects(store):
+    batch = write(store, {"bad": ("Yanlış boyut.", [1.0, 0.0])})
+
+    assert [failed_id for failed_id, _ in batch.failed_objects] == [object_id("bad")]
+
+
+def test_async_search_runs_on_inference_executor(store):
+    executor_utils.create_inference_executor()
+    try:
+        results = asyncio.run(store.hybrid_search_async("docs", "göğüs", None, 1, 0.0))
+        assert executor_utils.get_inference_executor().stats()["completed"] == 1
+    finally:
+        executor_utils.close_inference_executor()
+
+    assert contexts(results) == [DOCUMENTS["chest"][0]]
+
+
+def test_relative_score_fusion_normalizes_each_result_set():
+    fused = relative_score_fusion([
+        (0.5, np.array([1, 2]), np.array([0.9, 0.1])),
+        (0.5, np.array([2, 3]), np.array([10.0, 5.0])),
+    ], limit=3)
+
+    assert fused == [(1, 0.5), (2, 0.5), (3, 0.0)]
+
+
+def test_top_k_returns_sorted_indices():
+    scores = np.array([0.2, 0.9, 0.5, 0.7])
+
+    assert top_k(scores, 2).tolist() == [1, 3]
+    assert top_k(scores, 10).tolist() == [1, 3, 2, 0]
@@ -0,0 +1,192 @@
+"""
+Koleksiyon vektör indeksi konfigürasyonlarını korpusumuz üzerinde karşılaştırır.
+
+Vektörler embedding store'dan okunur (model yüklenmez). Her konfigürasyon için geçici bir Weaviate koleksiyonu
+oluşturulur ve doldurulur. Store'dan örneklenen sorgu vektörleriyle saf vektör araması yapılır ve sonuçlar,
+store üzerinde numpy ile hesaplanan kesin kosinüs top-k ile karşılaştırılır. Her konfigürasyon için recall@k,
+sorgu gecikmesi (p50/p99), shard'ın sıkıştırılıp sıkıştırılmadığı ve tahmini bellek (vektör önbelleği +
+HNSW grafı) raporlanır. Konfigürasyonlar get_collection_config() anahtarlarını ezen JSON nesneleridir.
+
+Tahminin yanında Weaviate'in Prometheus uç noktasından (WEAVIATE_METRICS_URL; Weaviate'te
+PROMETHEUS_MONITORING_ENABLED=true gerekir) ölçülen değerler de raporlanır: koleksiyon yüklenmeden önceki ve
+sorgulardan sonraki Go heap kullanımı (go_memstats_heap_inuse_bytes) farkı ve koleksiyonun vector_index_size
+değeri. Heap farkı GC zamanlamasına bağlıdır; konfigürasyonları aynı Weaviate sürecinde art arda ölçerken
+kabaca karşılaştırmak içindir. Uç noktaya erişilemezse bu sütunlar boş kalır.
+
+Kullanım (rag dizininden):
+    python -m tools.evaluate_collection_config --queries 200 --k 10
+    python -m tools.evaluate_collection_config --configs '[{"ef": 64}, {"compression": "pq"}, {"compression": "bq", "rescore_limit": 400}]'
+"""
+from benchmarks.bench_embedding_batching import percentile
+from utils.embedding_store import create_embedding_store, close_embedding_store
+from utils.vector_db_utils import create_client, close_client_conection, create_collection, get_collection_config
+from prometheus_client.parser import text_string_to_metric_families
+from typing import Dict, Optional
+import argparse
+import json
+import logging
+import os
+import time
+import urllib.error
+import urllib.request
+import numpy as np
+
+DEFAULT_CONFIGS = [
+    {},
+    {"ef": 64},
+    {"ef": 256},
+    {"max_connections": 16},
+    {"compression": "pq"},
+    {"compression": "bq", "rescore_limit": 200},
+    {"compression": "sq", "rescore_limit": 200},
+]
+
+# Eleman başına HNSW bağlantısı maliyeti (uint64 id + dilim başlığı payı), katman 0'da 2 x maxConnections bağlantı
+_HNSW_BYTES_PER_CONNECTION = 10
+
+
+def estimate_memory_bytes(config: dict, count: int, dim: int) -> int:
+    """
+    Weaviate'in bellekte tuttuğu vektör önbelleği ve HNSW grafı için kaba tahmin.
+    Sıkıştırmada önbellekte yalnızca sıkıştırılmış kodlar tutulur; orijinal vektörler rescoring için diskte kalır.
+    """
+    compression = config["compression"]
+    if compression == "pq":
+        segments = config["pq_segments"] or dim // 4
+        vector_bytes = segments
+    elif compression == "bq":
+        vector_bytes = dim / 8
+    elif compression == "sq":
+        vector_bytes = dim
+    else:
+        vector_bytes = dim * 4
+    graph_bytes = 2 * config["max_connections"] * _HNSW_BYTES_PER_CONNECTION
+    return int(count * (vector_bytes + graph_bytes))
+
+
+def read_weaviate_memory(metrics_url: str, collection_name: str) -> Optional[Dict[str, float]]:
+    """
+    Weaviate /metrics çıktısından Go heap kullanımını ve koleksiyonun vektör indeksi boyutunu (düğüm sayısı) okur.
+    Uç noktaya erişilemezse None döner.
+    """
+    try:
+        with urllib.request.urlopen(metrics_url, timeout=10) as response:
+            text = response.read().decode("utf-8")
+    except (urllib.error.URLError, OSError) as e:
+        logging.warning(f"Could not read Weaviate metrics from {metrics_url}: {e}")
+        return None
+    memory = {"heap_inuse_bytes": None, "vector_index_size": 0.0}
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            if sample.name == "go_memstats_heap_inuse_bytes":
+                memory["heap_inuse_bytes"] = sample.value
+            elif sample.name == "vector_index_size" and sample.labels.get("class_name") == collection_name:
+                memory["vector_index_size"] += sample.value
+    return memory
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def exact_top_k(store, queries: np.ndarray, k: int):
+    """
+    Store'u batch batch tarayarak her sorgu için kesin kosinüs top-k chunk id'lerini döner.
+    """
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.empty((len(queries), k), dtype=object)
+    for ids, vectors, _ in store.iter_batches(batch_size=10000):
+        scores = queries @ normalize(vectors).T
+        merged_scores = np.concatenate([best_scores, scores], axis=1)
+        merged_ids = np.concatenate([best_ids, np.tile(np.asarray(ids, dtype=object), (len(queries), 1))], axis=1)
+        order = np.argsort(-merged_scores, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, order, axis=1)
+        best_ids = np.take_along_axis(merged_ids, order, axis=1)
+    return [set(row) for row in best_ids]
+
+
+def sample_queries(store, count: int, seed: int):
+    total = len(store)
+    rng = np.random.default_rng(seed)
+    wanted = set(rng.choice(total, size=min(count, total), replace=False).tolist())
+    queries, position = [], 0
+    for _, vectors, _ in store.iter_batches(batch_size=10000):
+        for vector in vectors:
+            if position in wanted:
+                queries.append(vector)
+            position += 1
+    return normalize(np.asarray(queries, dtype=np.float32))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", help="JSON listesi; verilmezse yerleşik konfigürasyonlar denenir")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--collection-prefix", default="ConfigEval")
+    parser.add_argument("--keep", action="store_true", help="Geçici koleksiyonları silme")
+    parser.add_argument("--metrics-url", default=os.getenv("WEAVIATE_METRICS_URL", "http://weaviate:2112/metrics"),
+                        help="Ölçülen bellek için Weaviate Prometheus uç noktası")
+    args = parser.parse_args()
+    overrides = json.loads(args.configs) if args.configs else DEFAULT_CONFIGS
+
+    store = create_embedding_store()
+    client = create_client()
+    try:
+        queries = sample_queries(store, args.queries, seed=0)
+        truth = exact_top_k(store, queries, args.k)
+        count, dim = len(store), store.dim
+        print(f"{len(queries)} queries against {count} vectors (dim={dim}), k={args.k}")
+        print(
+            f"{'config':>48} {'recall':>7} {'p50_ms':>8} {'p99_ms':>8} {'compressed':>10} {'est_mem_mb':>10} "
+            f"{'heap_mb':>8} {'index_size':>10} {'load_s':>7}"
+        )
+        for i, override in enumerate(overrides):
+            config = {**get_collection_config(), **override}
+            name = f"{args.collection_prefix}{i}"
+            if client.collections.exists(name):
+                client.collections.delete(name)
+            before = read_weaviate_memory(args.metrics_url, name)
+            create_collection(name, config=config)
+            collection = client.collections.get(name)
+            try:
+                started = time.perf_counter()
+                with collection.batch.fixed_size(batch_size=1000, concurrent_requests=4) as batch:
+                    for ids, vectors, metadatas in store.iter_batches(batch_size=1000):
+                        for object_id, vector, metadata in zip(ids, vectors, metadatas):
+                            batch.add_object(properties=metadata, vector=vector.tolist(), uuid=object_id)
+                load_seconds = time.perf_counter() - started
+
+                latencies, recalls = [], []
+                for query, expected in zip(queries, truth):
+                    started = time.perf_counter()
+                    response = collection.query.near_vector(near_vector=query.tolist(), limit=args.k, return_properties=[])
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    recalls.append(len({str(obj.uuid) for obj in response.objects} & expected) / args.k)
+
+                after = read_weaviate_memory(args.metrics_url, name)
+                heap_mb = index_size = "-"
+                if before and after and before["heap_inuse_bytes"] is not None and after["heap_inuse_bytes"] is not None:
+                    heap_mb = f"{(after['heap_inuse_bytes'] - before['heap_inuse_bytes']) / 2**20:.1f}"
+                if after:
+                    index_size = f"{after['vector_index_size']:.0f}"
+
+                shards = [shard for node in client.cluster.nodes(collection=name, output="verbose") for shard in node.shards or []]
+                compressed = any(shard.compressed for shard in shards)
+                label = json.dumps(override, sort_keys=True) or "{}"
+                print(
+                    f"{label:>48} {np.mean(recalls):>7.3f} {percentile(latencies, 50):>8.2f} {percentile(latencies, 99):>8.2f} "
+                    f"{str(compressed):>10} {estimate_memory_bytes(config, count, dim) / 2**20:>10.1f} "
+                    f"{heap_mb:>8} {index_size:>10} {load_seconds:>7.1f}"
+                )
+            finally:
+                if not args.keep:
+                    client.collections.delete(name)
+    finally:
+        close_client_conection()
+        close_embedding_store()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Embedding store'dan vektör koleksiyonunu (VECTOR_BACKEND) yeniden doldurur.
+
+Vektörler memory-map edilmiş store dosyasından okunur ve fixed-size batch API ile yazılır; embedding modeli
+yüklenmez. HNSW ayarlarını değiştirmek, yeni bir koleksiyona geçmek veya kaybolan weaviate_data volume'ünü
+geri kurmak için kullanılır. Yazılan chunk'lar doküman manifest'ine de işlenir, böylece sonraki yüklemeler
+artımlı indekslemeye devam eder.
+
+Store yalnızca ekleme yapar ve modele göre tüm koleksiyonlarca paylaşılır; yeniden indekslenen dokümanların eski
+chunk'ları ile silinen dokümanların chunk'ları store'da kalır. Bu yüzden yalnızca kaynak koleksiyonun
+(--source-collection, varsayılanı --collection) manifest'inde listelenen chunk'lar yüklenir. Manifest
+kaybolduysa --all-chunks store'daki her vektörü yükler; eski sürümler de geri gelir.
+
+Yükleme sonunda koleksiyonun sonuç cache'i geçersiz kılınır. disk backend'inde generation paylaşılan SQLite
+dosyasında artırılır; memory backend'inde cache sunucu sürecinde olduğundan çalışan sunucunun
+/rag/cache/invalidate uç noktası (--server-url) çağrılır. Sunucu çalışmıyorsa geçersiz kılınacak bir cache yoktur.
+
+Kullanım (rag dizininden):
+    python -m tools.load_embedding_store --collection Documents --batch-size 1000
+    python -m tools.load_embedding_store --collection DocumentsV2 --source-collection Documents
+"""
+from utils.cache_utils import create_result_cache, close_result_cache
+from utils.embedding_store import create_embedding_store, close_embedding_store
+from utils.manifest_utils import create_document_manifest, close_document_manifest
+from utils.vector_store_utils import create_vector_store, close_vector_store
+from typing import Dict, Optional, Set
+import argparse
+import logging
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+def invalidate_result_cache(collection_name: str, server_url: str):
+    if os.getenv("RESULT_CACHE_BACKEND", "memory").lower() == "disk":
+        result_cache = create_result_cache()
+        try:
+            result_cache.bump_generation(collection_name)
+        finally:
+            close_result_cache()
+        return
+    url = f"{server_url.rstrip('/')}/rag/cache/invalidate?{urllib.parse.urlencode({'collection_name': collection_name})}"
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, method="POST"), timeout=10) as response:
+            logging.info(f"Result cache invalidated on {server_url}: {response.read().decode('utf-8')}")
+    except urllib.error.URLError as e:
+        logging.warning(f"Could not reach {server_url} to invalidate the result cache ({e}); "
+                        f"a server that is not running has no cached results to invalidate.")
+
+
+def load_collection(store, manifest, vector_store, collection_name: str, *, source_collection: Optional[str] = None,
+                    batch_size: int = 1000, concurrency: int = 4, skip_existing: bool = False,
+                    all_chunks: bool = False) -> dict:
+    """
+    Store'daki vektörleri koleksiyona yazar ve koleksiyonun manifest'ini günceller; yükleme raporunu döner.
+    all_chunks verilmezse yalnızca kaynak koleksiyonun manifest'inde listelenen chunk'lar yüklenir.
+    """
+    live_ids = manifest.get_collection_chunk_ids(source_collection or collection_name)
+    source_of = {chunk_id: source for source, chunk_ids in live_ids.items() for chunk_id in chunk_ids}
+    vector_store.create_collection(collection_name)
+    chunk_ids_per_source: Dict[str, Set[str]] = {}
+    report = {"loaded": 0, "skipped": 0, "stale": 0, "missing": 0, "failed": 0}
+    with vector_store.batch_writer(collection_name, batch_size=batch_size, concurrency=concurrency) as batch:
+        for ids, vectors, metadatas in store.iter_batches(batch_size=batch_size):
+            existing = vector_store.fetch_existing_ids(collection_name, ids) if skip_existing else set()
+            for object_id, vector, metadata in zip(ids, vectors, metadatas):
+                source = metadata["source"] if all_chunks else source_of.get(object_id)
+                if source is None:
+                    # Eski bir sürüme veya silinmiş bir dokümana ait chunk
+                    report["stale"] += 1
+                    continue
+                chunk_ids_per_source.setdefault(source, set()).add(object_id)
+                if object_id in existing:
+                    report["skipped"] += 1
+                    continue
+                batch.add_object(properties=metadata, vector=vector.tolist(), uuid=object_id)
+                report["loaded"] += 1
+
+    failed = {object_id for object_id, _ in batch.failed_objects}
+    report["failed"] = len(failed)
+    report["loaded"] -= len(failed)
+    if not all_chunks:
+        # Store'da vektörü olmayan chunk'lar manifest'te kalır; dokümanın bir sonraki indekslenmesi onları yazar
+        for source, chunk_ids in live_ids.items():
+            report["missing"] += len(chunk_ids - chunk_ids_per_source.get(source, set()))
+            chunk_ids_per_source[source] = chunk_ids
+    for source, chunk_ids in chunk_ids_per_source.items():
+        manifest.replace(collection_name, source, chunk_ids - failed)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", default=os.getenv("COLLECTION_NAME"))
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL_NAME"))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--skip-existing", action="store_true", help="Koleksiyonda zaten bulunan chunk'ları atla")
+    parser.add_argument("--source-collection", default=None,
+                        help="Yüklenecek chunk'ları listeleyen manifest koleksiyonu (varsayılan: --collection)")
+    parser.add_argument("--all-chunks", action="store_true",
+                        help="Manifest'e bakmadan store'daki tüm vektörleri yükle (eski sürümler dahil)")
+    parser.add_argument("--server-url", default=os.getenv("RAG_SERVER_URL", "http://localhost:8001"),
+                        help="Sonuç cache'i geçersiz kılınacak RAG sunucusu")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:\t  %(message)s")
+
+    store = create_embedding_store(model_name=args.model)
+    manifest = create_document_manifest()
+    vector_store = create_vector_store()
+    try:
+        source_collection = args.source_collection or args.collection
+        if not args.all_chunks and not manifest.list_documents(source_collection):
+            logging.error(f"The document manifest lists no documents for {source_collection}; "
+                          f"pass --all-chunks to load every vector in the store.")
+            raise SystemExit(1)
+        started = time.perf_counter()
+        report = load_collection(
+            store, manifest, vector_store, args.collection, source_collection=source_collection,
+            batch_size=args.batch_size, concurrency=args.concurrency, skip_existing=args.skip_existing,
+            all_chunks=args.all_chunks,
+        )
+        elapsed = time.perf_counter() - started
+        invalidate_result_cache(args.collection, args.server_url)
+        logging.info(
+            f"Loaded {report['loaded']} vectors ({report['skipped']} skipped, {report['stale']} stale, "
+            f"{report['failed']} failed) from {store.directory} into {args.collection} in {elapsed:.1f}s "
+            f"({report['loaded'] / elapsed if elapsed > 0 else 0.0:.0f} vectors/s)."
+        )
+        if report["missing"]:
+            logging.warning(f"{report['missing']} chunks listed in the manifest have no vector in the store; "
+                            f"re-index their documents to write them.")
+        if report["failed"]:
+            raise SystemExit(1)
+    finally:
+        close_vector_store()
+        close_document_manifest()
+        close_embedding_store()
+
+
+if __name__ == "__main__":
+    main()
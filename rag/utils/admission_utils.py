@@ -0,0 +1,130 @@
+import logging
+import os
+import threading
+import time
+
+_admission_controller = None
+
+# Kaliteden gecikmeye doğru sıralı servis seviyeleri
+ADMISSION_TIERS = ("full", "reduced_candidates", "no_rerank", "bm25_only")
+
+# Ölçüm gelmeden önce kullanılan ve eski tahminlerin zamanla döndüğü aşama gecikmeleri (ms)
+DEFAULT_BASELINE_MS = {"embed": 20.0, "search": 30.0, "rerank_per_pair": 2.0, "keyword_search": 10.0}
+
+
+class AdmissionController:
+    """
+    /rag/search için gecikme SLO'suna göre servis seviyesi seçer. Aşama gecikmeleri (embedding, hybrid arama,
+    çift başına rerank, yalnızca BM25 arama) yapılandırılan baseline değerlerinden başlayan üstel hareketli
+    ortalama ile izlenir; bir süre ölçülmeyen tahminler baseline'a geri döner. Her istekte kuyrukta
+    beklenen süre SLO'dan düşülür ve kalan bütçeye sığan en kaliteli seviye seçilir: önce daha az rerank adayı,
+    sonra rerank'siz hybrid arama, en son alpha=0 ile yalnızca BM25.
+    """
+
+    def __init__(self, slo_ms: float = 1000.0, headroom: float = 0.9, smoothing: float = 0.2,
+                 reduced_candidate_ratio: float = 0.5, enabled: bool = True, baseline_ms: dict = None,
+                 decay_half_life_s: float = 30.0, clock=time.monotonic):
+        self.slo = slo_ms / 1000
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.reduced_candidate_ratio = reduced_candidate_ratio
+        self.enabled = enabled
+        self.decay_half_life = decay_half_life_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.baseline = {stage: ms / 1000 for stage, ms in {**DEFAULT_BASELINE_MS, **(baseline_ms or {})}.items()}
+        self._latencies = dict(self.baseline)
+        self._updated = {stage: clock() for stage in self._latencies}
+        self._tier_counts = {tier: 0 for tier in ADMISSION_TIERS + ("cached",)}
+
+    def _estimate(self, stage: str, now: float) -> float:
+        # Kilit tutulurken çağrılır. Düşük seviyelerde atlanan aşamalar (ör. rerank) ölçülmez; eski tahmin
+        # yarılanma süresiyle baseline'a döner, böylece yük geçince tam seviye yeniden denenir
+        value = self._latencies[stage]
+        if self.decay_half_life <= 0:
+            return value
+        baseline = self.baseline[stage]
+        return baseline + (value - baseline) * 0.5 ** ((now - self._updated[stage]) / self.decay_half_life)
+
+    def observe(self, stage: str, seconds: float, pairs: int = 0):
+        if stage == "rerank":
+            if pairs == 0:
+                return
+            stage, seconds = "rerank_per_pair", seconds / pairs
+        with self._lock:
+            now = self._clock()
+            previous = self._estimate(stage, now)
+            self._latencies[stage] = previous + self.smoothing * (seconds - previous)
+            self._updated[stage] = now
+
+    def reduced_candidates(self, top_k: int, candidate_k: int) -> int:
+        return max(top_k, int(candidate_k * self.reduced_candidate_ratio))
+
+    def choose_tier(self, waited: float, candidate_k: int, reduced_candidate_k: int) -> str:
+        """
+        Kuyrukta waited saniye beklemiş bir istek için tahmini süresi SLO bütçesine sığan ilk seviyeyi döner.
+        Henüz ölçülmemiş aşamalar için baseline kullanılır.
+        """
+        if not self.enabled:
+            return "full"
+        with self._lock:
+            now = self._clock()
+            embed = self._estimate("embed", now)
+            search = self._estimate("search", now)
+            per_pair = self._estimate("rerank_per_pair", now)
+        budget = self.slo * self.headroom - waited
+        estimates = (
+            ("full", embed + search + per_pair * candidate_k),
+            ("reduced_candidates", embed + search + per_pair * reduced_candidate_k),
+            ("no_rerank", embed + search),
+        )
+        for tier, estimate in estimates:
+            if estimate <= budget:
+                return tier
+        return "bm25_only"
+
+    def record_tier(self, tier: str):
+        with self._lock:
+            self._tier_counts[tier] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            return {
+                "enabled": self.enabled,
+                "slo_ms": self.slo * 1000,
+                "tiers": dict(self._tier_counts),
+                "latency_ms": {stage: self._estimate(stage, now) * 1000 for stage in self._latencies},
+            }
+
+
+def create_admission_controller():
+    global _admission_controller
+    if _admission_controller is None:
+        slo_ms = float(os.getenv("SEARCH_SLO_MS", "1000"))
+        enabled = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+        _admission_controller = AdmissionController(
+            slo_ms=slo_ms,
+            headroom=float(os.getenv("ADMISSION_HEADROOM", "0.9")),
+            reduced_candidate_ratio=float(os.getenv("ADMISSION_REDUCED_CANDIDATE_RATIO", "0.5")),
+            enabled=enabled,
+            baseline_ms={
+                stage: float(os.getenv(f"ADMISSION_BASELINE_{stage.upper()}_MS", str(default)))
+                for stage, default in DEFAULT_BASELINE_MS.items()
+            },
+            decay_half_life_s=float(os.getenv("ADMISSION_DECAY_HALF_LIFE_S", "30")),
+        )
+        logging.info(f"Admission controller created (slo_ms={slo_ms}, enabled={enabled}).")
+    return _admission_controller
+
+
+def get_admission_controller() -> AdmissionController:
+    if _admission_controller is None:
+        raise RuntimeError("Admission controller is not loaded!")
+    return _admission_controller
+
+
+def close_admission_controller():
+    global _admission_controller
+    _admission_controller = None
+    logging.info("Admission controller closed successfully.")
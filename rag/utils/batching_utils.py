@@ -0,0 +1,158 @@
+from concurrent.futures import Future
+from typing import List, Optional
+import logging
+import os
+import queue
+import threading
+import time
+
+from utils.executor_utils import InferenceExecutorSaturated
+from utils.model_utils import get_embedding_model
+from utils.metrics_utils import observe_stage
+
+_embedding_batcher = None
+
+
+class EmbeddingBatcher:
+    """
+    Eşzamanlı gelen sorguları kısa bir pencere boyunca toplayıp embedding modeline
+    tek bir encode çağrısı ile gönderir ve her çağırana kendi vektörünü döner.
+    Bekleyen sorgu sayısı max_queue_size'a ulaştığında yeni sorgular InferenceExecutorSaturated ile reddedilir;
+    router bunu executor doluluğu gibi 503'e çevirir.
+    """
+
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0, max_queue_size: int = 256):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.max_queue_size = max(1, max_queue_size)
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=self.max_queue_size)
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._stopped = False
+        self._stop_received = False
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def submit(self, text: str) -> Future:
+        if self._stopped:
+            raise RuntimeError("Embedding batcher is stopped!")
+        future = Future()
+        try:
+            self._queue.put_nowait((text, future))
+        except queue.Full:
+            self.rejected += 1
+            raise InferenceExecutorSaturated(f"Embedding queue is full ({self.max_queue_size} waiting).") from None
+        return future
+
+    def encode(self, text: str):
+        """
+        Tek bir sorguyu bloklayarak encode eder; worker thread'lerden çağrılmak içindir.
+        """
+        return self.submit(text).result()
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self._queue.qsize(),
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
+
+    def _collect(self, first) -> List[tuple]:
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Bu batch işlendikten sonra dur
+                self._stop_received = True
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while not self._stop_received:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = self._collect(first)
+            batch = [(text, future) for text, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            texts = [text for text, _ in batch]
+            started = time.perf_counter()
+            try:
+                embeddings = self.model.encode(texts, batch_size=len(texts))
+            except Exception as e:
+                logging.error(f"Error during batched embedding: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            observe_stage("embed_batch", time.perf_counter() - started, batch_size=len(texts))
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
+        # Kuyrukta kalan istekleri boşa bekletme
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[1].set_exception(RuntimeError("Embedding batcher is stopped!"))
+
+
+def load_embedding_batcher():
+    global _embedding_batcher
+    if _embedding_batcher is None:
+        max_batch_size = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+        max_wait_ms = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+        max_queue_size = int(os.getenv("EMBEDDING_BATCH_MAX_QUEUE", "256"))
+        _embedding_batcher = EmbeddingBatcher(
+            get_embedding_model(),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            max_queue_size=max_queue_size,
+        ).start()
+        logging.info(
+            f"Embedding batcher started (max_batch_size={max_batch_size}, max_wait_ms={max_wait_ms}, "
+            f"max_queue_size={max_queue_size})."
+        )
+    return _embedding_batcher
+
+
+def get_embedding_batcher():
+    if _embedding_batcher is None:
+        raise RuntimeError("Embedding batcher is not loaded!")
+    return _embedding_batcher
+
+
+def unload_embedding_batcher():
+    global _embedding_batcher
+    if _embedding_batcher is not None:
+        logging.info("Stopping embedding batcher...")
+        _embedding_batcher.stop()
+        _embedding_batcher = None
+    logging.info("Embedding batcher stopped successfully.")
@@ -0,0 +1,395 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import numpy as np
+
+_embedding_cache = None
+_result_cache = None
+
+# Anahtar ve OrderedDict kaydı için yaklaşık sabit maliyet (byte)
+_ENTRY_OVERHEAD_BYTES = 200
+
+
+def normalize_query(query: str) -> str:
+    """
+    Sorguyu cache anahtarı için normalize eder: unicode NFKC, küçük harf ve tek boşluk.
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class EmbeddingCache:
+    """
+    Sorgu embedding'leri için bellek sınırlı LRU + TTL cache.
+    Vektörler float32 numpy dizileri olarak saklanır.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(query: str, model_id: str) -> Tuple[str, str]:
+        """
+        model_id, model_utils.get_embedding_model_id'nin döndüğü (model, backend, hassasiyet) kimliğidir.
+        """
+        return (model_id or "", normalize_query(query))
+
+    @staticmethod
+    def _entry_size(key: Tuple[str, str], vector: np.ndarray) -> int:
+        return vector.nbytes + len(key[0]) + len(key[1]) + _ENTRY_OVERHEAD_BYTES
+
+    def get(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            vector, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: Tuple[str, str], vector) -> np.ndarray:
+        vector = np.ascontiguousarray(vector, dtype=np.float32)
+        vector.setflags(write=False)
+        size = self._entry_size(key, vector)
+        if size > self.max_bytes:
+            return vector
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return vector
+
+    def _remove(self, key: Tuple[str, str]):
+        vector, _ = self._entries.pop(key)
+        self._bytes -= self._entry_size(key, vector)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def create_embedding_cache():
+    global _embedding_cache
+    if _embedding_cache is None:
+        max_bytes = int(float(os.getenv("EMBEDDING_CACHE_MAX_MB", "64")) * 1024 * 1024)
+        ttl_seconds = float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "3600"))
+        _embedding_cache = EmbeddingCache(max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+        logging.info(f"Query embedding cache created (max_bytes={max_bytes}, ttl_seconds={ttl_seconds}).")
+    return _embedding_cache
+
+
+def get_embedding_cache():
+    if _embedding_cache is None:
+        raise RuntimeError("Embedding cache is not loaded!")
+    return _embedding_cache
+
+
+def close_embedding_cache():
+    global _embedding_cache
+    if _embedding_cache is not None:
+        _embedding_cache.clear()
+        _embedding_cache = None
+    logging.info("Query embedding cache cleared successfully.")
+
+
+class ResultCacheBackend(ABC):
+    """
+    Sonuç cache'i için depolama arayüzü. Değerler JSON string olarak saklanır;
+    koleksiyon başına generation sayacı da backend'de tutulur.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl_seconds: float):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def get_generation(self, collection_name: str) -> int:
+        ...
+
+    @abstractmethod
+    def bump_generation(self, collection_name: str) -> int:
+        ...
+
+    def close(self):
+        pass
+
+
+class InMemoryResultBackend(ResultCacheBackend):
+    """
+    Tek process içinde geçerli, kayıt sayısı sınırlı LRU backend.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_generation(self, collection_name: str) -> int:
+        with self._lock:
+            return self._generations.get(collection_name, 0)
+
+    def bump_generation(self, collection_name: str) -> int:
+        with self._lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            return self._generations[collection_name]
+
+
+class SqliteResultBackend(ResultCacheBackend):
+    """
+    Yerel diskte SQLite dosyası üzerinde çalışan backend; aynı dosyayı kullanan
+    birden fazla uvicorn worker'ı cache'i ve generation sayaçlarını paylaşır.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS generations (collection_name TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl_seconds, now),
+            )
+            self._writes += 1
+            # Süresi dolan ve fazla olan kayıtları arada bir temizle
+            if self._writes % 100 == 0:
+                self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+                self._conn.execute(
+                    "DELETE FROM results WHERE key IN ("
+                    "SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def get_generation(self, collection_name: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generation FROM generations WHERE collection_name = ?", (collection_name,)
+            ).fetchone()
+            return row[0] if row else 0
+
+    def bump_generation(self, collection_name: str) -> int:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO generations (collection_name, generation) VALUES (?, 1) "
+                "ON CONFLICT(collection_name) DO UPDATE SET generation = generation + 1",
+                (collection_name,),
+            )
+            row = self._conn.execute(
+                "SELECT generation FROM generations WHERE collection_name = ?", (collection_name,)
+            ).fetchone()
+            return row[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """
+    /rag/search'ün rerank edilmiş çıktısını tüm istek alanlarıyla anahtarlanmış şekilde saklar.
+    Her kayıt, koleksiyonun o anki generation değeriyle damgalanır; indeksleme generation'ı
+    artırdığında eski kayıtlar kendiliğinden geçersiz olur.
+    """
+
+    def __init__(self, backend: ResultCacheBackend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @staticmethod
+    def make_key(query_obj) -> str:
+        payload = json.dumps(query_obj.model_dump(), sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def generation(self, collection_name: str) -> int:
+        return self.backend.get_generation(collection_name)
+
+    def bump_generation(self, collection_name: str) -> int:
+        generation = self.backend.bump_generation(collection_name)
+        logging.info(f"Result cache generation for {collection_name} is now {generation}.")
+        return generation
+
+    def get(self, query_obj, generation: int):
+        key = self.make_key(query_obj)
+        value = self.backend.get(key)
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        entry = json.loads(value)
+        if entry["generation"] != generation:
+            self.backend.delete(key)
+            with self._lock:
+                self.stale += 1
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry["results"]
+
+    def set(self, query_obj, generation: int, results):
+        value = json.dumps({"generation": generation, "results": results}, ensure_ascii=False)
+        self.backend.set(self.make_key(query_obj), value, self.ttl_seconds)
+
+    def close(self):
+        self.backend.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def create_result_cache():
+    """
+    RESULT_CACHE_BACKEND ortam değişkenine göre (memory, disk veya none) sonuç cache'ini oluşturur.
+    """
+    global _result_cache
+    if _result_cache is None:
+        backend_name = os.getenv("RESULT_CACHE_BACKEND", "memory").lower()
+        max_entries = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+        ttl_seconds = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "600"))
+        if backend_name == "none":
+            logging.info("Result cache is disabled.")
+            return None
+        if backend_name == "disk":
+            path = os.getenv("RESULT_CACHE_PATH", "/app/cache/result_cache.sqlite3")
+            backend = SqliteResultBackend(path=path, max_entries=max_entries)
+        elif backend_name == "memory":
+            backend = InMemoryResultBackend(max_entries=max_entries)
+        else:
+            raise ValueError(f"Unknown RESULT_CACHE_BACKEND: {backend_name}")
+        _result_cache = ResultCache(backend=backend, ttl_seconds=ttl_seconds)
+        logging.info(f"Result cache created (backend={backend_name}, max_entries={max_entries}, ttl_seconds={ttl_seconds}).")
+    return _result_cache
+
+
+def get_result_cache():
+    """
+    Sonuç cache'ini döner; cache kapalıysa None döner.
+    """
+    return _result_cache
+
+
+def close_result_cache():
+    global _result_cache
+    if _result_cache is not None:
+        _result_cache.close()
+        _result_cache = None
+    logging.info("Result cache closed successfully.")
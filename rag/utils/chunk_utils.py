@@ -0,0 +1,92 @@
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Optional, Tuple
+import re
+
+CHUNK_BOUNDARY_MODES = ("none", "sentence", "paragraph")
+
+_PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+_SENTENCE_BOUNDARY = re.compile(r"[.!?…][\"'”’)\]]*\s+|\n")
+
+# Tampon sonuna bu kadar token'dan yakın pencereler, sonraki blok gelmeden kesinleştirilmez;
+# blok sınırındaki kelimenin tokenizasyonu yeni metinle değişebilir.
+_SAFETY_MARGIN_TOKENS = 16
+
+
+def _snap_end(text: str, window_start: int, window_end: int, min_end: int, boundary_mode: str) -> Optional[int]:
+    """
+    Pencere içinde, min_end'den sonra gelen son paragraf/cümle sınırının karakter konumunu döner.
+    Paragraf modunda sınır bulunamazsa cümle sınırına düşülür.
+    """
+    patterns = [_PARAGRAPH_BOUNDARY, _SENTENCE_BOUNDARY] if boundary_mode == "paragraph" else [_SENTENCE_BOUNDARY]
+    for pattern in patterns:
+        snap = None
+        for match in pattern.finditer(text, window_start, window_end):
+            if match.end() >= min_end:
+                snap = match.end()
+        if snap is not None:
+            return snap
+    return None
+
+
+def _tokenize(tokenizer, text: str) -> Tuple[List[int], List[int]]:
+    offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+    # Boş aralıklı token'lar (ör. tek başına "▁") metne karşılık gelmez
+    offsets = [(start, end) for start, end in offsets if end > start]
+    return [start for start, _ in offsets], [end for _, end in offsets]
+
+
+def iter_offset_chunks(text_blocks: Iterable[str], *, tokenizer, chunk_size: int = 512, chunk_overlap: int = 20,
+                       boundary_mode: str = "none") -> Iterator[str]:
+    """
+    Fast tokenizer'ın offset mapping'ini kullanarak chunk'ları doğrudan kaynak metinden keser;
+    token id'leri decode edilmez, dolayısıyla her chunk kaynak metnin birebir bir alt dizisidir.
+    Metin blok blok işlenir: yalnızca henüz kesinleşmemiş son pencere tamponda tutulur, bellek doküman
+    boyutundan bağımsızdır. boundary_mode "sentence" veya "paragraph" olduğunda pencere sonu, chunk_size'ı
+    aşmadan en yakın cümle/paragraf sınırına çekilir (pencerenin en az yarısı dolu kalacak şekilde).
+    """
+    if not getattr(tokenizer, "is_fast", False):
+        raise ValueError("Offset-mapping chunking requires a fast tokenizer.")
+    if boundary_mode not in CHUNK_BOUNDARY_MODES:
+        raise ValueError(f"boundary_mode must be one of {CHUNK_BOUNDARY_MODES}, got {boundary_mode}")
+    chunk_size = min(chunk_size, getattr(tokenizer, "model_max_length", 8192))
+    chunk_overlap = min(chunk_overlap, chunk_size - 1)
+    min_tokens = max(1, chunk_size // 2)
+
+    buffer = ""
+    # Son üretilen chunk'ın tampondaki bitiş karakteri; yalnızca örtüşmeden oluşan bir son chunk'ı önlemek için
+    emitted_until = 0
+    blocks = iter(text_blocks)
+    final = False
+    while not final:
+        block = next(blocks, None)
+        if block is None:
+            final = True
+        else:
+            buffer += block
+        starts, ends = _tokenize(tokenizer, buffer)
+        total = len(starts)
+        start_idx = 0
+        while start_idx < total:
+            end_idx = min(start_idx + chunk_size, total)
+            if not final and end_idx + _SAFETY_MARGIN_TOKENS > total:
+                break
+            if final and end_idx == total and ends[-1] <= emitted_until:
+                break
+            if boundary_mode != "none" and end_idx - start_idx == chunk_size:
+                snap = _snap_end(buffer, starts[start_idx], ends[end_idx - 1], ends[start_idx + min_tokens - 1], boundary_mode)
+                if snap is not None:
+                    end_idx = max(start_idx + min_tokens, min(end_idx, bisect_left(starts, snap)))
+            chunk = buffer[starts[start_idx]:ends[end_idx - 1]]
+            if chunk.strip():
+                yield chunk
+            emitted_until = ends[end_idx - 1]
+            if end_idx == total:
+                start_idx = total
+                break
+            start_idx = max(start_idx + 1, end_idx - chunk_overlap)
+        if final:
+            break
+        # Kesinleşen kısmı tampondan at; bir sonraki pencere başından itibaren tekrar tokenize edilecek
+        cut = starts[start_idx] if start_idx < total else len(buffer)
+        buffer = buffer[cut:]
+        emitted_until = max(0, emitted_until - cut)
@@ -0,0 +1,191 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from utils.model_utils import get_embedding_model_id
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import numpy as np
+
+_embedding_store = None
+
+EMBEDDING_STORE_DTYPES = ("float32", "float16")
+
+
+class EmbeddingStore:
+    """
+    Tek bir embedding modeli için yalnızca eklemeli (append-only) yerel vektör deposu.
+    Vektörler satır satır ham bir dosyaya yazılır ve memory-map ile okunur; chunk id, chunk hash,
+    satır numarası ve metadata ise yanındaki SQLite indekste tutulur. Böylece Weaviate koleksiyonu
+    modeli tekrar çalıştırmadan, disk hızında yeniden doldurulabilir.
+    """
+
+    def __init__(self, root_dir: str, model_name: str, dtype: str = "float32"):
+        if dtype not in EMBEDDING_STORE_DTYPES:
+            raise ValueError(f"dtype must be one of {EMBEDDING_STORE_DTYPES}, got {dtype}")
+        self.model_name = model_name
+        self.directory = os.path.join(root_dir, re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name))
+        os.makedirs(self.directory, exist_ok=True)
+        self.vectors_path = os.path.join(self.directory, "vectors.bin")
+        self._conn = sqlite3.connect(
+            os.path.join(self.directory, "index.sqlite3"), timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            "chunk_id TEXT PRIMARY KEY, row INTEGER NOT NULL UNIQUE, chunk_hash TEXT, source TEXT, metadata TEXT NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        # Depo oluşturulduktan sonra dtype ve boyut sabittir
+        self.dtype = np.dtype(meta.get("dtype", dtype))
+        self.dim = int(meta["dim"]) if "dim" in meta else None
+        self._memmap = None
+        self._memmap_rows = 0
+
+    def _row_count(self) -> int:
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * self.dtype.itemsize)
+
+    def _matrix(self) -> Optional[np.memmap]:
+        rows = self._row_count()
+        if rows == 0:
+            return None
+        if self._memmap is None or self._memmap_rows != rows:
+            self._memmap = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dim))
+            self._memmap_rows = rows
+        return self._memmap
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def contains(self, chunk_ids: Sequence[str]) -> set:
+        if not chunk_ids:
+            return set()
+        with self._lock:
+            placeholders = ",".join("?" * len(chunk_ids))
+            rows = self._conn.execute(
+                f"SELECT chunk_id FROM vectors WHERE chunk_id IN ({placeholders})", list(chunk_ids)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def append(self, chunk_ids: Sequence[str], vectors, metadatas: Sequence[dict]) -> int:
+        """
+        Depoda olmayan vektörleri dosyanın sonuna ekler ve indekse yazar; eklenen satır sayısını döner.
+        Vektörler indeksten önce diske yazılır, yarıda kesilen bir ekleme indekste görünmez.
+        """
+        vectors = np.asarray(vectors)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [("dim", str(self.dim)), ("dtype", self.dtype.name), ("model_name", self.model_name)],
+                )
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match store dimension {self.dim}")
+            placeholders = ",".join("?" * len(chunk_ids))
+            existing = {
+                row[0] for row in self._conn.execute(
+                    f"SELECT chunk_id FROM vectors WHERE chunk_id IN ({placeholders})", list(chunk_ids)
+                ).fetchall()
+            } if chunk_ids else set()
+            keep = []
+            for i, chunk_id in enumerate(chunk_ids):
+                if chunk_id not in existing:
+                    keep.append(i)
+                    existing.add(chunk_id)
+            if not keep:
+                return 0
+            first_row = self._row_count()
+            with open(self.vectors_path, "ab") as file:
+                file.write(np.ascontiguousarray(vectors[keep], dtype=self.dtype).tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO vectors (chunk_id, row, chunk_hash, source, metadata) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            chunk_ids[i], first_row + offset, metadatas[i].get("chunk_hash"), metadatas[i].get("source"),
+                            json.dumps(metadatas[i], ensure_ascii=False),
+                        )
+                        for offset, i in enumerate(keep)
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return len(keep)
+
+    def get(self, chunk_ids: Sequence[str]) -> Dict[str, np.ndarray]:
+        if not chunk_ids:
+            return {}
+        with self._lock:
+            placeholders = ",".join("?" * len(chunk_ids))
+            rows = self._conn.execute(
+                f"SELECT chunk_id, row FROM vectors WHERE chunk_id IN ({placeholders})", list(chunk_ids)
+            ).fetchall()
+            matrix = self._matrix()
+            if matrix is None:
+                return {}
+            return {chunk_id: np.asarray(matrix[row], dtype=np.float32) for chunk_id, row in rows}
+
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[Tuple[List[str], np.ndarray, List[dict]]]:
+        """
+        Depodaki tüm vektörleri satır sırasıyla (chunk id'leri, float32 matris, metadata listesi) batch'leri halinde döner.
+        """
+        last_row = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT chunk_id, row, metadata FROM vectors WHERE row > ? ORDER BY row LIMIT ?",
+                    (last_row, batch_size),
+                ).fetchall()
+                matrix = self._matrix()
+            if not rows:
+                return
+            row_numbers = [row for _, row, _ in rows]
+            yield (
+                [chunk_id for chunk_id, _, _ in rows],
+                np.asarray(matrix[row_numbers], dtype=np.float32),
+                [json.loads(metadata) for _, _, metadata in rows],
+            )
+            last_row = row_numbers[-1]
+
+    def close(self):
+        with self._lock:
+            self._memmap = None
+            self._conn.close()
+
+
+def create_embedding_store(model_name: Optional[str] = None):
+    global _embedding_store
+    if _embedding_store is None:
+        root_dir = os.getenv("EMBEDDING_STORE_DIR", "/app/embedding_store")
+        # Store dizini modelin yanında backend ve hassasiyete göre de ayrılır
+        model_name = get_embedding_model_id(model_name)
+        dtype = os.getenv("EMBEDDING_STORE_DTYPE", "float32").lower()
+        _embedding_store = EmbeddingStore(root_dir=root_dir, model_name=model_name, dtype=dtype)
+        logging.info(f"Embedding store opened at {_embedding_store.directory} ({_embedding_store.dtype.name}).")
+    return _embedding_store
+
+
+def get_embedding_store():
+    if _embedding_store is None:
+        raise RuntimeError("Embedding store is not loaded!")
+    return _embedding_store
+
+
+def close_embedding_store():
+    global _embedding_store
+    if _embedding_store is not None:
+        _embedding_store.close()
+        _embedding_store = None
+    logging.info("Embedding store closed successfully.")
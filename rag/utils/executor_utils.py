@@ -0,0 +1,123 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+import asyncio
+import logging
+import os
+import threading
+import time
+
+_inference_executor = None
+
+
+class InferenceExecutorSaturated(RuntimeError):
+    """
+    Executor kuyruğu dolu olduğunda fırlatılır; router bunu 503'e çevirir.
+    """
+
+
+class InferenceExecutor:
+    """
+    Model ve Weaviate işlerini event loop dışında, sınırlı sayıda worker thread üzerinde çalıştırır.
+    Çalışan + bekleyen iş sayısı max_workers + max_queue_size'a ulaştığında yeni işleri reddeder.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue_size: int = 64):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(0, max_queue_size)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_times = deque(maxlen=1024)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue_size:
+                self._rejected += 1
+                raise InferenceExecutorSaturated(
+                    f"Inference queue is full ({self.max_queue_size} waiting, {self.max_workers} running)."
+                )
+            self._pending += 1
+        enqueued_at = time.perf_counter()
+
+        def task():
+            with self._lock:
+                self._running += 1
+                self._wait_times.append(time.perf_counter() - enqueued_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._pending -= 1
+                    self._completed += 1
+
+        try:
+            return self._pool.submit(task)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+    async def run(self, fn, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def recent_wait(self) -> float:
+        """
+        Son başlayan işin kuyrukta beklediği saniye; yeni bir işin ne kadar bekleyeceğinin ucuz tahminidir.
+        """
+        with self._lock:
+            return self._wait_times[-1] if self._wait_times and self._pending > self._running else 0.0
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return self._pending - self._running
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._wait_times)
+            queued = self._pending - self._running
+            running = self._running
+            completed = self._completed
+            rejected = self._rejected
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": queued,
+            "running": running,
+            "completed": completed,
+            "rejected": rejected,
+            "wait_ms_avg": sum(waits) / len(waits) * 1000 if waits else 0.0,
+            "wait_ms_p99": waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000 if waits else 0.0,
+            "wait_ms_max": waits[-1] * 1000 if waits else 0.0,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+def create_inference_executor():
+    global _inference_executor
+    if _inference_executor is None:
+        max_workers = int(os.getenv("INFERENCE_WORKERS", "4"))
+        max_queue_size = int(os.getenv("INFERENCE_QUEUE_SIZE", "64"))
+        _inference_executor = InferenceExecutor(max_workers=max_workers, max_queue_size=max_queue_size)
+        logging.info(f"Inference executor created (workers={max_workers}, queue_size={max_queue_size}).")
+    return _inference_executor
+
+
+def get_inference_executor():
+    if _inference_executor is None:
+        raise RuntimeError("Inference executor is not loaded!")
+    return _inference_executor
+
+
+def close_inference_executor():
+    global _inference_executor
+    if _inference_executor is not None:
+        logging.info("Shutting down inference executor...")
+        _inference_executor.shutdown()
+        _inference_executor = None
+    logging.info("Inference executor shut down successfully.")
@@ -0,0 +1,118 @@
+from typing import Dict, Iterable, List, Set
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+_document_manifest = None
+
+
+class DocumentManifest:
+    """
+    Her (koleksiyon, kaynak doküman) için indekslenmiş chunk id'lerini SQLite'ta tutar.
+    Yeniden indekslemede yalnızca değişen chunk'ların silinmesini veya eklenmesini sağlar.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "collection_name TEXT NOT NULL, source TEXT NOT NULL, chunks INTEGER NOT NULL, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (collection_name, source))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "collection_name TEXT NOT NULL, source TEXT NOT NULL, chunk_id TEXT NOT NULL, "
+            "PRIMARY KEY (collection_name, source, chunk_id))"
+        )
+        self._lock = threading.Lock()
+
+    def get_chunk_ids(self, collection_name: str, source: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id FROM chunks WHERE collection_name = ? AND source = ?", (collection_name, source)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def get_collection_chunk_ids(self, collection_name: str) -> Dict[str, Set[str]]:
+        """
+        Koleksiyondaki her kaynak doküman için güncel chunk id'lerini döner.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, chunk_id FROM chunks WHERE collection_name = ?", (collection_name,)
+            ).fetchall()
+        chunk_ids: Dict[str, Set[str]] = {}
+        for source, chunk_id in rows:
+            chunk_ids.setdefault(source, set()).add(chunk_id)
+        return chunk_ids
+
+    def replace(self, collection_name: str, source: str, chunk_ids: Iterable[str]):
+        chunk_ids = set(chunk_ids)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "DELETE FROM chunks WHERE collection_name = ? AND source = ?", (collection_name, source)
+                )
+                self._conn.executemany(
+                    "INSERT INTO chunks (collection_name, source, chunk_id) VALUES (?, ?, ?)",
+                    ((collection_name, source, chunk_id) for chunk_id in chunk_ids),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO documents (collection_name, source, chunks, updated_at) VALUES (?, ?, ?, ?)",
+                    (collection_name, source, len(chunk_ids), time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, collection_name: str, source: str):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute("DELETE FROM chunks WHERE collection_name = ? AND source = ?", (collection_name, source))
+                self._conn.execute("DELETE FROM documents WHERE collection_name = ? AND source = ?", (collection_name, source))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def list_documents(self, collection_name: str) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, chunks, updated_at FROM documents WHERE collection_name = ? ORDER BY source",
+                (collection_name,),
+            ).fetchall()
+        return [{"source": source, "chunks": chunks, "updated_at": updated_at} for source, chunks, updated_at in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_document_manifest():
+    global _document_manifest
+    if _document_manifest is None:
+        path = os.getenv("INGEST_MANIFEST_PATH", "/app/ingest/manifest.sqlite3")
+        _document_manifest = DocumentManifest(path)
+        logging.info(f"Document manifest opened at {path}.")
+    return _document_manifest
+
+
+def get_document_manifest():
+    if _document_manifest is None:
+        raise RuntimeError("Document manifest is not loaded!")
+    return _document_manifest
+
+
+def close_document_manifest():
+    global _document_manifest
+    if _document_manifest is not None:
+        _document_manifest.close()
+        _document_manifest = None
+    logging.info("Document manifest closed successfully.")
@@ -0,0 +1,162 @@
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+import logging
+import os
+import time
+
+# Saniye cinsinden aşama gecikmeleri için kovalar (1 ms - 10 s)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+
+class StatsCollector:
+    """
+    Bileşenlerin stats() sözlüklerini her scrape'te gauge olarak ekleyen prometheus_client collector'ı;
+    bu değerler sıcak yolda ayrıca güncellenmez. collect_samples (metrik adı, açıklama, etiketler, değer)
+    dörtlüleri üretir. Hata veren collector (ör. açılış sürerken henüz yüklenmemiş bir bileşen) o scrape'te atlanır.
+    """
+
+    def __init__(self, name: str, collect_samples: Callable[[], Iterable[Tuple[str, str, dict, float]]]):
+        self.name = name
+        self.collect_samples = collect_samples
+
+    def describe(self):
+        # Metrik adları bileşenlerin stats() alanlarına göre değişir; kayıt sırasında collect çağrılmaz
+        return []
+
+    def collect(self):
+        try:
+            samples = list(self.collect_samples())
+        except Exception as e:
+            logging.debug(f"Metrics collector {self.name} skipped: {e}")
+            return
+        families: Dict[str, GaugeMetricFamily] = {}
+        for name, documentation, labels, value in samples:
+            if value is None:
+                continue
+            family = families.get(name)
+            if family is None:
+                family = families[name] = GaugeMetricFamily(name, documentation, labels=list(labels))
+            family.add_metric([str(label) for label in labels.values()], float(value))
+        yield from families.values()
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+registry = CollectorRegistry()
+
+STAGE_SECONDS = Histogram(
+    "rag_stage_duration_seconds", "Duration of search and ingestion stages.", ["stage"],
+    buckets=LATENCY_BUCKETS, registry=registry,
+)
+BATCH_SIZE = Histogram(
+    "rag_stage_batch_size", "Number of items processed per call of a batched stage.", ["stage"],
+    buckets=BATCH_SIZE_BUCKETS, registry=registry,
+)
+TOKENS = Histogram(
+    "rag_stage_tokens", "Tokens processed per call of a stage, including padding for model forward passes.",
+    ["stage"], buckets=TOKEN_BUCKETS, registry=registry,
+)
+REQUEST_SECONDS = Histogram(
+    "rag_request_duration_seconds", "End-to-end duration of search requests by endpoint and service tier.",
+    ["endpoint", "tier"], buckets=LATENCY_BUCKETS, registry=registry,
+)
+ERRORS = Counter(
+    "rag_stage_errors_total", "Errors raised by search and ingestion stages.", ["stage"], registry=registry,
+)
+
+
+# Etiketli child metrikler ilk kullanımda önbelleğe alınır; labels() her çağrıda kilit alıp etiket tuple'ı kurar
+# ve sıcak yolda observe() kadar sürer. Etiket değerleri sabit aşama/endpoint adları olduğundan sözlükler büyümez.
+_children: Dict[tuple, object] = {}
+
+
+def _child(metric, *labels: str):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        # Yarışta iki thread de labels() çağırabilir; ikisi de aynı child'ı alır
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+def observe_stage(stage: str, seconds: float, batch_size: int = None, tokens: int = None):
+    """
+    Bir aşamanın süresini ve varsa batch boyutunu ve token sayısını kaydeder.
+    """
+    if not METRICS_ENABLED:
+        return
+    _child(STAGE_SECONDS, stage).observe(seconds)
+    if batch_size is not None:
+        _child(BATCH_SIZE, stage).observe(batch_size)
+    if tokens is not None:
+        _child(TOKENS, stage).observe(tokens)
+
+
+class time_stage:
+    """
+    Bloğun süresini stage etiketiyle kaydeder; blok hata verirse hata sayacı artırılır ve süre yine kaydedilir.
+    Sıcak yolda generator tabanlı contextmanager'dan ucuz olduğu için sınıf olarak yazılmıştır.
+    """
+    __slots__ = ("stage", "batch_size", "started")
+
+    def __init__(self, stage: str, batch_size: int = None):
+        self.stage = stage
+        self.batch_size = batch_size
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None and METRICS_ENABLED:
+            _child(ERRORS, self.stage).inc()
+        observe_stage(self.stage, time.perf_counter() - self.started, batch_size=self.batch_size)
+        return False
+
+
+def time_iter(iterable: Iterable, stage: str, size: Callable = None) -> Iterator:
+    """
+    Lazy bir iterator'dan her elemanın üretilme süresini (ör. chunk'lama) stage etiketiyle kaydeder.
+    size verilirse elemanın boyutu batch boyutu olarak kaydedilir.
+    """
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        observe_stage(stage, time.perf_counter() - started, batch_size=size(item) if size is not None else None)
+        yield item
+
+
+def observe_request(endpoint: str, tier: str, seconds: float):
+    if METRICS_ENABLED:
+        _child(REQUEST_SECONDS, endpoint, tier).observe(seconds)
+
+
+def stats_samples(prefix: str, documentation: str, stats: dict, label_names: Dict[str, str] = None) -> Iterator[tuple]:
+    """
+    Bileşenlerin stats() sözlüklerini gauge örneklerine çevirir: sayısal alanlar {prefix}_{alan},
+    iç içe sözlükler label_names'teki (yoksa "key") etiketle {prefix}_{alan} olur. Sayısal olmayanlar atlanır.
+    """
+    label_names = label_names or {}
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            label = label_names.get(key, "key")
+            for item, item_value in value.items():
+                if isinstance(item_value, (int, float)) or item_value is None:
+                    yield f"{prefix}_{key}", f"{documentation} ({key})", {label: item}, item_value
+        elif isinstance(value, (int, float)):
+            yield f"{prefix}_{key}", f"{documentation} ({key})", {}, value
+
+
+def register_collector(name: str, collect_samples: Callable[[], Iterable[Tuple[str, str, dict, float]]]):
+    registry.register(StatsCollector(name, collect_samples))
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    return registry
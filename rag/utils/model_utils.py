@@ -8,34 +8,133 @@ import torch
 _embedding_model = None
 _reranker_model = None
 
+MODEL_PRECISIONS = ("fp32", "bf16", "int8")
+
+def get_model_precision(env_name: str) -> str:
+    """
+    Model hassasiyet modunu ortam değişkeninden okur (fp32, bf16 veya int8), varsayılan fp32.
+    """
+    precision = os.getenv(env_name, "fp32").lower()
+    if precision not in MODEL_PRECISIONS:
+        raise ValueError(f"{env_name} must be one of {MODEL_PRECISIONS}, got {precision}")
+    return precision
+
+def apply_precision(model, precision: str):
+    """
+    Modeli uygun cihaza taşır ve istenen hassasiyete çevirir.
+    int8 dinamik quantization yalnızca CPU'da çalıştığından bu modda model CPU'da kalır.
+    """
+    if precision == "int8":
+        if torch.cuda.is_available():
+            logging.info("int8 dynamic quantization is CPU-only, keeping model on CPU.")
+        model = model.to('cpu')
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logging.info("Model quantized to int8 (dynamic quantization of Linear layers).")
+        return model
+    if torch.cuda.is_available():
+        model = model.to('cuda')  # GPU'ya taşıyoruz
+        logging.info(f"Model successfully moved to GPU.")
+    else:
+        logging.info(f"CUDA is not available. Using CPU.")
+    if precision == "bf16":
+        model = model.to(torch.bfloat16)
+        logging.info("Model converted to bf16.")
+    return model
+
+MODEL_BACKENDS = ("torch", "onnx")
+
+def get_model_backend(env_name: str) -> str:
+    """
+    Inference backend'ini ortam değişkeninden okur (torch veya onnx), varsayılan torch.
+    """
+    backend = os.getenv(env_name, "torch").lower()
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"{env_name} must be one of {MODEL_BACKENDS}, got {backend}")
+    return backend
+
+def get_embedding_model_id(model_name: str = None) -> str:
+    """
+    Embedding'leri üreten modelin kimliği. Aynı model farklı backend veya hassasiyette farklı vektörler
+    ürettiği için cache ve embedding store anahtarları bu kimlikle ayrılır. ONNX backend'i hassasiyet modunu
+    uygulamaz. Varsayılan torch/fp32 kurulumunun kimliği yalnızca model adıdır; mevcut store'lar geçerli kalır.
+    """
+    model_name = model_name or os.getenv("EMBEDDING_MODEL_NAME")
+    backend = get_model_backend("EMBEDDING_MODEL_BACKEND")
+    precision = "fp32" if backend == "onnx" else get_model_precision("EMBEDDING_MODEL_PRECISION")
+    if backend == "torch" and precision == "fp32":
+        return model_name
+    return f"{model_name}@{backend}-{precision}"
+
+def get_onnx_runtime_options():
+    """
+    ONNX Runtime için execution provider ve session ayarlarını döner: tüm graph optimizasyonları açık,
+    intra-op thread sayısı ONNX_INTRA_OP_THREADS ile ayarlanır.
+    """
+    import onnxruntime as ort
+
+    session_options = ort.SessionOptions()
+    session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    session_options.intra_op_num_threads = int(os.getenv("ONNX_INTRA_OP_THREADS", str(os.cpu_count() or 1)))
+    session_options.inter_op_num_threads = 1
+    if torch.cuda.is_available() and "CUDAExecutionProvider" in ort.get_available_providers():
+        provider = "CUDAExecutionProvider"
+    else:
+        provider = "CPUExecutionProvider"
+    return provider, session_options
+
 # Embedding Model Utils
+def build_embedding_model(model_name: str, backend: str = "torch", precision: str = "fp32"):
+    """
+    Embedding modelini yerel diskten (yoksa hub'dan indirip kaydederek) seçilen backend ile oluşturur.
+    onnx backend'inde export edilen graph, modelin yanına onnx/model.onnx olarak kaydedilir ve
+    sonraki açılışlarda yeniden kullanılır.
+    """
+    model_path = f"/app/embedding_models/{model_name}"  # Yerel model yolunu belirtiyoruz
+    if backend == "onnx":
+        provider, session_options = get_onnx_runtime_options()
+        exported = os.path.exists(f"{model_path}/onnx/model.onnx")
+        source = model_path if os.path.exists(model_path) else model_name
+        logging.info(f"Loading embedding model with ONNX Runtime ({provider}), exported graph cached: {exported}")
+        model = SentenceTransformer(
+            source,
+            backend="onnx",
+            model_kwargs={"provider": provider, "session_options": session_options},
+        )
+        if not exported:
+            model.save_pretrained(model_path)
+            logging.info(f"Exported ONNX embedding model saved to {model_path}/onnx.")
+        if precision != "fp32":
+            logging.info(f"Precision mode {precision} is not applied to the ONNX backend, using the exported graph as is.")
+        return model
+
+    # Ağırlıklar safetensors'tan doğrudan hedef tensörlere okunur, önce rastgele başlatılmış bir kopya oluşturulmaz
+    model_kwargs = {"low_cpu_mem_usage": True}
+    if os.path.exists(model_path):
+        model = SentenceTransformer(model_path, model_kwargs=model_kwargs)
+        logging.info("Model loaded from local storage.")
+    else:
+        logging.info(f"Installing embedding model: {model_name}")
+        model = SentenceTransformer(model_name, model_kwargs=model_kwargs)
+        model.save(model_path, safe_serialization=True)
+    return apply_precision(model, precision)
+
 def load_embedding_model():
     global _embedding_model
     try:
         if _embedding_model is None:
             model_name = os.getenv("EMBEDDING_MODEL_NAME")  # Model adı burada sabitlenmiş
-            if _embedding_model is None:
-                model_path = f"/app/embedding_models/{model_name}"  # Yerel model yolunu belirtiyoruz
-                if os.path.exists(model_path):
-                    _embedding_model = SentenceTransformer(model_path)
-                    logging.info("Model loaded from local storage.")
-                else:
-                    logging.info(f"Installing embedding model: {model_name}")
-                    _embedding_model = SentenceTransformer(model_name)
-                    _embedding_model.save(f"/app/embedding_models/{model_name}")
-                    
+            _embedding_model = build_embedding_model(
+                model_name,
+                backend=get_model_backend("EMBEDDING_MODEL_BACKEND"),
+                precision=get_model_precision("EMBEDDING_MODEL_PRECISION"),
+            )
             logging.info("Embedding model loaded successfully.")
-            if torch.cuda.is_available():
-                _embedding_model = _embedding_model.to('cuda')  # GPU'ya taşıyoruz
-                logging.info(f"Model successfully moved to GPU.")
-            else:
-                logging.info(f"CUDA is not available. Using CPU.")
         return _embedding_model
     except Exception as e:
         logging.error(f"Error loading model: {e}")
         raise RuntimeError(f"Error loading model: {e}")
 
-
 def get_embedding_model():
     if _embedding_model is None:
         raise RuntimeError("Embedding model is not loaded!")
@@ -53,39 +152,83 @@ def unload_embedding_model():
         raise RuntimeError(f"Error unloading model: {e}")
 
 # Reranker Model Utils    
+def build_reranker_model(model_name: str, backend: str = "torch", precision: str = "fp32") -> RerankerModel:
+    """
+    Reranker modelini ve tokenizer'ını seçilen backend ile oluşturur.
+    onnx backend'inde model bir kez export edilip /app/reranker_models/<model>/onnx altına kaydedilir.
+    """
+    model_path = f"/app/reranker_models/{model_name}/model"
+    tokenizer_path = f"/app/reranker_models/{model_name}/tokenizer"
+    onnx_path = f"/app/reranker_models/{model_name}/onnx"
+    reranker_model = RerankerModel()
+    if os.path.exists(model_path) and os.path.exists(tokenizer_path):
+        logging.info("Loading reranker model from local storage.")
+        reranker_model.tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
+        source = model_path
+    else:
+        logging.info(f"Installing reranker model: {model_name}")
+        reranker_model.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        reranker_model.tokenizer.save_pretrained(tokenizer_path)
+        source = model_name
+
+    if backend == "onnx":
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+
+        provider, session_options = get_onnx_runtime_options()
+        if os.path.exists(f"{onnx_path}/model.onnx"):
+            logging.info(f"Loading exported ONNX reranker model ({provider}).")
+            reranker_model.model = ORTModelForSequenceClassification.from_pretrained(
+                onnx_path, provider=provider, session_options=session_options
+            )
+        else:
+            logging.info(f"Exporting reranker model to ONNX ({provider}).")
+            reranker_model.model = ORTModelForSequenceClassification.from_pretrained(
+                source, export=True, provider=provider, session_options=session_options
+            )
+            reranker_model.model.save_pretrained(onnx_path)
+        if precision != "fp32":
+            logging.info(f"Precision mode {precision} is not applied to the ONNX backend, using the exported graph as is.")
+        return reranker_model
+
+    reranker_model.model = AutoModelForSequenceClassification.from_pretrained(source, low_cpu_mem_usage=True)
+    if source == model_name:
+        reranker_model.model.save_pretrained(model_path, safe_serialization=True)
+    reranker_model.model.eval()
+    reranker_model.precision = precision
+    reranker_model.model = apply_precision(reranker_model.model, precision)
+    return reranker_model
+
 def load_reranker_model():
     model_name = os.getenv("RERANKER_MODEL_NAME")
     global _reranker_model
     try:
         if _reranker_model is None:
-            model_path = f"/app/reranker_models/{model_name}/model"
-            tokenizer_path = f"/app/reranker_models/{model_name}/tokenizer"
-            if os.path.exists(model_path) and os.path.exists(tokenizer_path):
-                logging.info("Loading reranker model from local storage.")
-                _reranker_model = RerankerModel()
-                _reranker_model.model = AutoModelForSequenceClassification.from_pretrained(model_path)
-                _reranker_model.tokenizer = AutoTokenizer.from_pretrained(tokenizer_path)
-                _reranker_model.use_fp16 = False
-                logging.info("Reranker model loaded from local storage.")
-            else:
-                logging.info(f"Installing reranker model: {model_name}")
-                _reranker_model = RerankerModel()
-                _reranker_model.model = AutoModelForSequenceClassification.from_pretrained(model_name)
-                _reranker_model.tokenizer = AutoTokenizer.from_pretrained(model_name)
-                _reranker_model.use_fp16 = False
-                _reranker_model.model.save_pretrained(f"/app/reranker_models/{model_name}/model")
-                _reranker_model.tokenizer.save_pretrained(f"/app/reranker_models/{model_name}/tokenizer")
+            _reranker_model = build_reranker_model(
+                model_name,
+                backend=get_model_backend("RERANKER_MODEL_BACKEND"),
+                precision=get_model_precision("RERANKER_MODEL_PRECISION"),
+            )
             logging.info("Reranker model loaded successfully.")
-            if torch.cuda.is_available():
-                _reranker_model.model = _reranker_model.model.to('cuda')
-                logging.info(f"Model successfully moved to GPU.")
-            else:
-                logging.info(f"CUDA is not available. Using CPU.")
         return _reranker_model
     except Exception as e:
         logging.error(f"Error loading model: {e}")
         raise RuntimeError(f"Error loading model: {e}")
 
+def warm_up_models(sequence_lengths=(16, 512)):
+    """
+    Her iki modelle farklı uzunluklarda birer inference çalıştırır; kernel seçimi, bellek tahsisi ve
+    ONNX Runtime oturum hazırlığı ilk gerçek istekten önce tamamlanır.
+    """
+    embedding_model = get_embedding_model()
+    reranker_model = get_reranker_model()
+    for length in sequence_lengths:
+        text = " ".join(["warmup"] * length)
+        embedding_model.encode([text], batch_size=1)
+        inputs = reranker_model.tokenizer([text], [text], truncation=True, max_length=length * 2, padding=True, return_tensors="pt")
+        with torch.no_grad():
+            reranker_model.model(**{k: v.to(reranker_model.model.device) for k, v in inputs.items()})
+    logging.info(f"Models warmed up (sequence lengths {list(sequence_lengths)}).")
+
 def get_reranker_model():
     if _reranker_model is None:
         raise RuntimeError("Reranker model is not loaded!")
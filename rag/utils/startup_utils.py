@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+_startup = None
+
+
+class Startup:
+    """
+    Servis açılışını arka planda, aşamalar halinde çalıştırır ve her aşamanın süresini kaydeder.
+    Bir gruptaki aşamalar eşzamanlı, gruplar sırayla çalışır. Tüm aşamalar bitene kadar servis hazır
+    (ready) sayılmaz; bir aşama hata verirse açılış durur ve hata readiness raporunda görünür.
+    """
+
+    def __init__(self, groups: List[List[Tuple[str, Callable]]]):
+        self.groups = groups
+        self._lock = threading.Lock()
+        self._phases: Dict[str, dict] = {
+            name: {"status": "pending", "duration_ms": None, "error": None} for group in groups for name, _ in group
+        }
+        self._started_at = None
+        self._finished_at = None
+        self._ready = threading.Event()
+        self._failed = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def failed(self) -> bool:
+        return self._failed
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="startup", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        return self.ready
+
+    def _run_phase(self, name: str, fn: Callable):
+        with self._lock:
+            self._phases[name]["status"] = "running"
+        started = time.perf_counter()
+        try:
+            fn()
+            status, error = "done", None
+        except Exception as e:
+            status, error = "failed", str(e)
+            logging.error(f"Startup phase {name} failed: {e}")
+        with self._lock:
+            self._phases[name].update(
+                status=status, duration_ms=(time.perf_counter() - started) * 1000, error=error
+            )
+        return status == "done"
+
+    def _run(self):
+        for group in self.groups:
+            with ThreadPoolExecutor(max_workers=len(group), thread_name_prefix="startup") as executor:
+                succeeded = list(executor.map(lambda phase: self._run_phase(*phase), group))
+            if not all(succeeded):
+                self._failed = True
+                self._finished_at = time.perf_counter()
+                logging.error(f"Startup failed after {(self._finished_at - self._started_at) * 1000:.0f} ms.")
+                self._log_report()
+                return
+        self._finished_at = time.perf_counter()
+        self._ready.set()
+        self._log_report()
+
+    def _log_report(self):
+        report = self.report()
+        lines = [f"Startup report ({report['status']}, {report['total_ms']:.0f} ms):"]
+        for name, phase in report["phases"].items():
+            duration = f"{phase['duration_ms']:.0f} ms" if phase["duration_ms"] is not None else "-"
+            lines.append(f"  {name:<24} {phase['status']:<8} {duration:>10}")
+        logging.info("\n".join(lines))
+
+    def report(self) -> dict:
+        with self._lock:
+            phases = {name: dict(phase) for name, phase in self._phases.items()}
+        end = self._finished_at or time.perf_counter()
+        return {
+            "status": "ready" if self.ready else "failed" if self._failed else "starting",
+            "total_ms": (end - self._started_at) * 1000 if self._started_at is not None else 0.0,
+            "phases": phases,
+        }
+
+
+def start_startup(groups: List[List[Tuple[str, Callable]]]) -> Startup:
+    global _startup
+    if _startup is None:
+        _startup = Startup(groups).start()
+    return _startup
+
+
+def get_startup() -> Optional[Startup]:
+    """
+    Açılış durumunu döner; açılış henüz başlamadıysa None döner.
+    """
+    return _startup
+
+
+def stop_startup(timeout: float = 30.0):
+    global _startup
+    if _startup is not None:
+        # Yarım kalan bir model yüklemesinin bitmesini bekle, kaynaklar ondan sonra kapatılır
+        if not _startup.wait(timeout=timeout) and not _startup.failed:
+            logging.warning("Startup is still running during shutdown.")
+        _startup = None
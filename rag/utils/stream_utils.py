@@ -0,0 +1,85 @@
+from typing import BinaryIO, Iterable, Iterator, List, TypeVar
+import codecs
+import queue
+import threading
+
+T = TypeVar("T")
+
+_END = object()
+
+
+def iter_text_blocks(stream: BinaryIO, block_size: int = 1 << 20, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Binary bir dosya akışını sabit boyutlu bloklar halinde okuyup metne çevirir.
+    Bloklar son boşluk karakterinden bölünür, böylece kelimeler iki bloğa dağılmaz;
+    çok baytlı karakterler incremental decoder ile doğru şekilde birleştirilir.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    carry = ""
+    while True:
+        data = stream.read(block_size)
+        if not data:
+            text = carry + decoder.decode(b"", final=True)
+            if text:
+                yield text
+            return
+        text = carry + decoder.decode(data)
+        cut = max(text.rfind("\n"), text.rfind(" "))
+        if cut < 0:
+            carry = text
+            continue
+        yield text[:cut + 1]
+        carry = text[cut + 1:]
+
+
+def iter_batches(items: Iterable[T], batch_size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def prefetch(items: Iterable[T], depth: int = 2) -> Iterator[T]:
+    """
+    Verilen iterable'ı arka planda bir thread'de tüketir ve en fazla `depth` elemanı önceden hazırlar.
+    Böylece üretici aşama (ör. chunking) tüketici aşamayla (ör. embedding) üst üste çalışır,
+    bellek ise depth ile sınırlı kalır. Üreticideki hata tüketiciye aktarılır.
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=max(1, depth))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Tüketici erken çıkarsa üretici thread'i bloklanmış halde kalmasın
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_END)
+        except BaseException as e:
+            put(e)
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
@@ -1,25 +1,154 @@
 import weaviate
-from weaviate.classes.config import Configure
+import logging
+import os
+import threading
+from weaviate.classes.config import Configure, DataType, Property, Tokenization
+from weaviate.classes.init import AdditionalConfig, Timeout
 _weaviate_client = None
+_weaviate_async_client = None
+_collections = {}
+_async_collections = {}
+_collections_lock = threading.Lock()
+
+def get_connection_params() -> dict:
+    """
+    Weaviate bağlantı ayarlarını ortam değişkenlerinden okur; zaman aşımları saniye cinsindendir
+    ve sorgu zaman aşımı gRPC hybrid sorgularına uygulanır.
+    """
+    return {
+        "host": os.getenv("WEAVIATE_HOST", "weaviate"),
+        "port": int(os.getenv("WEAVIATE_HTTP_PORT", "8080")),
+        "grpc_port": int(os.getenv("WEAVIATE_GRPC_PORT", "50051")),
+        "additional_config": AdditionalConfig(timeout=Timeout(
+            init=float(os.getenv("WEAVIATE_INIT_TIMEOUT_S", "10")),
+            query=float(os.getenv("WEAVIATE_QUERY_TIMEOUT_S", "10")),
+            insert=float(os.getenv("WEAVIATE_INSERT_TIMEOUT_S", "90")),
+        )),
+    }
 
 def create_client():
     global _weaviate_client
-    _weaviate_client = weaviate.connect_to_local(host="weaviate")
+    _weaviate_client = weaviate.connect_to_local(**get_connection_params())
     return _weaviate_client
-        
+
 def get_client():
     if _weaviate_client is None:
         raise RuntimeError("Weaviate client is not loaded!")
     return _weaviate_client
-    
-def create_collection(collection_name: str):
+
+def get_collection(collection_name: str):
+    """
+    Koleksiyon nesnesini isim başına bir kez oluşturup yeniden kullanır.
+    """
+    with _collections_lock:
+        collection = _collections.get(collection_name)
+        if collection is None:
+            collection = get_client().collections.get(collection_name)
+            _collections[collection_name] = collection
+        return collection
+
+async def create_async_client():
+    """
+    Event loop üzerinden kullanılan async Weaviate client'ını oluşturur ve bağlar; tek bir gRPC kanalı
+    üzerinden eşzamanlı sorguları çoğullar.
+    """
+    global _weaviate_async_client
+    if _weaviate_async_client is None:
+        client = weaviate.use_async_with_local(**get_connection_params())
+        await client.connect()
+        _weaviate_async_client = client
+    return _weaviate_async_client
+
+def get_async_client():
+    if _weaviate_async_client is None:
+        raise RuntimeError("Weaviate async client is not loaded!")
+    return _weaviate_async_client
+
+def get_async_collection(collection_name: str):
+    with _collections_lock:
+        collection = _async_collections.get(collection_name)
+        if collection is None:
+            collection = get_async_client().collections.get(collection_name)
+            _async_collections[collection_name] = collection
+        return collection
+
+async def close_async_client():
+    global _weaviate_async_client
+    if _weaviate_async_client is not None:
+        await _weaviate_async_client.close()
+        _weaviate_async_client = None
+    _async_collections.clear()
+
+VECTOR_COMPRESSIONS = ("none", "pq", "bq", "sq")
+
+def get_collection_config() -> dict:
+    """
+    Koleksiyonun vektör indeksi ayarlarını ortam değişkenlerinden okur. HNSW_EF=-1 Weaviate'in dinamik ef'idir;
+    VECTOR_COMPRESSION pq, bq veya sq olduğunda vektörler sıkıştırılır, bq/sq'da aday listesi orijinal
+    vektörlerle VECTOR_RESCORE_LIMIT kadar yeniden skorlanır (pq'da rescoring Weaviate'te her zaman açıktır).
+    """
+    return {
+        "ef": int(os.getenv("HNSW_EF", "-1")),
+        "ef_construction": int(os.getenv("HNSW_EF_CONSTRUCTION", "128")),
+        "max_connections": int(os.getenv("HNSW_MAX_CONNECTIONS", "32")),
+        "compression": os.getenv("VECTOR_COMPRESSION", "none").lower(),
+        "rescore_limit": int(os.getenv("VECTOR_RESCORE_LIMIT", "200")),
+        "pq_segments": int(os.getenv("PQ_SEGMENTS", "0")),
+        "training_limit": int(os.getenv("VECTOR_COMPRESSION_TRAINING_LIMIT", "100000")),
+    }
+
+def build_collection_properties():
+    """
+    Açık property şeması: context yalnızca BM25 için aranabilir, source ve chunk_hash yalnızca
+    birebir filtreleme için indekslenir; gereksiz inverted index'ler oluşturulmaz.
+    """
+    return [
+        Property(name="context", data_type=DataType.TEXT, index_searchable=True, index_filterable=False),
+        Property(name="source", data_type=DataType.TEXT, tokenization=Tokenization.FIELD,
+                 index_searchable=False, index_filterable=True),
+        Property(name="chunk_hash", data_type=DataType.TEXT, tokenization=Tokenization.FIELD,
+                 index_searchable=False, index_filterable=True),
+    ]
+
+def build_vector_index_config(config: dict):
+    compression = config["compression"]
+    if compression not in VECTOR_COMPRESSIONS:
+        raise ValueError(f"VECTOR_COMPRESSION must be one of {VECTOR_COMPRESSIONS}, got {compression}")
+    quantizer = None
+    if compression == "pq":
+        quantizer = Configure.VectorIndex.Quantizer.pq(
+            segments=config["pq_segments"] or None, training_limit=config["training_limit"]
+        )
+    elif compression == "bq":
+        quantizer = Configure.VectorIndex.Quantizer.bq(rescore_limit=config["rescore_limit"])
+    elif compression == "sq":
+        quantizer = Configure.VectorIndex.Quantizer.sq(
+            rescore_limit=config["rescore_limit"], training_limit=config["training_limit"]
+        )
+    return Configure.VectorIndex.hnsw(
+        ef=config["ef"],
+        ef_construction=config["ef_construction"],
+        max_connections=config["max_connections"],
+        quantizer=quantizer,
+    )
+
+def create_collection(collection_name: str, config: dict = None):
+    """
+    Koleksiyon yoksa açık property şeması ve yapılandırılmış vektör indeksiyle oluşturur.
+    Var olan koleksiyonun indeks ayarları değiştirilmez.
+    """
     client = get_client()
     if not client.collections.exists(collection_name):
+        config = config or get_collection_config()
         _ = client.collections.create(
             name = collection_name,
             vectorizer_config = Configure.Vectorizer.none(),
+            vector_index_config = build_vector_index_config(config),
+            properties = build_collection_properties(),
         )
-    
+        logging.info(f"Collection {collection_name} created with {config}.")
+
 def close_client_conection():
     client = get_client()
-    client.close()
\ No newline at end of file
+    client.close()
+    _collections.clear()
@@ -0,0 +1,525 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from utils.vector_db_utils import create_client, create_collection, get_collection, close_client_conection
+from utils.vector_db_utils import create_async_client, get_async_collection, close_async_client
+from utils.executor_utils import get_inference_executor
+from weaviate.classes.query import Filter
+from weaviate.classes.query import MetadataQuery
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import uuid
+import numpy as np
+
+_vector_store = None
+
+VECTOR_BACKENDS = ("weaviate", "local")
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    BM25 için kelime tokenizasyonu; Weaviate'in varsayılan "word" tokenizasyonu gibi küçük harfe çevirip
+    alfanümerik olmayan karakterlerden böler.
+    """
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+def relative_score_fusion(result_sets: Sequence[Tuple[float, np.ndarray, np.ndarray]], limit: int) -> List[Tuple[int, float]]:
+    """
+    Weaviate'in relativeScoreFusion'ı: her sonuç kümesinin skorları kendi içinde min-max normalize edilir,
+    ağırlıklarıyla çarpılıp toplanır. result_sets (ağırlık, satırlar, skorlar) listesidir.
+    """
+    fused: Dict[int, float] = {}
+    for weight, rows, scores in result_sets:
+        if weight <= 0 or len(rows) == 0:
+            continue
+        low, high = float(scores.min()), float(scores.max())
+        normalized = (scores - low) / (high - low) if high > low else np.ones_like(scores)
+        for row, score in zip(rows.tolist(), normalized.tolist()):
+            fused[row] = fused.get(row, 0.0) + weight * score
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Skoru en yüksek k elemanın indekslerini azalan sırada döner; tam sıralama yapmaz.
+    """
+    if k >= len(scores):
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, k)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+
+class VectorStore(ABC):
+    """
+    Arama ve indeksleme katmanının ihtiyaç duyduğu vektör veritabanı işlemleri.
+    Sonuçlar {"id", "context", "score"} sözlükleri olarak döner.
+    """
+
+    @abstractmethod
+    def create_collection(self, collection_name: str):
+        ...
+
+    @abstractmethod
+    def hybrid_search(self, collection_name: str, query: str, vector: Optional[Sequence[float]], limit: int,
+                      alpha: float) -> List[dict]:
+        """
+        alpha=1 yalnızca vektör, alpha=0 yalnızca BM25 aramasıdır; alpha=0 iken vector None olabilir.
+        """
+        ...
+
+    async def hybrid_search_async(self, collection_name: str, query: str, vector: Optional[Sequence[float]],
+                                  limit: int, alpha: float) -> List[dict]:
+        """
+        Event loop'tan çağrılan hybrid arama; varsayılan olarak senkron aramayı sınırlı inference executor'da çalıştırır.
+        """
+        return await get_inference_executor().run(self.hybrid_search, collection_name, query, vector, limit, alpha)
+
+    async def open_async(self):
+        pass
+
+    async def close_async(self):
+        pass
+
+    @abstractmethod
+    def fetch_existing_ids(self, collection_name: str, ids: List[str]) -> Set[str]:
+        ...
+
+    @abstractmethod
+    def delete_ids(self, collection_name: str, ids: Iterable[str]) -> int:
+        ...
+
+    @abstractmethod
+    def batch_writer(self, collection_name: str, batch_size: int, concurrency: int) -> "BatchWriter":
+        ...
+
+    def close(self):
+        pass
+
+
+class BatchWriter(ABC):
+    """
+    Nesneleri arka planda, batch'ler halinde yazan context manager. Çıkışta yazılamayan nesneler
+    failed_objects içinde (uuid, hata mesajı) olarak bulunur.
+    """
+
+    def __init__(self):
+        self.failed_objects: List[Tuple[str, str]] = []
+
+    @abstractmethod
+    def add_object(self, properties: dict, vector: Sequence[float], uuid: str):
+        ...
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _WeaviateBatchWriter(BatchWriter):
+
+    def __init__(self, collection, batch_size: int, concurrency: int):
+        super().__init__()
+        self._collection = collection
+        self._context = collection.batch.fixed_size(batch_size=batch_size, concurrent_requests=concurrency)
+        self._batch = None
+
+    def __enter__(self):
+        self._batch = self._context.__enter__()
+        return self
+
+    def add_object(self, properties: dict, vector: Sequence[float], uuid: str):
+        self._batch.add_object(properties=properties, vector=vector, uuid=uuid)
+
+    def __exit__(self, exc_type, exc, tb):
+        result = self._context.__exit__(exc_type, exc, tb)
+        self.failed_objects = [
+            (str(failed_object.original_uuid or failed_object.object_.uuid), failed_object.message)
+            for failed_object in self._collection.batch.failed_objects
+        ]
+        return result
+
+
+class WeaviateVectorStore(VectorStore):
+
+    def __init__(self):
+        self._client = create_client()
+
+    def create_collection(self, collection_name: str):
+        create_collection(collection_name=collection_name)
+
+    def hybrid_search(self, collection_name: str, query: str, vector: Optional[Sequence[float]], limit: int,
+                      alpha: float) -> List[dict]:
+        search_results = get_collection(collection_name).query.hybrid(
+            query=query,
+            vector=list(vector) if vector is not None else None,
+            limit=limit,
+            alpha=alpha,
+            return_metadata=MetadataQuery(score=True)
+        )
+        return self._to_results(search_results)
+
+    async def hybrid_search_async(self, collection_name: str, query: str, vector: Optional[Sequence[float]],
+                                  limit: int, alpha: float) -> List[dict]:
+        search_results = await get_async_collection(collection_name).query.hybrid(
+            query=query,
+            vector=list(vector) if vector is not None else None,
+            limit=limit,
+            alpha=alpha,
+            return_metadata=MetadataQuery(score=True)
+        )
+        return self._to_results(search_results)
+
+    @staticmethod
+    def _to_results(search_results) -> List[dict]:
+        return [
+            {"id": result.uuid.int, "context": result.properties["context"], "score": result.metadata.score}
+            for result in search_results.objects
+        ]
+
+    async def open_async(self):
+        await create_async_client()
+
+    async def close_async(self):
+        await close_async_client()
+
+    def fetch_existing_ids(self, collection_name: str, ids: List[str]) -> Set[str]:
+        if not ids:
+            return set()
+        response = get_collection(collection_name).query.fetch_objects(
+            filters=Filter.by_id().contains_any(ids),
+            limit=len(ids),
+            return_properties=[],
+        )
+        return {str(obj.uuid) for obj in response.objects}
+
+    def delete_ids(self, collection_name: str, ids: Iterable[str], batch_size: int = 1000) -> int:
+        collection = get_collection(collection_name)
+        ids = list(ids)
+        deleted = 0
+        for start in range(0, len(ids), batch_size):
+            result = collection.data.delete_many(where=Filter.by_id().contains_any(ids[start:start + batch_size]))
+            deleted += result.successful
+        return deleted
+
+    def batch_writer(self, collection_name: str, batch_size: int, concurrency: int) -> BatchWriter:
+        return _WeaviateBatchWriter(get_collection(collection_name), batch_size, concurrency)
+
+    def close(self):
+        close_client_conection()
+
+
+class _LocalCollection:
+    """
+    Tek bir koleksiyon için yerel hibrit indeks. Vektörler birim uzunluğa normalize edilip yalnızca eklemeli,
+    memory-map edilen bir dosyada tutulur (kosinüs benzerliği tek bir matris-vektör çarpımıdır); nesneler ve
+    silinme bilgisi SQLite'ta, BM25 ters indeksi bellekte tutulur ve açılışta SQLite'tan yeniden kurulur.
+    Silme ve üzerine yazma satırı işaretler, vektör dosyası yeniden yazılmaz.
+    """
+
+    def __init__(self, directory: str, k1: float = 1.2, b: float = 0.75):
+        os.makedirs(directory, exist_ok=True)
+        self.vectors_path = os.path.join(directory, "vectors.bin")
+        self.k1 = k1
+        self.b = b
+        self._conn = sqlite3.connect(
+            os.path.join(directory, "objects.sqlite3"), timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            "row INTEGER PRIMARY KEY, id TEXT NOT NULL, properties TEXT NOT NULL, deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS objects_id ON objects (id, deleted)")
+        self._lock = threading.Lock()
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        self.dim = int(meta["dim"]) if "dim" in meta else None
+        self._memmap = None
+        self._memmap_rows = 0
+        self._alive = np.zeros(1024, dtype=bool)
+        self._doc_lengths = np.zeros(1024, dtype=np.float32)
+        self._postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._row_by_id: Dict[str, int] = {}
+        self._load()
+
+    def _load(self):
+        for row, object_id, properties in self._conn.execute(
+            "SELECT row, id, properties FROM objects WHERE deleted = 0 ORDER BY row"
+        ):
+            self._index(row, object_id, json.loads(properties).get("context", ""))
+
+    def _ensure_capacity(self, rows: int):
+        if rows > len(self._alive):
+            capacity = max(rows, len(self._alive) * 2)
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+            self._doc_lengths = np.concatenate(
+                [self._doc_lengths, np.zeros(capacity - len(self._doc_lengths), dtype=np.float32)]
+            )
+
+    def _index(self, row: int, object_id: str, context: str):
+        self._ensure_capacity(row + 1)
+        terms = tokenize(context)
+        self._alive[row] = True
+        self._doc_lengths[row] = len(terms)
+        self._row_by_id[object_id] = row
+        frequencies: Dict[str, int] = {}
+        for term in terms:
+            frequencies[term] = frequencies.get(term, 0) + 1
+        for term, frequency in frequencies.items():
+            rows, tfs = self._postings.setdefault(term, ([], []))
+            rows.append(row)
+            tfs.append(frequency)
+
+    def _row_count(self) -> int:
+        if self.dim is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    def _matrix(self) -> Optional[np.memmap]:
+        rows = self._row_count()
+        if rows == 0:
+            return None
+        if self._memmap is None or self._memmap_rows != rows:
+            self._memmap = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            self._memmap_rows = rows
+        return self._memmap
+
+    def add_objects(self, objects: List[Tuple[str, dict, Sequence[float]]]):
+        vectors = np.asarray([vector for _, _, vector in objects], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dim', ?)", (str(self.dim),))
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match collection dimension {self.dim}")
+            first_row = self._row_count()
+            # Vektörler SQLite kaydından önce diske yazılır; yarıda kalan bir ekleme indekste görünmez
+            with open(self.vectors_path, "ab") as file:
+                file.write(np.ascontiguousarray(vectors).tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+            replaced = [self._row_by_id[object_id] for object_id, _, _ in objects if object_id in self._row_by_id]
+            self._conn.execute("BEGIN")
+            try:
+                if replaced:
+                    self._conn.executemany("UPDATE objects SET deleted = 1 WHERE row = ?", [(row,) for row in replaced])
+                self._conn.executemany(
+                    "INSERT INTO objects (row, id, properties) VALUES (?, ?, ?)",
+                    [
+                        (first_row + offset, object_id, json.dumps(properties, ensure_ascii=False))
+                        for offset, (object_id, properties, _) in enumerate(objects)
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._alive[replaced] = False
+            for offset, (object_id, properties, _) in enumerate(objects):
+                self._index(first_row + offset, object_id, properties.get("context", ""))
+
+    def fetch_existing_ids(self, ids: List[str]) -> Set[str]:
+        with self._lock:
+            return {object_id for object_id in ids if object_id in self._row_by_id}
+
+    def delete_ids(self, ids: Iterable[str]) -> int:
+        with self._lock:
+            rows = [self._row_by_id.pop(object_id) for object_id in set(ids) if object_id in self._row_by_id]
+            if rows:
+                self._conn.executemany("UPDATE objects SET deleted = 1 WHERE row = ?", [(row,) for row in rows])
+                self._alive[rows] = False
+            return len(rows)
+
+    def _vector_search(self, vector: Sequence[float], candidates: int) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            matrix = self._matrix()
+            if matrix is None:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            # Yarıda kalmış bir eklemeden artan vektör satırları indekste yoktur
+            self._ensure_capacity(len(matrix))
+            alive = self._alive[:len(matrix)].copy()
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        scores = matrix @ query
+        scores[~alive] = -np.inf
+        rows = top_k(scores, min(candidates, int(alive.sum())))
+        return rows, scores[rows]
+
+    def _keyword_search(self, query: str, candidates: int) -> Tuple[np.ndarray, np.ndarray]:
+        terms = set(tokenize(query))
+        with self._lock:
+            alive = self._alive
+            total_docs = int(alive.sum())
+            if total_docs == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            average_length = float(self._doc_lengths[alive].mean()) or 1.0
+            scores = np.zeros(len(alive), dtype=np.float32)
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                rows = np.asarray(postings[0], dtype=np.int64)
+                tfs = np.asarray(postings[1], dtype=np.float32)
+                live = alive[rows]
+                rows, tfs = rows[live], tfs[live]
+                if len(rows) == 0:
+                    continue
+                idf = math.log(1 + (total_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[rows] / average_length)
+                scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norm)
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) == 0:
+            return matched, scores[matched]
+        rows = matched[top_k(scores[matched], candidates)]
+        return rows, scores[rows]
+
+    def hybrid_search(self, query: str, vector: Optional[Sequence[float]], limit: int, alpha: float,
+                      candidates: int) -> List[dict]:
+        candidates = max(candidates, limit)
+        result_sets = []
+        if alpha > 0 and vector is not None:
+            result_sets.append((alpha, *self._vector_search(vector, candidates)))
+        if alpha < 1:
+            result_sets.append((1 - alpha, *self._keyword_search(query, candidates)))
+        fused = relative_score_fusion(result_sets, limit)
+        if not fused:
+            return []
+        with self._lock:
+            placeholders = ",".join("?" * len(fused))
+            objects = {
+                row: (object_id, json.loads(properties))
+                for row, object_id, properties in self._conn.execute(
+                    f"SELECT row, id, properties FROM objects WHERE row IN ({placeholders})", [row for row, _ in fused]
+                )
+            }
+        return [
+            {"id": uuid.UUID(objects[row][0]).int, "context": objects[row][1].get("context", ""), "score": score}
+            for row, score in fused if row in objects
+        ]
+
+    def close(self):
+        with self._lock:
+            self._memmap = None
+            self._conn.close()
+
+
+class _LocalBatchWriter(BatchWriter):
+
+    def __init__(self, collection: _LocalCollection, batch_size: int):
+        super().__init__()
+        self._collection = collection
+        self._batch_size = batch_size
+        self._pending: List[Tuple[str, dict, Sequence[float]]] = []
+
+    def add_object(self, properties: dict, vector: Sequence[float], uuid: str):
+        self._pending.append((str(uuid), properties, vector))
+        if len(self._pending) >= self._batch_size:
+            self._flush()
+
+    def _flush(self):
+        objects, self._pending = self._pending, []
+        if not objects:
+            return
+        try:
+            self._collection.add_objects(objects)
+        except Exception as e:
+            self.failed_objects.extend((object_id, str(e)) for object_id, _, _ in objects)
+
+    def __exit__(self, exc_type, exc, tb):
+        self._flush()
+        return False
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Ağ gerektirmeyen, süreç içi hibrit arama: brute-force kosinüs top-k ve BM25, Weaviate'in hybrid(alpha)
+    sorgusuyla aynı şekilde (relativeScoreFusion) birleştirilir. Tek düğümlü kurulumlar, CI ve benchmark'lar için.
+    """
+
+    def __init__(self, directory: str, candidates: int = 100):
+        self.directory = directory
+        self.candidates = candidates
+        self._collections: Dict[str, _LocalCollection] = {}
+        self._lock = threading.Lock()
+
+    def _collection(self, collection_name: str) -> _LocalCollection:
+        with self._lock:
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                collection = _LocalCollection(os.path.join(self.directory, collection_name))
+                self._collections[collection_name] = collection
+            return collection
+
+    def create_collection(self, collection_name: str):
+        self._collection(collection_name)
+
+    def hybrid_search(self, collection_name: str, query: str, vector: Optional[Sequence[float]], limit: int,
+                      alpha: float) -> List[dict]:
+        return self._collection(collection_name).hybrid_search(query, vector, limit, alpha, self.candidates)
+
+    def fetch_existing_ids(self, collection_name: str, ids: List[str]) -> Set[str]:
+        return self._collection(collection_name).fetch_existing_ids(ids)
+
+    def delete_ids(self, collection_name: str, ids: Iterable[str]) -> int:
+        return self._collection(collection_name).delete_ids(ids)
+
+    def batch_writer(self, collection_name: str, batch_size: int, concurrency: int) -> BatchWriter:
+        return _LocalBatchWriter(self._collection(collection_name), batch_size)
+
+    def close(self):
+        with self._lock:
+            for collection in self._collections.values():
+                collection.close()
+            self._collections.clear()
+
+
+def create_vector_store():
+    """
+    VECTOR_BACKEND ortam değişkenine göre (weaviate veya local) vektör veritabanı katmanını oluşturur.
+    """
+    global _vector_store
+    if _vector_store is None:
+        backend_name = os.getenv("VECTOR_BACKEND", "weaviate").lower()
+        if backend_name == "weaviate":
+            _vector_store = WeaviateVectorStore()
+        elif backend_name == "local":
+            directory = os.getenv("LOCAL_VECTOR_DIR", "/app/local_vectors")
+            candidates = int(os.getenv("LOCAL_HYBRID_CANDIDATES", "100"))
+            _vector_store = LocalVectorStore(directory=directory, candidates=candidates)
+        else:
+            raise ValueError(f"VECTOR_BACKEND must be one of {VECTOR_BACKENDS}, got {backend_name}")
+        logging.info(f"Vector store created (backend={backend_name}).")
+    return _vector_store
+
+
+def get_vector_store():
+    if _vector_store is None:
+        raise RuntimeError("Vector store is not loaded!")
+    return _vector_store
+
+
+async def open_async_vector_store():
+    await get_vector_store().open_async()
+
+
+async def close_async_vector_store():
+    if _vector_store is not None:
+        await _vector_store.close_async()
+
+
+def close_vector_store():
+    global _vector_store
+    if _vector_store is not None:
+        _vector_store.close()
+        _vector_store = None
+    logging.info("Vector store closed successfully.")